@@ -0,0 +1,278 @@
+from redis.asyncio import Redis
+from cachetools import TTLCache
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from dotenv import load_dotenv
+from typing import Any, AsyncIterator, Dict, Optional, Set
+import asyncio
+import hashlib
+import weakref
+import orjson
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+redis_url = os.getenv("REDIS_URL")
+
+# Seconds a cached response stays valid; writes invalidate earlier
+CACHE_TTL_SECONDS = int(os.getenv("CACHE_TTL_SECONDS", "60"))
+
+# Caching is disabled when REDIS_URL is not configured
+redis_client: Optional[Redis] = Redis.from_url(redis_url) if redis_url else None
+if redis_client is None:
+    logger.info("REDIS_URL not set, shared response caching disabled")
+else:
+    logger.info("Shared response caching enabled with Redis")
+
+# In-process tier for hot single-entity reads (put(..., local=True)), checked before Redis.
+# Invalidation only reaches the worker that handled the write, so other workers may
+# serve an entry for up to LOCAL_CACHE_TTL_SECONDS after it changed.
+LOCAL_CACHE_TTL_SECONDS = int(os.getenv("LOCAL_CACHE_TTL_SECONDS", "30"))
+
+# Keys held in the in-process tier under each tag, so invalidate(tag=...) reaches them too,
+# and the tag each of those keys was stored under
+_local_tags: Dict[str, Set[str]] = {}
+_local_key_tags: Dict[str, str] = {}
+
+def _untag_local(key: str) -> None:
+    """Remove a key that left the in-process tier from its tag set"""
+    tag = _local_key_tags.pop(key, None)
+    if tag is None:
+        return
+    tagged = _local_tags.get(tag)
+    if tagged is not None:
+        tagged.discard(key)
+        if not tagged:
+            del _local_tags[tag]
+
+class _LocalCache(TTLCache):
+    """In-process tier that drops evicted and expired keys from their tag sets"""
+
+    def popitem(self):
+        key, value = super().popitem()
+        _untag_local(key)
+        return key, value
+
+    def expire(self, time=None):
+        expired = super().expire(time)
+        for key, _ in expired:
+            _untag_local(key)
+        return expired
+
+_local_cache: TTLCache = _LocalCache(maxsize=10_000, ttl=LOCAL_CACHE_TTL_SECONDS)
+
+# Invalidation stamps per key and tag. A cache miss takes generation() before querying and
+# passes it to put(), which skips the body if the key or its tag was invalidated meanwhile,
+# so a write landing mid-load is not overwritten by the stale result. Stamps are in-process,
+# like the local tier, so only invalidations from this worker are seen.
+_generation = 0
+# Stamps only matter while a load is in flight; a dropped stamp raises the floor instead
+_stamp_floor = 0
+
+class _StampCache(TTLCache):
+    """Invalidation stamps; evicting or expiring one raises _stamp_floor so no load outlives it"""
+
+    def popitem(self):
+        global _stamp_floor
+        key, stamp = super().popitem()
+        _stamp_floor = max(_stamp_floor, stamp)
+        return key, stamp
+
+    def expire(self, time=None):
+        global _stamp_floor
+        expired = super().expire(time)
+        for _, stamp in expired:
+            _stamp_floor = max(_stamp_floor, stamp)
+        return expired
+
+_stamps: TTLCache = _StampCache(maxsize=100_000, ttl=300)
+
+# Per-key locks so concurrent misses on one key load it once
+_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+def make_key(prefix: str, params: Dict[str, Any]) -> str:
+    """
+    Build a cache key from a prefix and a dict of query parameters.
+
+    Args:
+        prefix (str): Key namespace, e.g. "docs"
+        params (Dict[str, Any]): Query parameters; key order does not matter
+
+    Returns:
+        str: Cache key
+    """
+    digest = hashlib.blake2b(orjson.dumps(params, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    return f"{prefix}:{digest}"
+
+def encode(value: Any) -> bytes:
+    """Serialize a response value (models, lists of models, dicts) to JSON bytes"""
+    return orjson.dumps(jsonable_encoder(value))
+
+def lock(key: str) -> asyncio.Lock:
+    """
+    Get the lock for a cache key; hold it while loading a missing entry.
+
+    Returns:
+        asyncio.Lock: Lock shared by all concurrent callers for this key
+    """
+    key_lock = _locks.get(key)
+    if key_lock is None:
+        key_lock = asyncio.Lock()
+        _locks[key] = key_lock
+    return key_lock
+
+def generation() -> int:
+    """
+    Get the current invalidation generation; take it on a cache miss before loading.
+
+    Returns:
+        int: Value to pass to put() as generation
+    """
+    return _generation
+
+def _is_stale(key: str, tag: Optional[str], since: int) -> bool:
+    """Whether key or tag was invalidated after generation since was taken"""
+    if since < _stamp_floor:
+        return True
+    if _stamps.get(key, 0) > since:
+        return True
+    return bool(tag) and _stamps.get(tag, 0) > since
+
+def json_response(body: bytes, request: Request) -> Response:
+    """
+    Build a JSON response with an ETag of its body, or a bodiless 304 when the client's copy is current.
+    
+    Args:
+        body (bytes): Encoded JSON body
+        request (Request): Incoming request, checked for If-None-Match
+    
+    Returns:
+        Response: 200 with the body, or 304 Not Modified
+    """
+    etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_etags = {tag.strip() for tag in if_none_match.split(",")}
+        if client_etags & {etag, f"W/{etag}", "*"}:
+            return Response(status_code=304, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+async def get(key: str) -> Optional[bytes]:
+    """
+    Get a cached JSON body, from the in-process tier first and then Redis.
+
+    Returns:
+        Optional[bytes]: The cached body, or None on a miss, when caching is disabled or Redis fails
+    """
+    value = _local_cache.get(key)
+    if value is not None:
+        return value
+    if redis_client is None:
+        return None
+    try:
+        return await redis_client.get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {str(e)}")
+        return None
+
+async def put(
+    key: str,
+    value: bytes,
+    tag: Optional[str] = None,
+    local: bool = False,
+    ttl: Optional[int] = None,
+    generation: Optional[int] = None
+) -> None:
+    """
+    Store a JSON body for CACHE_TTL_SECONDS, or ttl seconds when given.
+
+    Args:
+        key (str): Cache key
+        value (bytes): JSON body
+        tag (Optional[str]): Tag set to register the key in, so invalidate() can drop it with the tag
+        local (bool): Also keep the body in the in-process tier
+        ttl (Optional[int]): Redis expiry in seconds, overriding CACHE_TTL_SECONDS
+        generation (Optional[int]): generation() taken before the body was loaded; the body
+            is not stored if key or tag has been invalidated since
+    """
+    if generation is not None and _is_stale(key, tag, generation):
+        logger.debug(f"Skipping cache write for {key}: invalidated while loading")
+        return
+    ttl = ttl or CACHE_TTL_SECONDS
+    if local:
+        _local_cache[key] = value
+        if tag:
+            _untag_local(key)
+            _local_tags.setdefault(tag, set()).add(key)
+            _local_key_tags[key] = tag
+    if redis_client is None:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            pipe.setex(key, ttl, value)
+            if tag:
+                pipe.sadd(tag, key)
+                pipe.expire(tag, ttl)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {str(e)}")
+
+async def invalidate(*keys: str, tag: Optional[str] = None) -> None:
+    """
+    Drop cached entries after a write.
+
+    Args:
+        *keys (str): Cache keys to delete
+        tag (Optional[str]): Tag set whose member keys (and the set itself) are deleted too
+    """
+    global _generation
+    _generation += 1
+    for key in keys:
+        _stamps[key] = _generation
+        _untag_local(key)
+        _local_cache.pop(key, None)
+    if tag:
+        _stamps[tag] = _generation
+        for key in _local_tags.pop(tag, ()):
+            _local_key_tags.pop(key, None)
+            _local_cache.pop(key, None)
+    if redis_client is None:
+        return
+    try:
+        to_delete = list(keys)
+        if tag:
+            to_delete.extend(await redis_client.smembers(tag))
+            to_delete.append(tag)
+        if to_delete:
+            await redis_client.delete(*to_delete)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for {keys or tag}: {str(e)}")
+
+async def cached_stream(
+    key: str,
+    stream: AsyncIterator[bytes],
+    tag: Optional[str] = None,
+    local: bool = False,
+    generation: Optional[int] = None
+) -> AsyncIterator[bytes]:
+    """
+    Pass a streamed JSON body through, storing it in the cache once it completes.
+
+    Args:
+        key (str): Cache key
+        stream (AsyncIterator[bytes]): Body chunks, e.g. from json_array_stream
+        tag (Optional[str]): Tag set to register the key in
+        local (bool): Also keep the body in the in-process tier
+        generation (Optional[int]): generation() taken before the stream's query started
+
+    Yields:
+        bytes: The chunks of the stream, unchanged
+    """
+    chunks = []
+    async for chunk in stream:
+        chunks.append(chunk)
+        yield chunk
+    await put(key, b"".join(chunks), tag, local, generation=generation)
@@ -1,9 +1,11 @@
-from pymongo import MongoClient, ASCENDING
+from pymongo import MongoClient, ASCENDING, DESCENDING
 from pymongo.collection import Collection
 from pymongo.database import Database
 from pymongo.errors import ServerSelectionTimeoutError, OperationFailure
-from fastapi import Depends, HTTPException, status
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
+from fastapi import HTTPException, status
 from dotenv import load_dotenv
+from typing import Any, Awaitable, Callable, Optional
 import os
 import logging
 
@@ -17,6 +19,14 @@ if not mongodb_url:
     logger.error("MONGODB_URL not found in environment variables")
     raise ValueError("MONGODB_URL not found in environment variables")
 
+# Connection pool sizing for the sync client; keep a few connections open so the first
+# requests after startup or an idle period don't pay for new TLS handshakes
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "10"))
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "50"))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "60000"))
+# The async client serves every concurrent Motor handler, so it gets a larger ceiling
+MONGODB_ASYNC_MAX_POOL_SIZE = int(os.getenv("MONGODB_ASYNC_MAX_POOL_SIZE", "100"))
+
 # Initialize MongoDB client
 logger.info(f"Initializing MongoDB connection to {mongodb_url}")
 client = MongoClient(
@@ -24,11 +34,14 @@ client = MongoClient(
     serverSelectionTimeoutMS=30000,
     connectTimeoutMS=30000,
     socketTimeoutMS=30000,
+    minPoolSize=MONGODB_MIN_POOL_SIZE,
+    maxPoolSize=MONGODB_MAX_POOL_SIZE,
+    maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
     tls=True,
     tlsAllowInvalidCertificates=True
 )
 
-# Verify connection
+# Verify connection; this also starts filling the pool up to minPoolSize
 try:
     client.admin.command('ping')
     logger.info("Successfully connected to MongoDB")
@@ -40,6 +53,21 @@ except Exception as e:
 db: Database = client["asset_management"]
 logger.info("Selected 'asset_management' database")
 
+# Async client for handlers that await their queries instead of blocking the event loop.
+# Motor binds to the running loop lazily, so creating it at import time is safe.
+async_client = AsyncIOMotorClient(
+    mongodb_url,
+    serverSelectionTimeoutMS=30000,
+    connectTimeoutMS=30000,
+    socketTimeoutMS=30000,
+    minPoolSize=MONGODB_MIN_POOL_SIZE,
+    maxPoolSize=MONGODB_ASYNC_MAX_POOL_SIZE,
+    maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+    tls=True,
+    tlsAllowInvalidCertificates=True
+)
+async_db: AsyncIOMotorDatabase = async_client["asset_management"]
+
 # Helper function to safely create indexes
 def safe_create_index(collection, keys, **kwargs):
     """Create an index safely, dropping existing ones if different options are needed"""
@@ -86,6 +114,19 @@ try:
 except Exception as e:
     logger.error(f"Error fixing asset_categories index: {str(e)}")
 
+# Backfill full_name on employees created before it was stored
+try:
+    result = db.employees.update_many(
+        {"full_name": {"$exists": False}},
+        [{"$set": {"full_name": {"$concat": [
+            {"$ifNull": ["$first_name", ""]}, " ", {"$ifNull": ["$last_name", ""]}
+        ]}}}]
+    )
+    if result.modified_count:
+        logger.info(f"Backfilled full_name on {result.modified_count} employees")
+except Exception as e:
+    logger.error(f"Error backfilling employee full_name: {str(e)}")
+
 # Create UUID-based indexes for all collections - log only once at startup
 logger.info("Creating/verifying indexes for all collections")
 safe_create_index(db.asset_categories, [("id", ASCENDING)], unique=True)
@@ -96,80 +137,193 @@ safe_create_index(db.asset_items, [("category_id", ASCENDING)])
 safe_create_index(db.asset_items, [("department", ASCENDING)])
 safe_create_index(db.asset_items, [("location", ASCENDING)])
 safe_create_index(db.asset_items, [("maintenance_due_date", ASCENDING)])
+# Only active assignments are ever looked up by assignee, so a partial index covers them;
+# it replaces the earlier full compound index on the same fields
+safe_create_index(
+    db.asset_items,
+    [("current_assignee_id", ASCENDING)],
+    name="current_assignee_id_active",
+    partialFilterExpression={"has_active_assignment": True}
+)
+try:
+    if "current_assignee_id_1_has_active_assignment_1" in db.asset_items.index_information():
+        db.asset_items.drop_index("current_assignee_id_1_has_active_assignment_1")
+        logger.info("Dropped compound index superseded by current_assignee_id_active")
+except Exception as e:
+    logger.error(f"Error dropping superseded asset_items index: {str(e)}")
 
 safe_create_index(db.employees, [("id", ASCENDING)], unique=True)
 safe_create_index(db.employees, [("employee_id", ASCENDING)], unique=True)
 safe_create_index(db.employees, [("contact.email", ASCENDING)], unique=True)
+safe_create_index(db.employees, [("department", ASCENDING), ("metadata.role", ASCENDING)])
+try:
+    if "department_1_role_1" in db.employees.index_information():
+        db.employees.drop_index("department_1_role_1")
+        logger.info("Dropped employees index on top-level role, superseded by metadata.role")
+except Exception as e:
+    logger.error(f"Error dropping superseded employees index: {str(e)}")
+safe_create_index(db.employees, [("is_active", ASCENDING), ("department", ASCENDING), ("metadata.role", ASCENDING)])
+try:
+    if "is_active_1_department_1_role_1" in db.employees.index_information():
+        db.employees.drop_index("is_active_1_department_1_role_1")
+        logger.info("Dropped employees listing index on top-level role, superseded by metadata.role")
+except Exception as e:
+    logger.error(f"Error dropping superseded employees listing index: {str(e)}")
 
 safe_create_index(db.documents, [("id", ASCENDING)], unique=True)
 safe_create_index(db.documents, [("asset_id", ASCENDING)])
 safe_create_index(db.documents, [("employee_id", ASCENDING)])
+safe_create_index(db.documents, [("tags", ASCENDING)])
+# Listing filters (equality on owner and type) followed by the created_at sort
+safe_create_index(db.documents, [("asset_id", ASCENDING), ("document_type", ASCENDING), ("created_at", DESCENDING)])
+safe_create_index(db.documents, [("employee_id", ASCENDING), ("document_type", ASCENDING), ("created_at", DESCENDING)])
 
 safe_create_index(db.assignment_history, [("id", ASCENDING)], unique=True)
 safe_create_index(db.assignment_history, [("asset_id", ASCENDING)])
 safe_create_index(db.assignment_history, [("assigned_to", ASCENDING)])
 safe_create_index(db.assignment_history, [("is_active", ASCENDING)])
+safe_create_index(db.assignment_history, [("asset_id", ASCENDING), ("status", ASCENDING)])
+safe_create_index(db.assignment_history, [("employee_id", ASCENDING), ("status", ASCENDING)])
+safe_create_index(db.assignment_history, [("asset_id", ASCENDING), ("assignment_date", DESCENDING)])
+safe_create_index(db.assignment_history, [("employee_id", ASCENDING), ("assignment_date", DESCENDING)])
 
 safe_create_index(db.maintenance_history, [("id", ASCENDING)], unique=True)
 safe_create_index(db.maintenance_history, [("asset_id", ASCENDING)])
 safe_create_index(db.maintenance_history, [("status", ASCENDING)])
+# Per-asset and full listings, newest request first
+safe_create_index(db.maintenance_history, [("asset_id", ASCENDING), ("request_date", DESCENDING)])
+safe_create_index(db.maintenance_history, [("request_date", DESCENDING), ("_id", DESCENDING)])
 
 safe_create_index(db.requests, [("id", ASCENDING)], unique=True)
 safe_create_index(db.requests, [("type", ASCENDING)])
 safe_create_index(db.requests, [("status", ASCENDING)])
 safe_create_index(db.requests, [("created_at", ASCENDING)])
+safe_create_index(db.requests, [("created_at", DESCENDING), ("id", DESCENDING)])
+# Filtered request listings, newest first
+safe_create_index(db.requests, [("status", ASCENDING), ("type", ASCENDING), ("created_at", DESCENDING)])
+safe_create_index(db.requests, [("requestor.id", ASCENDING), ("created_at", DESCENDING)])
+safe_create_index(db.requests, [("asset_details.asset_id", ASCENDING), ("created_at", DESCENDING)])
+safe_create_index(db.requests, [("linked_assets", ASCENDING), ("created_at", DESCENDING)])
 
 logger.info("All indexes created successfully")
 
 # Function to get the database - supports both sync and async contexts
-def get_db():
+def get_db() -> Database:
     """
     Get the MongoDB database instance.
     
-    Can be used in both sync and async contexts.
+    Can be used in both sync and async contexts. The client is created once at import
+    and its connection pool handles reconnects, so no per-request ping is needed.
     """
-    try:
-        # Verify connection is still alive
-        client.admin.command('ping')
-        return db
-    except Exception as e:
-        logger.error(f"Database connection error: {str(e)}")
-        # Attempt to reconnect
-        client.admin.command('ping')
-        return db
-
-def get_asset_categories_collection(db: Database = Depends(get_db)) -> Collection:
+    return db
+
+# Collection handles are thread-safe and live as long as the client, so they are built
+# once here rather than resolved through get_db/get_async_db on every request
+asset_categories_collection: Collection = db["asset_categories"]
+asset_items_collection: Collection = db["asset_items"]
+employees_collection: Collection = db["employees"]
+documents_collection: Collection = db["documents"]
+assignment_history_collection: Collection = db["assignment_history"]
+maintenance_history_collection: Collection = db["maintenance_history"]
+requests_collection: Collection = db["requests"]
+
+async_documents_collection: AsyncIOMotorCollection = async_db["documents"]
+async_employees_collection: AsyncIOMotorCollection = async_db["employees"]
+async_assignment_history_collection: AsyncIOMotorCollection = async_db["assignment_history"]
+async_maintenance_history_collection: AsyncIOMotorCollection = async_db["maintenance_history"]
+async_requests_collection: AsyncIOMotorCollection = async_db["requests"]
+
+def get_asset_categories_collection() -> Collection:
     """
     Provides the asset_categories collection.
     """
-    return db["asset_categories"]
+    return asset_categories_collection
 
-def get_asset_items_collection(db: Database = Depends(get_db)) -> Collection:
+def get_asset_items_collection() -> Collection:
     """
     Provides the asset_items collection.
     """
-    return db["asset_items"]
+    return asset_items_collection
 
-def get_employees_collection(db: Database = Depends(get_db)) -> Collection:
-    return db["employees"]
+def get_employees_collection() -> Collection:
+    return employees_collection
 
-def get_documents_collection(db: Database = Depends(get_db)) -> Collection:
+def get_documents_collection() -> Collection:
     """
     Provides the documents collection.
     
     Note: Ensures we're using 'documents' not 'documents.documents'
     """
-    # Always use the explicitly named collection
-    collection_name = "documents"
+    return documents_collection
+
+def get_assignment_history_collection() -> Collection:
+    return assignment_history_collection
+
+def get_maintenance_history_collection() -> Collection:
+    return maintenance_history_collection
+
+def get_requests_collection() -> Collection:
+    return requests_collection
+
+def get_async_db() -> AsyncIOMotorDatabase:
+    """
+    Get the Motor (async) database instance.
     
-    # Return the explicitly named collection
-    return db.get_collection(collection_name)  # Using get_collection instead of [] notation
+    Use from async handlers so MongoDB round-trips don't block the event loop.
+    """
+    return async_db
+
+def get_async_documents_collection() -> AsyncIOMotorCollection:
+    return async_documents_collection
+
+def get_async_employees_collection() -> AsyncIOMotorCollection:
+    return async_employees_collection
 
-def get_assignment_history_collection(db: Database = Depends(get_db)) -> Collection:
-    return db["assignment_history"]
+def get_async_assignment_history_collection() -> AsyncIOMotorCollection:
+    return async_assignment_history_collection
 
-def get_maintenance_history_collection(db: Database = Depends(get_db)) -> Collection:
-    return db["maintenance_history"]
+def get_async_maintenance_history_collection() -> AsyncIOMotorCollection:
+    return async_maintenance_history_collection
 
-def get_requests_collection(db: Database = Depends(get_db)) -> Collection:
-    return db["requests"]
\ No newline at end of file
+def get_async_requests_collection() -> AsyncIOMotorCollection:
+    return async_requests_collection
+
+# Whether the deployment supports multi-document transactions (replica set or mongos),
+# resolved on first use
+_transactions_supported: Optional[bool] = None
+
+async def async_transactions_supported() -> bool:
+    """
+    Check once whether the MongoDB deployment supports transactions.
+    
+    Returns:
+        bool: True for replica set members and mongos routers, False for standalone servers
+    """
+    global _transactions_supported
+    if _transactions_supported is None:
+        try:
+            hello = await async_client.admin.command("hello")
+            _transactions_supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+        except Exception as e:
+            logger.warning(f"Could not determine transaction support, writing without transactions: {str(e)}")
+            _transactions_supported = False
+        logger.info(f"MongoDB transactions supported: {_transactions_supported}")
+    return _transactions_supported
+
+async def run_in_transaction(callback: Callable[[Any], Awaitable[Any]]) -> Any:
+    """
+    Run a coroutine function inside a MongoDB transaction.
+    
+    The callback receives the session to pass to every write. On a standalone server,
+    which cannot run transactions, it is called once with session=None instead.
+    
+    Args:
+        callback (Callable[[Any], Awaitable[Any]]): Coroutine function accepting the session
+        
+    Returns:
+        Any: The callback's return value
+    """
+    if not await async_transactions_supported():
+        return await callback(None)
+    async with await async_client.start_session() as session:
+        return await session.with_transaction(callback)
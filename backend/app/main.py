@@ -1,9 +1,9 @@
 from fastapi import FastAPI, HTTPException, Request, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.encoders import jsonable_encoder
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from pymongo.database import Database
-from app.dependencies import db, get_db, safe_create_index
+from app.dependencies import db, get_db, get_async_db, safe_create_index
 from app.routers import (
     asset_categories, 
     asset_items, 
@@ -13,8 +13,6 @@ from app.routers import (
     maintenance_history, 
     request
 )
-from typing import Any
-from enum import Enum
 from pymongo import ASCENDING, TEXT
 from app.logging_config import setup_logging, get_logger
 import pymongo
@@ -34,39 +32,15 @@ setup_logging(
 )
 logger = get_logger("app.main")
 
+# orjson encodes enums (as their values) and datetimes natively, so responses
+# need no extra pre-processing pass before serialization
 app = FastAPI(
     title="Asset Management API",
     description="API for Asset Management System",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
-# Custom JSON encoder for enums
-class EnumJsonEncoder:
-    @staticmethod
-    def encode(obj: Any) -> Any:
-        if isinstance(obj, Enum):
-            return obj.value
-        return obj
-
-# Custom response class to handle enums
-class CustomJSONResponse(JSONResponse):
-    def render(self, content: Any) -> bytes:
-        # Process any enum values before encoding
-        def process_enums(data):
-            if isinstance(data, dict):
-                return {k: process_enums(v) for k, v in data.items()}
-            elif isinstance(data, list):
-                return [process_enums(item) for item in data]
-            elif isinstance(data, Enum):
-                return data.value
-            return data
-        
-        processed_content = process_enums(content)
-        return super().render(processed_content)
-
-# Override the default JSONResponse
-app.router.default_response_class = CustomJSONResponse
-
 # Enhanced CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -83,7 +57,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
     allow_headers=["*"],
-    expose_headers=["Access-Control-Allow-Origin"],
+    expose_headers=["Access-Control-Allow-Origin", "ETag", "X-Next-Cursor"],
 )
 logger.info("CORS middleware configured with frontend origins")
 
@@ -167,6 +141,10 @@ async def startup_event():
         collection.create_index([("id", pymongo.ASCENDING)], unique=True)
     
     logger.info("All database indexes verified")
+    
+    # Connect the async client now so the first Motor-backed request doesn't pay for it
+    await get_async_db().command("ping")
+    logger.info("Async MongoDB client connected")
     logger.info("Server started successfully!")
     logger.info("API documentation available at: http://localhost:8000/docs")
 
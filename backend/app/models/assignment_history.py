@@ -199,6 +199,30 @@ class AssignmentReturn(BaseModel):
     
     model_config = model_config
 
+# Request bodies for the assignment router; extra fields sent by the frontend are ignored
+class AssignmentCreateRequest(BaseModel):
+    asset_id: str
+    assigned_to: str
+    expected_return_date: Optional[datetime] = None
+    assignment_type: str = "PERMANENT"
+    condition: str = "Good"
+    department: Optional[str] = None
+    location: Optional[str] = None
+    assignment_notes: str = ""
+    assigned_by: str = ""
+    assigned_by_name: str = ""
+    
+    model_config = model_config
+
+class AssignmentUnassignRequest(BaseModel):
+    assignment_id: str
+    returned_date: Optional[datetime] = None
+    return_notes: Optional[str] = None
+    return_condition: Optional[str] = None
+    condition_after: Optional[str] = None
+    
+    model_config = model_config
+
 class AssignmentUpdate(BaseModel):
     asset_id: Optional[str] = None
     asset_name: Optional[str] = None
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field, EmailStr
+from pydantic import BaseModel, Field, EmailStr, model_validator
 from typing import List, Optional, Dict, Any
 from enum import Enum
 from datetime import datetime
@@ -137,6 +137,7 @@ class EmployeeCreate(BaseModel):
     employee_id: str
     first_name: str
     last_name: str
+    full_name: Optional[str] = None
     department: str
     status: EmployeeStatus = EmployeeStatus.ACTIVE
     contact: EmployeeContact
@@ -155,6 +156,12 @@ class EmployeeCreate(BaseModel):
     current_assets: Optional[List[Dict[str, Any]]] = None
     
     model_config = model_config
+    
+    @model_validator(mode="after")
+    def set_full_name(self) -> "EmployeeCreate":
+        # Stored so readers (e.g. assignments) don't rebuild the name from its parts
+        self.full_name = f"{self.first_name} {self.last_name}"
+        return self
 
 class EmployeeUpdate(BaseModel):
     employee_id: Optional[str] = None
@@ -227,4 +227,13 @@ class ApprovalUpdate(BaseModel):
     status: RequestStatus = Field(..., description="New approval status")
     notes: Optional[str] = Field(None, description="Notes for the approval/rejection")
     
-    model_config = model_config 
\ No newline at end of file
+    model_config = model_config
+
+# Body of PUT /requests/{request_id}/approval
+class ApprovalDecision(BaseModel):
+    approve: bool = Field(..., description="Whether to approve the request")
+    approver_id: str = Field(..., description="ID of the approver")
+    approver_name: Optional[str] = Field(None, description="Name of the approver")
+    comment: Optional[str] = Field(None, description="Comment for the approval/rejection")
+    
+    model_config = model_config
@@ -80,6 +80,8 @@ async def read_asset_category(category_id: str, collection: Collection = Depends
     except ValueError as ve:
         logger.warning(f"Invalid category ID: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch category {category_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch category: {str(e)}")
@@ -137,6 +139,9 @@ async def create_bulk_asset_categories(categories: List[AssetCategoryCreate], co
             created_category = create_asset_category(collection, category)
             created_categories.append(created_category)
             logger.debug(f"Successfully created category: {created_category.id}")
+        except ValueError as ve:
+            logger.warning(f"Failed to create category {idx+1}: {str(ve)}")
+            errors.append(f"Category {idx+1} ({category.category_name}): {str(ve)}")
         except Exception as e:
             logger.error(f"Failed to create category {idx+1}: {str(e)}", exc_info=True)
             errors.append(f"Category {idx+1} ({category.category_name}): {str(e)}")
@@ -180,6 +185,8 @@ async def update_existing_asset_category(category_id: str, category: AssetCatego
     except ValueError as ve:
         logger.warning(f"Failed to update category: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to update category {category_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to update category: {str(e)}")
@@ -211,6 +218,8 @@ async def delete_existing_asset_category(category_id: str, collection: Collectio
     except ValueError as ve:
         logger.warning(f"Cannot delete category: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to delete category {category_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to delete category: {str(e)}")
\ No newline at end of file
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from pymongo.collection import Collection
 from typing import List, Optional
-from datetime import datetime
+import ciso8601
 from app.dependencies import get_asset_items_collection
+from app.routers.employees import invalidate_employee_asset_caches
 from app.models.asset_item import (
     AssetItem, 
     AssetItemCreate, 
@@ -88,7 +89,7 @@ async def read_asset_items(
             filters["tags"] = {"$in": tags}
         if maintenance_due_before:
             try:
-                due_date = datetime.fromisoformat(maintenance_due_before.replace("Z", "+00:00"))
+                due_date = ciso8601.parse_datetime(maintenance_due_before)
                 filters["maintenance_due_date"] = {"$lte": due_date}
             except ValueError:
                 logger.warning(f"Invalid maintenance_due_before format: {maintenance_due_before}")
@@ -153,6 +154,8 @@ async def read_asset_item(asset_id: str, collection: Collection = Depends(get_as
     except ValueError as ve:
         logger.warning(f"Invalid asset ID: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch asset item {asset_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch asset item: {str(e)}")
@@ -176,6 +179,7 @@ async def create_new_asset_item(item: AssetItemCreate, collection: Collection =
     try:
         created_item = create_asset_item(collection, item)
         logger.debug(f"Created asset item with ID: {created_item.id}")
+        await invalidate_employee_asset_caches()
         return created_item
     except ValueError as ve:
         logger.warning(f"Failed to create asset item: {str(ve)}")
@@ -210,6 +214,9 @@ async def create_bulk_asset_items(items: List[AssetItemCreate], collection: Coll
             created_item = create_asset_item(collection, item)
             created_items.append(created_item)
             logger.debug(f"Successfully created asset item: {created_item.id}")
+        except ValueError as ve:
+            logger.warning(f"Failed to create asset item {idx+1}: {str(ve)}")
+            errors.append(f"Asset item {idx+1} ({item.name}): {str(ve)}")
         except Exception as e:
             logger.error(f"Failed to create asset item {idx+1}: {str(e)}", exc_info=True)
             errors.append(f"Asset item {idx+1} ({item.name}): {str(e)}")
@@ -223,6 +230,7 @@ async def create_bulk_asset_items(items: List[AssetItemCreate], collection: Coll
         logger.warning(f"Some asset items failed to create: {errors}")
     
     logger.info(f"Successfully created {len(created_items)} out of {len(items)} asset items")
+    await invalidate_employee_asset_caches()
     return created_items
 
 @router.put("/{asset_id}", response_model=AssetItemResponse)
@@ -249,10 +257,13 @@ async def update_existing_asset_item(asset_id: str, item: AssetItemUpdate, colle
             raise HTTPException(status_code=404, detail="Asset item not found")
             
         logger.debug(f"Updated asset item: {updated_item.name}")
+        await invalidate_employee_asset_caches()
         return updated_item
     except ValueError as ve:
         logger.warning(f"Failed to update asset item: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to update asset item {asset_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to update asset item: {str(e)}")
@@ -280,10 +291,13 @@ async def delete_existing_asset_item(asset_id: str, collection: Collection = Dep
             raise HTTPException(status_code=404, detail="Asset item not found")
             
         logger.debug(f"Deleted asset item ID: {asset_id}")
+        await invalidate_employee_asset_caches()
         return {"message": "Asset item deleted successfully"}
     except ValueError as ve:
         logger.warning(f"Cannot delete asset item: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to delete asset item {asset_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to delete asset item: {str(e)}")
\ No newline at end of file
@@ -1,209 +1,381 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pymongo.collection import Collection
-from typing import List, Optional, Dict, Any
+from fastapi import APIRouter, HTTPException, Depends, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorDatabase
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
 from datetime import datetime
-from app.dependencies import get_db, get_assignment_history_collection
-from app.models.asset_item import AssetItem
-from app.models.assignment_history import AssignmentHistoryEntry, AssignmentCreate, AssignmentReturn, AssignmentResponse
-from app.services.assignment_history_service import (
-    get_assignment_history_by_asset
-)
+import asyncio
+from app.dependencies import get_async_db, get_async_assignment_history_collection, run_in_transaction
+from app.models.assignment_history import AssignmentCreateRequest, AssignmentUnassignRequest, AssignmentResponse
+from app.streaming import json_array_stream
+from app import cache
+from app.routers.employees import invalidate_employee_cache
 import logging
 from app.models.utils import generate_uuid, get_current_datetime
 
 logger = logging.getLogger(__name__)
 
-router = APIRouter(prefix="/assignment-history", tags=["Assignment History"])
+router = APIRouter(prefix="/assignment-history", tags=["Assignment History"], default_response_class=ORJSONResponse)
+
+# Only the fields copied into assignment records are read from the asset and employee.
+# _id stays in the projection so an existing document never comes back empty (falsy).
+ASSET_SUMMARY_PROJECTION = {"name": 1, "asset_tag": 1, "category_id": 1, "category_name": 1}
+EMPLOYEE_SUMMARY_PROJECTION = {"full_name": 1, "first_name": 1, "last_name": 1, "department": 1, "location": 1}
+# Unassigning only needs the asset and employee an assignment points to
+ASSIGNMENT_REF_PROJECTION = {"asset_id": 1, "employee_id": 1, "assigned_to": 1}
+# Matches only assignments that have both references, so records missing one are left untouched
+_ASSIGNMENT_HAS_REFS_FILTER = {
+    "asset_id": {"$nin": [None, ""]},
+    "$or": [{"employee_id": {"$nin": [None, ""]}}, {"assigned_to": {"$nin": [None, ""]}}]
+}
+
+# Fields returned by the history endpoint: the AssignmentResponse fields plus the
+# names this router stores on assignment records
+ASSIGNMENT_HISTORY_PROJECTION = {
+    "_id": 0,
+    **{field: 1 for field in AssignmentResponse.model_fields},
+    **{field: 1 for field in (
+        "category_id", "category_name", "employee_id", "employee_name", "assignment_date",
+        "return_date", "condition", "assigned_by", "assigned_by_name", "location",
+        "created_at", "updated_at"
+    )}
+}
+
+# Static parts of the asset/employee update specs, merged with the per-assignment fields
+_ASSET_ASSIGNED_SET = {"status": "assigned", "has_active_assignment": True}
+_ASSET_RETURNED_SET = {
+    "status": "available",
+    "has_active_assignment": False,
+    "current_assignee_id": None,
+    "current_assignee_name": None,
+    "current_assignment_id": None,
+    "current_assignment_date": None
+}
+_EMPLOYEE_ASSIGNMENT_INC = {"current_assignments_count": 1}
+_EMPLOYEE_NO_ASSETS_SET = {"has_assigned_assets": False}
+
+# Static fields of a new assignment record, copied per assignment and then overlaid
+_ASSIGNMENT_DEFAULTS = {
+    "expected_return_date": None,
+    "assignment_type": "PERMANENT",
+    "condition": "Good",
+    "status": "active",
+    "notes": "",
+    "assigned_by": "",
+    "assigned_by_name": ""
+}
+
+# (record field, payload key) pairs taken from the request when present
+_ASSIGNMENT_PAYLOAD_FIELDS = (
+    ("expected_return_date", "expected_return_date"),
+    ("assignment_type", "assignment_type"),
+    ("condition", "condition"),
+    ("notes", "assignment_notes"),
+    ("assigned_by", "assigned_by"),
+    ("assigned_by_name", "assigned_by_name")
+)
+
+def _history_cache_key(asset_id: str) -> str:
+    """Cache key of an asset's assignment history; dropped whenever one of its assignments changes"""
+    return f"assignments:asset:{asset_id}"
+
+async def _add_current_asset(full_db: AsyncIOMotorDatabase, employee_id: str, asset_id: str, current_asset: Dict[str, Any], current_time: datetime, session=None):
+    """
+    Replace the employee's current_assets entry for an asset and bump assignment counters.
+    
+    The $pull must land before the $addToSet, so both updates go out as one ordered
+    bulk_write (a single round-trip); callers run this alongside the other assignment writes.
+    """
+    result = await full_db.employees.bulk_write([
+        UpdateOne(
+            {"id": employee_id},
+            {
+                "$pull": {
+                    "current_assets": {"id": asset_id}
+                }
+            }
+        ),
+        UpdateOne(
+            {"id": employee_id},
+            {
+                "$set": {
+                    "has_assigned_assets": True,
+                    "last_asset_assigned_date": current_time,
+                    "last_assigned_asset_id": asset_id
+                },
+                "$addToSet": {
+                    "current_assets": current_asset,
+                    "assigned_asset_ids": asset_id
+                },
+                "$inc": _EMPLOYEE_ASSIGNMENT_INC
+            }
+        )
+    ], ordered=True, session=session)
+    logger.info(f"Employee update result - matched: {result.matched_count}, modified: {result.modified_count}")
 
-@router.get("/asset/{asset_id}", response_model=List[AssignmentResponse])
-async def read_assignment_history(asset_id: str, collection: Collection = Depends(get_assignment_history_collection)):
+async def _return_assignment(
+    db: AsyncIOMotorCollection,
+    full_db: AsyncIOMotorDatabase,
+    assignment_id: str,
+    return_fields: Dict[str, Any],
+    session=None,
+    extra_filter: Optional[Dict[str, Any]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Mark an active assignment as returned and free its asset.
+    
+    The lookup and the status change are one find_one_and_update filtered on
+    status "active", so two concurrent unassigns cannot both succeed.
+    
+    Returns:
+        Optional[Dict[str, Any]]: The assignment's asset/employee references, or None if
+        no active assignment with this ID matches extra_filter
+    """
+    assignment_record = await db.find_one_and_update(
+        {"id": assignment_id, "status": "active", **(extra_filter or {})},
+        {"$set": return_fields},
+        projection=ASSIGNMENT_REF_PROJECTION,
+        return_document=ReturnDocument.AFTER,
+        session=session
+    )
+    if assignment_record and assignment_record.get("asset_id"):
+        await full_db.asset_items.update_one(
+            {"id": assignment_record["asset_id"]},
+            {"$set": _ASSET_RETURNED_SET},
+            session=session
+        )
+    return assignment_record
+
+async def _run_writes(session, *writes):
+    """
+    Await write operations, each given as a function of the session.
+    
+    Operations sharing a transaction session must not overlap, so they run in order
+    inside a transaction and concurrently when there is no session.
+    """
+    if session is None:
+        return await asyncio.gather(*(write(None) for write in writes))
+    return [await write(session) for write in writes]
+
+@router.get("/asset/{asset_id}", response_model=List[AssignmentResponse], response_class=ORJSONResponse)
+async def read_assignment_history(asset_id: str, collection: AsyncIOMotorCollection = Depends(get_async_assignment_history_collection)):
     """
     Retrieve the assignment history for a specific asset.
     
+    Entries are streamed from a projected cursor as a JSON array, newest first,
+    instead of being loaded into memory before serialization.
+    
     Args:
         asset_id (str): ID of the asset.
-        collection (Collection): MongoDB assignment history collection, injected via dependency.
+        collection (AsyncIOMotorCollection): MongoDB assignment history collection, injected via dependency.
     
     Returns:
-        List[AssignmentResponse]: List of assignment history entries.
+        StreamingResponse: JSON array of assignment history entries.
     
     Raises:
-        HTTPException: 400 if asset_id is invalid, 404 if asset not found, 500 for server errors.
+        HTTPException: 404 if asset not found, 500 for server errors.
     """
     logger.info(f"Fetching assignment history for asset {asset_id}")
     try:
-        history = get_assignment_history_by_asset(collection, asset_id)
-        if history is None:
+        cache_key = _history_cache_key(asset_id)
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return Response(content=cached, media_type="application/json")
+        
+        generation = cache.generation()
+        asset = await get_async_db().asset_items.find_one({"id": asset_id}, {"_id": 1})
+        if not asset:
             logger.warning(f"Asset not found: {asset_id}")
             raise HTTPException(status_code=404, detail="Asset not found")
-            
-        logger.debug(f"Fetched {len(history)} assignment history entries for asset {asset_id}")
-        return history
-    except ValueError as ve:
-        logger.warning(f"Invalid request: {str(ve)}")
-        raise HTTPException(status_code=400, detail=str(ve))
+        
+        cursor = collection.find({"asset_id": asset_id}, ASSIGNMENT_HISTORY_PROJECTION).sort("assignment_date", -1)
+        return StreamingResponse(cache.cached_stream(cache_key, json_array_stream(cursor), local=True, generation=generation), media_type="application/json")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch assignment history for asset {asset_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch assignment history: {str(e)}")
 
-@router.post("/", response_model=Dict[str, Any])
-async def create_assignment(
-    assignment: Dict[str, Any],
-    db: Collection = Depends(get_assignment_history_collection)
-):
+async def _build_assignment(
+    assignment: AssignmentCreateRequest,
+    full_db: AsyncIOMotorDatabase
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
     """
-    Create a new assignment record.
+    Validate an assignment payload and build the records to store, without writing anything.
     
-    This endpoint matches the base URL expected by the frontend.
-    Assigns an asset to an employee with validation.
+    Args:
+        assignment (AssignmentCreateRequest): Validated assignment payload
+        full_db (AsyncIOMotorDatabase): MongoDB database for asset and employee lookups
+    
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: The assignment record and the employee's current asset entry
+    
+    Raises:
+        HTTPException: 400 if required fields are empty, 404 if the asset or employee is not found
     """
-    print("\n" + "="*50)
-    print("DEBUG: Executing create_assignment in router")
-    print("="*50 + "\n")
+    # Simple validation
+    asset_id = assignment.asset_id
+    assigned_to = assignment.assigned_to
     
-    logger.info(f"Creating new assignment - asset {assignment.get('asset_id')} to {assignment.get('assigned_to')}")
+    if not asset_id or not assigned_to:
+        logger.error(f"Missing required fields: asset_id={asset_id}, assigned_to={assigned_to}")
+        raise HTTPException(status_code=400, detail="Both asset_id and assigned_to (employee_id) are required")
     
-    try:
-        # Get the database for asset and employee collections
-        full_db = get_db()
-        
-        # Simple validation
-        asset_id = assignment.get("asset_id")
-        assigned_to = assignment.get("assigned_to")
-        
-        if not asset_id or not assigned_to:
-            logger.error(f"Missing required fields: asset_id={asset_id}, assigned_to={assigned_to}")
-            raise HTTPException(status_code=400, detail="Both asset_id and assigned_to (employee_id) are required")
-        
-        # Get basic asset and employee info
-        asset = full_db.asset_items.find_one({"id": asset_id})
-        employee = full_db.employees.find_one({"id": assigned_to})
-        
-        if not asset:
-            logger.error(f"Asset not found: {asset_id}")
-            raise HTTPException(status_code=404, detail=f"Asset with ID {asset_id} not found")
-        
-        if not employee:
-            logger.error(f"Employee not found: {assigned_to}")
-            raise HTTPException(status_code=404, detail=f"Employee with ID {assigned_to} not found")
-        
-        # Generate a unique assignment ID
-        assignment_id = generate_uuid()
-        current_time = get_current_datetime()
-        
-        # Create the assignment record
-        assignment_record = {
-            "id": assignment_id,
-            "_id": assignment_id,  # Use same ID for MongoDB _id
-            "asset_id": asset_id,
-            "asset_name": asset.get("name", "Unknown Asset"),
-            "asset_tag": asset.get("asset_tag", ""),
-            "category_id": asset.get("category_id", ""),
-            "category_name": asset.get("category_name", ""),
-            "employee_id": assigned_to,
-            "employee_name": f"{employee.get('first_name', '')} {employee.get('last_name', '')}",
-            "assignment_date": current_time,
-            "expected_return_date": assignment.get("expected_return_date"),
-            "assignment_type": assignment.get("assignment_type", "PERMANENT"),
-            "condition": assignment.get("condition", "Good"),
-            "department": assignment.get("department", employee.get("department", "")),
-            "status": "active",
-            "notes": assignment.get("assignment_notes", ""),
-            "assigned_by": assignment.get("assigned_by", ""),
-            "assigned_by_name": assignment.get("assigned_by_name", ""),
-            "location": assignment.get("location", employee.get("location", "")),
-            "created_at": current_time,
-            "updated_at": current_time
-        }
-        
-        # Insert assignment record
-        db.insert_one(assignment_record)
-        
-        # Update asset status
-        full_db.asset_items.update_one(
+    # Get basic asset and employee info
+    asset, employee = await asyncio.gather(
+        full_db.asset_items.find_one({"id": asset_id}, ASSET_SUMMARY_PROJECTION),
+        full_db.employees.find_one({"id": assigned_to}, EMPLOYEE_SUMMARY_PROJECTION)
+    )
+    
+    if not asset:
+        logger.error(f"Asset not found: {asset_id}")
+        raise HTTPException(status_code=404, detail=f"Asset with ID {asset_id} not found")
+    
+    if not employee:
+        logger.error(f"Employee not found: {assigned_to}")
+        raise HTTPException(status_code=404, detail=f"Employee with ID {assigned_to} not found")
+    
+    # Generate a unique assignment ID
+    assignment_id = generate_uuid()
+    current_time = get_current_datetime()
+    employee_name = employee.get("full_name") or f"{employee.get('first_name', '')} {employee.get('last_name', '')}"
+    
+    # Create the assignment record from the shared defaults
+    assignment_record = _ASSIGNMENT_DEFAULTS.copy()
+    assignment_record.update({
+        "id": assignment_id,
+        "_id": assignment_id,  # Use same ID for MongoDB _id
+        "asset_id": asset_id,
+        "asset_name": asset.get("name", "Unknown Asset"),
+        "asset_tag": asset.get("asset_tag", ""),
+        "category_id": asset.get("category_id", ""),
+        "category_name": asset.get("category_name", ""),
+        "employee_id": assigned_to,
+        "employee_name": employee_name,
+        "assignment_date": current_time,
+        "department": assignment.department if assignment.department is not None else employee.get("department", ""),
+        "location": assignment.location if assignment.location is not None else employee.get("location", ""),
+        "created_at": current_time,
+        "updated_at": current_time
+    })
+    for field, payload_key in _ASSIGNMENT_PAYLOAD_FIELDS:
+        if payload_key in assignment.model_fields_set:
+            assignment_record[field] = getattr(assignment, payload_key)
+    
+    # Create current asset entry
+    current_asset = {
+        "id": asset_id,
+        "name": asset.get("name"),
+        "asset_tag": asset.get("asset_tag"),
+        "category_id": asset.get("category_id"),
+        "category_name": asset.get("category_name"),
+        "assignment_id": assignment_id,
+        "assignment_date": current_time,
+        "status": "active",
+        "department": employee.get("department"),
+        "location": assignment.location or employee.get("location", "")
+    }
+    
+    logger.info(f"Current asset entry to be added: {current_asset}")
+    return assignment_record, current_asset
+
+def _assignment_status_writes(
+    full_db: AsyncIOMotorDatabase,
+    assignment_record: Dict[str, Any],
+    current_asset: Dict[str, Any]
+) -> List[Callable[[Any], Awaitable[Any]]]:
+    """
+    Build the asset and employee status updates for a stored assignment.
+    
+    Args:
+        full_db (AsyncIOMotorDatabase): MongoDB database for asset and employee updates
+        assignment_record (Dict[str, Any]): Assignment record built by _build_assignment
+        current_asset (Dict[str, Any]): Current asset entry for the employee
+    
+    Returns:
+        List[Callable[[Any], Awaitable[Any]]]: Write operations taking the session, for _run_writes
+    """
+    assignment_id = assignment_record["id"]
+    asset_id = assignment_record["asset_id"]
+    assigned_to = assignment_record["employee_id"]
+    employee_name = assignment_record["employee_name"]
+    current_time = assignment_record["assignment_date"]
+    current_time_iso = current_time.isoformat()
+    
+    return [
+        lambda s: full_db.asset_items.update_one(
             {"id": asset_id},
             {
                 "$set": {
-                    "status": "assigned",
-                    "has_active_assignment": True,
+                    **_ASSET_ASSIGNED_SET,
                     "current_assignee_id": assigned_to,
-                    "current_assignee_name": f"{employee.get('first_name', '')} {employee.get('last_name', '')}",
+                    "current_assignee_name": employee_name,
                     "current_assignment_id": assignment_id,
-                    "current_assignment_date": current_time.isoformat()
-                },
-                "$push": {
-                    "assignment_history": {
-                        "id": assignment_id,
-                        "employee_id": assigned_to,
-                        "employee_name": f"{employee.get('first_name', '')} {employee.get('last_name', '')}",
-                        "assignment_date": current_time.isoformat(),
-                        "status": "active"
-                    }
+                    "current_assignment_date": current_time_iso
                 }
-            }
-        )
-        
-        # Update employee status
-        logger.info(f"Starting employee updates for ID: {assigned_to}")
-        
-        # Create current asset entry
-        current_asset = {
-            "id": asset_id,
-            "name": asset.get("name"),
-            "asset_tag": asset.get("asset_tag"),
-            "category_id": asset.get("category_id"),
-            "category_name": asset.get("category_name"),
-            "assignment_id": assignment_id,
-            "assignment_date": current_time,
-            "status": "active",
-            "department": employee.get("department"),
-            "location": assignment.get("location") or employee.get("location", "")
-        }
-        
-        logger.info(f"Current asset entry to be added: {current_asset}")
-        
-        # First remove any existing entries
-        remove_result = full_db.employees.update_one(
-            {"id": assigned_to},
-            {
-                "$pull": {
-                    "current_assets": {"id": asset_id}
-                }
-            }
-        )
-        logger.info(f"Remove result - matched: {remove_result.matched_count}, modified: {remove_result.modified_count}")
-        
-        # Then add the new current asset entry
-        update_result = full_db.employees.update_one(
-            {"id": assigned_to},
-            {
-                "$set": {
-                    "has_assigned_assets": True,
-                    "last_asset_assigned_date": current_time,
-                    "last_assigned_asset_id": asset_id
-                },
-                "$addToSet": {
-                    "current_assets": current_asset,
-                    "assigned_asset_ids": asset_id
-                },
-                "$inc": {
-                    "current_assignments_count": 1
-                }
-            }
-        )
-        logger.info(f"Update result - matched: {update_result.matched_count}, modified: {update_result.modified_count}")
-        
-        # Verify the update
-        after_employee = full_db.employees.find_one({"id": assigned_to})
-        logger.info(f"Employee after update - has_assigned_assets: {after_employee.get('has_assigned_assets')}")
-        logger.info(f"Employee current_assets count: {len(after_employee.get('current_assets', []))}")
-        logger.info(f"Employee current_assets: {after_employee.get('current_assets', [])}")
-        
-        logger.info(f"Successfully created assignment: {assignment_id} for asset {asset_id} to employee {assigned_to}")
-        
-        # Return success response with the assignment record
-        return assignment_record
-        
+            },
+            session=s
+        ),
+        lambda s: _add_current_asset(full_db, assigned_to, asset_id, current_asset, current_time, session=s)
+    ]
+
+async def _create_assignment_impl(
+    assignment: AssignmentCreateRequest,
+    db: AsyncIOMotorCollection,
+    full_db: AsyncIOMotorDatabase
+) -> Dict[str, Any]:
+    """
+    Validate an assignment payload, store it and mark the asset and employee as assigned.
+    
+    Shared by the single and backward-compatible assignment endpoints.
+    
+    Args:
+        assignment (AssignmentCreateRequest): Validated assignment payload
+        db (AsyncIOMotorCollection): MongoDB assignment history collection
+        full_db (AsyncIOMotorDatabase): MongoDB database for asset and employee updates
+    
+    Returns:
+        Dict[str, Any]: The stored assignment record
+    
+    Raises:
+        HTTPException: 400 if required fields are empty, 404 if the asset or employee is not found
+    """
+    assignment_record, current_asset = await _build_assignment(assignment, full_db)
+    assignment_id = assignment_record["id"]
+    asset_id = assignment_record["asset_id"]
+    assigned_to = assignment_record["employee_id"]
+    
+    # Insert the assignment and update asset/employee status in one transaction
+    logger.info(f"Starting employee updates for ID: {assigned_to}")
+    await run_in_transaction(lambda session: _run_writes(
+        session,
+        lambda s: db.insert_one(assignment_record, session=s),
+        *_assignment_status_writes(full_db, assignment_record, current_asset)
+    ))
+    await cache.invalidate(_history_cache_key(asset_id))
+    await invalidate_employee_cache(assigned_to)
+    
+    logger.info(f"Successfully created assignment: {assignment_id} for asset {asset_id} to employee {assigned_to}")
+    
+    # Return success response with the assignment record
+    return assignment_record
+
+@router.post("/", response_model=Dict[str, Any])
+async def create_assignment(
+    assignment: AssignmentCreateRequest,
+    db: AsyncIOMotorCollection = Depends(get_async_assignment_history_collection)
+):
+    """
+    Create a new assignment record.
+    
+    This endpoint matches the base URL expected by the frontend.
+    Assigns an asset to an employee with validation.
+    """
+    logger.info(f"Creating new assignment - asset {assignment.asset_id} to {assignment.assigned_to}")
+    
+    try:
+        return await _create_assignment_impl(assignment, db, get_async_db())
     except HTTPException:
         raise
     except Exception as e:
@@ -212,8 +384,8 @@ async def create_assignment(
 
 @router.post("/bulk", response_model=List[Dict[str, Any]])
 async def create_bulk_assignments(
-    assignments: List[Dict[str, Any]],
-    db: Collection = Depends(get_assignment_history_collection)
+    assignments: List[AssignmentCreateRequest],
+    db: AsyncIOMotorCollection = Depends(get_async_assignment_history_collection)
 ):
     """
     Create multiple assignment records in a single request.
@@ -221,8 +393,8 @@ async def create_bulk_assignments(
     Bulk assigns assets to employees with validation.
     
     Args:
-        assignments (List[Dict[str, Any]]): List of assignment objects
-        db (Collection): MongoDB collection, injected via dependency
+        assignments (List[AssignmentCreateRequest]): List of assignment objects
+        db (AsyncIOMotorCollection): MongoDB collection, injected via dependency
     
     Returns:
         List[Dict[str, Any]]: List of created assignment records
@@ -234,158 +406,56 @@ async def create_bulk_assignments(
     
     created_assignments = []
     errors = []
+    full_db = get_async_db()
+    pending = []
     
+    # Validate and build every record first so the inserts can go out as one batch
     for idx, assignment in enumerate(assignments):
         try:
-            logger.debug(f"Processing assignment {idx+1}/{len(assignments)}: asset {assignment.get('asset_id')} to {assignment.get('assigned_to')}")
-            
-            # Get the database for asset and employee collections
-            full_db = get_db()
-            
-            # Simple validation
-            asset_id = assignment.get("asset_id")
-            assigned_to = assignment.get("assigned_to")
-            
-            if not asset_id or not assigned_to:
-                err_msg = f"Both asset_id and assigned_to (employee_id) are required"
-                logger.error(f"Assignment {idx+1}: {err_msg}")
-                errors.append(f"Assignment {idx+1}: {err_msg}")
-                continue
-            
-            # Get basic asset and employee info
-            asset = full_db.asset_items.find_one({"id": asset_id})
-            employee = full_db.employees.find_one({"id": assigned_to})
-            
-            if not asset:
-                err_msg = f"Asset with ID {asset_id} not found"
-                logger.error(f"Assignment {idx+1}: {err_msg}")
-                errors.append(f"Assignment {idx+1}: {err_msg}")
-                continue
-            
-            if not employee:
-                err_msg = f"Employee with ID {assigned_to} not found"
-                logger.error(f"Assignment {idx+1}: {err_msg}")
-                errors.append(f"Assignment {idx+1}: {err_msg}")
-                continue
-            
-            # Generate a unique assignment ID
-            assignment_id = generate_uuid()
-            current_time = get_current_datetime()
-            
-            # Create the assignment record
-            assignment_record = {
-                "id": assignment_id,
-                "_id": assignment_id,  # Use same ID for MongoDB _id
-                "asset_id": asset_id,
-                "asset_name": asset.get("name", "Unknown Asset"),
-                "asset_tag": asset.get("asset_tag", ""),
-                "category_id": asset.get("category_id", ""),
-                "category_name": asset.get("category_name", ""),
-                "employee_id": assigned_to,
-                "employee_name": f"{employee.get('first_name', '')} {employee.get('last_name', '')}",
-                "assignment_date": current_time,
-                "expected_return_date": assignment.get("expected_return_date"),
-                "assignment_type": assignment.get("assignment_type", "PERMANENT"),
-                "condition": assignment.get("condition", "Good"),
-                "department": assignment.get("department", employee.get("department", "")),
-                "status": "active",
-                "notes": assignment.get("assignment_notes", ""),
-                "assigned_by": assignment.get("assigned_by", ""),
-                "assigned_by_name": assignment.get("assigned_by_name", ""),
-                "location": assignment.get("location", employee.get("location", "")),
-                "created_at": current_time,
-                "updated_at": current_time
-            }
-            
-            # Insert assignment record
-            db.insert_one(assignment_record)
-            
-            # Update asset status
-            full_db.asset_items.update_one(
-                {"id": asset_id},
-                {
-                    "$set": {
-                        "status": "assigned",
-                        "has_active_assignment": True,
-                        "current_assignee_id": assigned_to,
-                        "current_assignee_name": f"{employee.get('first_name', '')} {employee.get('last_name', '')}",
-                        "current_assignment_id": assignment_id,
-                        "current_assignment_date": current_time.isoformat()
-                    },
-                    "$push": {
-                        "assignment_history": {
-                            "id": assignment_id,
-                            "employee_id": assigned_to,
-                            "employee_name": f"{employee.get('first_name', '')} {employee.get('last_name', '')}",
-                            "assignment_date": current_time.isoformat(),
-                            "status": "active"
-                        }
-                    }
-                }
-            )
-            
-            # Update employee status
-            logger.info(f"Starting employee updates for ID: {assigned_to}")
-            
-            # Create current asset entry
-            current_asset = {
-                "id": asset_id,
-                "name": asset.get("name"),
-                "asset_tag": asset.get("asset_tag"),
-                "category_id": asset.get("category_id"),
-                "category_name": asset.get("category_name"),
-                "assignment_id": assignment_id,
-                "assignment_date": current_time,
-                "status": "active",
-                "department": employee.get("department"),
-                "location": assignment.get("location") or employee.get("location", "")
-            }
-            
-            logger.info(f"Current asset entry to be added: {current_asset}")
-            
-            # First remove any existing entries
-            remove_result = full_db.employees.update_one(
-                {"id": assigned_to},
-                {
-                    "$pull": {
-                        "current_assets": {"id": asset_id}
-                    }
-                }
-            )
-            logger.info(f"Remove result - matched: {remove_result.matched_count}, modified: {remove_result.modified_count}")
-            
-            # Then add the new current asset entry
-            update_result = full_db.employees.update_one(
-                {"id": assigned_to},
-                {
-                    "$set": {
-                        "has_assigned_assets": True,
-                        "last_asset_assigned_date": current_time,
-                        "last_assigned_asset_id": asset_id
-                    },
-                    "$addToSet": {
-                        "current_assets": current_asset,
-                        "assigned_asset_ids": asset_id
-                    },
-                    "$inc": {
-                        "current_assignments_count": 1
-                    }
-                }
-            )
-            logger.info(f"Update result - matched: {update_result.matched_count}, modified: {update_result.modified_count}")
-            
-            # Verify the update
-            after_employee = full_db.employees.find_one({"id": assigned_to})
-            logger.info(f"Employee after update - has_assigned_assets: {after_employee.get('has_assigned_assets')}")
-            logger.info(f"Employee current_assets count: {len(after_employee.get('current_assets', []))}")
-            logger.info(f"Employee current_assets: {after_employee.get('current_assets', [])}")
-            
-            logger.info(f"Successfully created assignment {idx+1}: {assignment_id} for asset {asset_id} to employee {assigned_to}")
+            logger.debug(f"Processing assignment {idx+1}/{len(assignments)}: asset {assignment.asset_id} to {assignment.assigned_to}")
+            assignment_record, current_asset = await _build_assignment(assignment, full_db)
+            pending.append((idx, assignment_record, current_asset))
+        except HTTPException as he:
+            logger.error(f"Assignment {idx+1}: {he.detail}")
+            errors.append(f"Assignment {idx+1}: {he.detail}")
+        except Exception as e:
+            logger.error(f"Error creating assignment {idx+1}: {str(e)}", exc_info=True)
+            errors.append(f"Assignment {idx+1}: {str(e)}")
+    
+    # Insert all assignment records at once; unordered so one bad record doesn't stop the rest
+    failed_positions = set()
+    if pending:
+        try:
+            await db.insert_many([record for _, record, _ in pending], ordered=False)
+        except BulkWriteError as bwe:
+            for write_error in bwe.details.get("writeErrors", []):
+                position = write_error["index"]
+                failed_positions.add(position)
+                idx = pending[position][0]
+                logger.error(f"Error inserting assignment {idx+1}: {write_error.get('errmsg')}")
+                errors.append(f"Assignment {idx+1}: {write_error.get('errmsg')}")
+    
+    for position, (idx, assignment_record, current_asset) in enumerate(pending):
+        if position in failed_positions:
+            continue
+        try:
+            await run_in_transaction(lambda session: _run_writes(
+                session,
+                *_assignment_status_writes(full_db, assignment_record, current_asset)
+            ))
+            await cache.invalidate(_history_cache_key(assignment_record["asset_id"]))
+            await invalidate_employee_cache(assignment_record["employee_id"])
+            logger.info(f"Successfully created assignment {idx+1}: {assignment_record['id']}")
             created_assignments.append(assignment_record)
-            
         except Exception as e:
             logger.error(f"Error creating assignment {idx+1}: {str(e)}", exc_info=True)
             errors.append(f"Assignment {idx+1}: {str(e)}")
+            # The record was inserted in the batch above, outside the status transaction;
+            # remove it so no active assignment is left without its asset/employee updates
+            try:
+                await db.delete_one({"_id": assignment_record["_id"]})
+            except Exception as cleanup_error:
+                logger.error(f"Failed to remove orphaned assignment {assignment_record['id']}: {str(cleanup_error)}", exc_info=True)
     
     if errors and not created_assignments:
         # If all assignments failed, return 400 with error details
@@ -400,111 +470,67 @@ async def create_bulk_assignments(
 
 @router.post("/unassign")
 async def unassign_asset(
-    data: Dict[str, Any],
-    db: Collection = Depends(get_assignment_history_collection)
+    data: AssignmentUnassignRequest,
+    db: AsyncIOMotorCollection = Depends(get_async_assignment_history_collection)
 ):
     """
     Simplified asset unassignment function.
     
     Unassigns an asset from an employee with minimal validation to ensure the operation works.
     """
-    logger.info(f"Unassigning asset with assignment ID {data.get('assignment_id')}")
+    logger.info(f"Unassigning asset with assignment ID {data.assignment_id}")
     
     try:
         # Get the database for asset and employee collections
-        full_db = get_db()
+        full_db = get_async_db()
         
         # Simple validation
-        assignment_id = data.get("assignment_id")
+        assignment_id = data.assignment_id
         
         if not assignment_id:
             raise HTTPException(status_code=400, detail="assignment_id is required")
         
-        # Get the assignment record
-        assignment_record = db.find_one({"id": assignment_id})
-        
-        if not assignment_record:
-            raise HTTPException(status_code=404, detail=f"Assignment with ID {assignment_id} not found")
-        
-        # Get asset and employee IDs from the assignment record
-        asset_id = assignment_record.get("asset_id")
-        employee_id = assignment_record.get("employee_id")
-        
         # Get return information
-        return_date = data.get("returned_date", get_current_datetime())
-        if isinstance(return_date, str):
-            return_date = datetime.fromisoformat(return_date.replace("Z", "+00:00"))
+        current_time = get_current_datetime()
+        return_date = data.returned_date or current_time
+        return_date_iso = return_date.isoformat()
         
-        return_notes = data.get("return_notes", "")
-        return_condition = data.get("condition_after", "good")
+        return_notes = data.return_notes or ""
+        return_condition = data.condition_after or data.return_condition or "good"
         
-        # Update assignment record
-        db.update_one(
-            {"id": assignment_id},
+        # Close the active assignment and free the asset in one transaction
+        assignment_record = await run_in_transaction(lambda session: _return_assignment(
+            db,
+            full_db,
+            assignment_id,
             {
-                "$set": {
-                    "status": "returned",
-                    "return_date": return_date,
-                    "return_notes": return_notes,
-                    "return_condition": return_condition,
-                    "updated_at": get_current_datetime()
-                }
-            }
-        )
-        
-        # Update asset status
-        full_db.asset_items.update_one(
-            {"id": asset_id},
-            {
-                "$set": {
-                    "status": "available",
-                    "has_active_assignment": False,
-                    "current_assignee_id": None,
-                    "current_assignee_name": None,
-                    "current_assignment_id": None,
-                    "current_assignment_date": None
-                }
-            }
-        )
+                "status": "returned",
+                "return_date": return_date,
+                "return_notes": return_notes,
+                "return_condition": return_condition,
+                "updated_at": current_time
+            },
+            session=session
+        ))
         
-        # Update assignment history in asset
-        full_db.asset_items.update_one(
-            {"id": asset_id, "assignment_history.id": assignment_id},
-            {
-                "$set": {
-                    "assignment_history.$.status": "returned",
-                    "assignment_history.$.return_date": return_date.isoformat()
-                }
-            }
-        )
+        if not assignment_record:
+            raise HTTPException(status_code=404, detail=f"Active assignment with ID {assignment_id} not found")
         
-        # Update assignment history in employee
-        full_db.employees.update_one(
-            {"id": employee_id, "assignment_history.id": assignment_id},
-            {
-                "$set": {
-                    "assignment_history.$.status": "returned",
-                    "assignment_history.$.return_date": return_date.isoformat()
-                }
-            }
-        )
+        # Get asset and employee IDs from the assignment record
+        asset_id = assignment_record.get("asset_id")
+        employee_id = assignment_record.get("employee_id")
+        await cache.invalidate(_history_cache_key(asset_id))
+        await invalidate_employee_cache(employee_id)
         
-        # Check if the employee has any other assets assigned
-        other_assigned = full_db.asset_items.count_documents({
+        # Check if the employee has any other assets assigned; the first index hit is enough
+        has_other = await full_db.asset_items.find_one({
             "current_assignee_id": employee_id,
             "has_active_assignment": True
-        })
+        }, {"_id": 1}) is not None
         
         # If no other assets are assigned, update the employee's status
-        if other_assigned == 0:
-            full_db.employees.update_one(
-                {"id": employee_id},
-                {
-                    "$set": {
-                        "has_assigned_assets": False
-                    }
-                }
-            )
+        if not has_other:
+            await full_db.employees.update_one({"id": employee_id}, {"$set": _EMPLOYEE_NO_ASSETS_SET})
         
         # Return success response
         return {
@@ -513,7 +539,7 @@ async def unassign_asset(
             "assignment_id": assignment_id,
             "asset_id": asset_id,
             "employee_id": employee_id,
-            "return_date": return_date.isoformat()
+            "return_date": return_date_iso
         }
         
     except HTTPException:
@@ -524,15 +550,15 @@ async def unassign_asset(
 
 @router.post("/unassign/bulk")
 async def unassign_bulk_assets(
-    data_list: List[Dict[str, Any]],
-    db: Collection = Depends(get_assignment_history_collection)
+    data_list: List[AssignmentUnassignRequest],
+    db: AsyncIOMotorCollection = Depends(get_async_assignment_history_collection)
 ):
     """
     Unassign multiple assets in a single request.
     
     Args:
-        data_list (List[Dict[str, Any]]): List of unassignment objects with assignment_id
-        db (Collection): MongoDB collection, injected via dependency
+        data_list (List[AssignmentUnassignRequest]): List of unassignment objects with assignment_id
+        db (AsyncIOMotorCollection): MongoDB collection, injected via dependency
     
     Returns:
         Dict[str, Any]: Result summary with success and error counts
@@ -544,13 +570,14 @@ async def unassign_bulk_assets(
     
     processed_assignments = []
     errors = []
+    affected_employees = set()
     
     for idx, data in enumerate(data_list):
         try:
-            logger.debug(f"Processing unassignment {idx+1}/{len(data_list)}: assignment ID {data.get('assignment_id')}")
+            logger.debug(f"Processing unassignment {idx+1}/{len(data_list)}: assignment ID {data.assignment_id}")
             
             # Simple validation
-            assignment_id = data.get("assignment_id")
+            assignment_id = data.assignment_id
             
             if not assignment_id:
                 err_msg = "assignment_id is required"
@@ -559,13 +586,35 @@ async def unassign_bulk_assets(
                 continue
             
             # Get the database for asset and employee collections
-            full_db = get_db()
+            full_db = get_async_db()
             
-            # Get the assignment record
-            assignment_record = db.find_one({"id": assignment_id})
+            # Get the current time
+            current_time = get_current_datetime()
+            return_date = data.returned_date or current_time
+            return_date_iso = return_date.isoformat()
+            return_notes = data.return_notes or "Unassigned via bulk operation"
+            return_condition = data.return_condition or data.condition_after or "Good"
+            
+            # Close the active assignment and free the asset in one transaction;
+            # has_assigned_assets is settled once for all employees below
+            assignment_record = await run_in_transaction(lambda session: _return_assignment(
+                db,
+                full_db,
+                assignment_id,
+                {
+                    "status": "returned",
+                    "return_date": return_date,
+                    "return_notes": return_notes,
+                    "return_condition": return_condition,
+                    "updated_at": current_time
+                },
+                session=session,
+                extra_filter=_ASSIGNMENT_HAS_REFS_FILTER
+            ))
             
+            # Records missing asset_id or employee_id don't match, so nothing was written for them
             if not assignment_record:
-                err_msg = f"Assignment with ID {assignment_id} not found"
+                err_msg = f"Active assignment with ID {assignment_id} not found or missing asset_id or employee_id"
                 logger.error(f"Unassignment {idx+1}: {err_msg}")
                 errors.append(f"Unassignment {idx+1}: {err_msg}")
                 continue
@@ -574,87 +623,15 @@ async def unassign_bulk_assets(
             asset_id = assignment_record.get("asset_id")
             employee_id = assignment_record.get("employee_id") or assignment_record.get("assigned_to")
             
-            if not asset_id or not employee_id:
-                err_msg = f"Assignment record missing asset_id or employee_id"
-                logger.error(f"Unassignment {idx+1}: {err_msg}")
-                errors.append(f"Unassignment {idx+1}: {err_msg}")
-                continue
-            
-            # Get the current time
-            current_time = get_current_datetime()
-            return_date = data.get("returned_date") or current_time.isoformat()
-            return_notes = data.get("return_notes") or "Unassigned via bulk operation"
-            return_condition = data.get("return_condition") or "Good"
-            
-            # Update the assignment record
-            db.update_one(
-                {"id": assignment_id},
-                {
-                    "$set": {
-                        "status": "returned",
-                        "return_date": return_date,
-                        "return_notes": return_notes,
-                        "return_condition": return_condition,
-                        "updated_at": current_time
-                    }
-                }
-            )
-            
-            # Update the asset document
-            full_db.asset_items.update_one(
-                {"id": asset_id},
-                {
-                    "$set": {
-                        "status": "available",
-                        "has_active_assignment": False,
-                        "current_assignee_id": None,
-                        "current_assignee_name": None,
-                        "current_assignment_id": None
-                    },
-                    "$push": {
-                        "assignment_history": {
-                            "id": assignment_id,
-                            "status": "returned",
-                            "return_date": return_date,
-                            "return_notes": return_notes,
-                            "return_condition": return_condition
-                        }
-                    }
-                }
-            )
-            
-            # Update the employee document - need to check if they have any other active assignments
-            other_active_assignments = db.find(
-                {
-                    "employee_id": employee_id,
-                    "id": {"$ne": assignment_id},
-                    "status": "active"
-                }
-            ).count()
-            
-            update_data = {
-                "$push": {
-                    "assignment_history": {
-                        "id": assignment_id,
-                        "asset_id": asset_id,
-                        "status": "returned",
-                        "return_date": return_date,
-                        "return_notes": return_notes
-                    }
-                }
-            }
-            
-            # Only update has_assigned_assets if this was the last active assignment
-            if other_active_assignments == 0:
-                update_data["$set"] = {"has_assigned_assets": False}
-            
-            full_db.employees.update_one({"id": employee_id}, update_data)
+            await cache.invalidate(_history_cache_key(asset_id))
+            await invalidate_employee_cache(employee_id)
+            affected_employees.add(employee_id)
             
             processed_assignments.append({
                 "assignment_id": assignment_id,
                 "asset_id": asset_id,
                 "employee_id": employee_id,
-                "return_date": return_date,
+                "return_date": return_date_iso,
                 "status": "returned"
             })
             
@@ -664,6 +641,26 @@ async def unassign_bulk_assets(
             logger.error(f"Error unassigning asset {idx+1}: {str(e)}", exc_info=True)
             errors.append(f"Unassignment {idx+1}: {str(e)}")
     
+    if affected_employees:
+        # Clear has_assigned_assets for employees left without any active assignment,
+        # using one aggregate instead of a count per returned item
+        try:
+            pipeline = [
+                {"$match": {"employee_id": {"$in": list(affected_employees)}, "status": "active"}},
+                {"$group": {"_id": "$employee_id", "n": {"$sum": 1}}}
+            ]
+            still_active = {doc["_id"] async for doc in db.aggregate(pipeline)}
+            employee_updates = [
+                UpdateOne({"id": employee_id}, {"$set": _EMPLOYEE_NO_ASSETS_SET})
+                for employee_id in affected_employees
+                if employee_id not in still_active
+            ]
+            if employee_updates:
+                await get_async_db().employees.bulk_write(employee_updates, ordered=False)
+        except Exception as e:
+            logger.error(f"Error updating employee assignment flags: {str(e)}", exc_info=True)
+            errors.append(f"Employee assignment flags: {str(e)}")
+    
     if errors and not processed_assignments:
         # If all unassignments failed, return 400 with error details
         raise HTTPException(status_code=400, detail={"message": "All unassignments failed", "errors": errors})
@@ -685,8 +682,8 @@ async def unassign_bulk_assets(
 
 @router.post("/assign", response_model=Dict[str, Any])
 async def assign_asset(
-    assignment: Dict[str, Any],
-    db: Collection = Depends(get_assignment_history_collection)
+    assignment: AssignmentCreateRequest,
+    db: AsyncIOMotorCollection = Depends(get_async_assignment_history_collection)
 ):
     """
     Assigns an asset to an employee (backward compatibility endpoint).
@@ -695,5 +692,10 @@ async def assign_asset(
     be using /api/assignment-history/assign.
     """
     logger.info(f"Assign endpoint called - redirecting to base endpoint")
-    # Simply call the create_assignment endpoint with the same parameters
-    return await create_assignment(assignment, db)
\ No newline at end of file
+    try:
+        return await _create_assignment_impl(assignment, db, get_async_db())
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating assignment: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to create assignment: {str(e)}")
\ No newline at end of file
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
-from pymongo.database import Database
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from typing import Any, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorCollection
 from pymongo.errors import PyMongoError
-from app.dependencies import get_db
+from app.dependencies import get_async_documents_collection
 from app.models.document import (
     Document,
     DocumentCreate,
@@ -12,8 +13,10 @@ from app.models.document import (
     DocumentStatus
 )
 from app.services import document_service
+from app.streaming import json_array_stream, ndjson_stream
+from app.routers.employees import EMPLOYEE_DETAILS_CACHE_TAG
+from app import cache
 import logging
-from app.dependencies import get_documents_collection
 
 router = APIRouter(
     prefix="/documents",
@@ -22,18 +25,38 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
-@router.get("/", response_model=List[DocumentResponse])
-async def read_documents(
+# Tag set holding every cached document list, dropped on any document write
+DOCUMENT_LIST_CACHE_TAG = "docs:lists"
+
+# Index to force for a filtered listing, by most selective filter first. The planner
+# otherwise tends to pick a poor index when several filters are combined.
+DOCUMENT_FILTER_HINTS = (
+    ("asset_id", "asset_id_1_document_type_1_created_at_-1"),
+    ("employee_id", "employee_id_1_document_type_1_created_at_-1"),
+    ("tags", "tags_1"),
+)
+
+def _document_cache_key(document_id: str) -> str:
+    return f"doc:{document_id}"
+
+async def _invalidate_document_caches(*keys: str) -> None:
+    """Drop cached document lists, the given document keys and cached employee details after a write"""
+    await cache.invalidate(*keys, tag=DOCUMENT_LIST_CACHE_TAG)
+    await cache.invalidate(tag=EMPLOYEE_DETAILS_CACHE_TAG)
+
+def _filter_hint(filters: Dict[str, Any]) -> Optional[str]:
+    return next((index for field, index in DOCUMENT_FILTER_HINTS if field in filters), None)
+
+def document_filters(
     asset_id: Optional[str] = None,
     employee_id: Optional[str] = None,
     document_type: Optional[str] = None,
     status: Optional[str] = None,
     tag: Optional[str] = None,
-    is_confidential: Optional[bool] = None,
-    collection: Database = Depends(get_documents_collection)
-):
+    is_confidential: Optional[bool] = None
+) -> Dict[str, Any]:
     """
-    Get documents with optional filtering.
+    Build the documents query from the listing filters.
     
     Args:
         asset_id: Filter by asset ID
@@ -42,61 +65,130 @@ async def read_documents(
         status: Filter by status
         tag: Filter by tag
         is_confidential: Filter by confidentiality
+        
+    Returns:
+        MongoDB filter for the documents collection
+    """
+    filters = {}
+    if asset_id:
+        filters["asset_id"] = asset_id
+    if employee_id:
+        filters["employee_id"] = employee_id
+    if document_type:
+        filters["document_type"] = document_type
+    if status:
+        filters["status"] = status
+    if tag:
+        filters["tags"] = {"$in": [tag]}
+    if is_confidential is not None:
+        filters["is_confidential"] = is_confidential
+    return filters
+
+@router.get("/", response_model=List[DocumentResponse], response_class=ORJSONResponse)
+async def read_documents(
+    request: Request,
+    filters: Dict[str, Any] = Depends(document_filters),
+    collection: AsyncIOMotorCollection = Depends(get_async_documents_collection)
+):
+    """
+    Get documents with optional filtering.
+    
+    Args:
+        request: Incoming request, for If-None-Match
+        filters: Query built from the asset_id, employee_id, document_type, status, tag
+            and is_confidential query parameters
         collection: Documents collection
         
     Returns:
-        List of DocumentResponse objects
+        List of DocumentResponse objects, or 304 if the client's ETag still matches
     
     Raises:
         HTTPException: If there's an error processing the request
     """
-    logger.info(f"GET /documents/ - asset_id: {asset_id}, employee_id: {employee_id}, document_type: {document_type}")
+    logger.info(f"GET /documents/ - filters: {filters}")
     try:
-        filters = {}
-        if asset_id:
-            filters["asset_id"] = asset_id
-        if employee_id:
-            filters["employee_id"] = employee_id
-        if document_type:
-            filters["document_type"] = document_type
-        if status:
-            filters["status"] = status
-        if tag:
-            filters["tags"] = {"$in": [tag]}
-        if is_confidential is not None:
-            filters["is_confidential"] = is_confidential
-            
-        documents = document_service.get_documents(collection, filters)
-        return documents
+        cache_key = cache.make_key("docs", filters)
+        cached = await cache.get(cache_key)
+        if cached is None:
+            generation = cache.generation()
+            documents = await document_service.get_documents(collection, filters, _filter_hint(filters))
+            cached = cache.encode(documents)
+            await cache.put(cache_key, cached, tag=DOCUMENT_LIST_CACHE_TAG, generation=generation)
+        return cache.json_response(cached, request)
     except Exception as e:
         logger.error(f"Error in read_documents: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/stream")
+async def stream_documents(
+    format: str = Query("ndjson", regex="^(ndjson|json)$"),
+    filters: Dict[str, Any] = Depends(document_filters),
+    collection: AsyncIOMotorCollection = Depends(get_async_documents_collection)
+):
+    """
+    Stream documents matching the listing filters straight from the cursor.
+    
+    Documents are encoded as they arrive instead of being loaded into a list first,
+    so memory stays flat for large listings.
+    
+    Args:
+        format: "ndjson" for one document per line, "json" for a JSON array
+        filters: Same filters as GET /documents/
+        collection: Documents collection
+        
+    Returns:
+        StreamingResponse with the matching documents, newest first
+    
+    Raises:
+        HTTPException: If there's an error processing the request
+    """
+    logger.info(f"GET /documents/stream - format: {format}, filters: {filters}")
+    try:
+        cursor = document_service.find_documents(collection, filters, _filter_hint(filters))
+        if format == "json":
+            return StreamingResponse(json_array_stream(cursor), media_type="application/json")
+        return StreamingResponse(ndjson_stream(cursor), media_type="application/x-ndjson")
+    except Exception as e:
+        logger.error(f"Error in stream_documents: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{document_id}", response_model=Document)
 async def read_document(
     document_id: str,
-    collection: Database = Depends(get_documents_collection)
+    request: Request,
+    collection: AsyncIOMotorCollection = Depends(get_async_documents_collection)
 ):
     """
     Get a specific document by ID.
     
     Args:
         document_id: The document ID
+        request: Incoming request, for If-None-Match
         collection: Documents collection
         
     Returns:
-        Document object
+        Document object, or 304 if the client's ETag still matches
     
     Raises:
         HTTPException: If document not found or there's an error processing the request
     """
     logger.info(f"GET /documents/{document_id}")
     try:
-        document = document_service.get_document_by_id(collection, document_id)
-        if not document:
-            logger.warning(f"Document not found: {document_id}")
-            raise HTTPException(status_code=404, detail="Document not found")
-        return document
+        cache_key = _document_cache_key(document_id)
+        cached = await cache.get(cache_key)
+        if cached is None:
+            async with cache.lock(cache_key):
+                # Another request may have loaded it while we waited
+                cached = await cache.get(cache_key)
+                if cached is None:
+                    generation = cache.generation()
+                    document = await document_service.get_document_by_id(collection, document_id)
+                    if not document:
+                        logger.warning(f"Document not found: {document_id}")
+                        raise HTTPException(status_code=404, detail="Document not found")
+                    cached = cache.encode(document)
+                    await cache.put(cache_key, cached, local=True, generation=generation)
+        return cache.json_response(cached, request)
     except HTTPException:
         raise
     except Exception as e:
@@ -107,7 +199,7 @@ async def read_document(
 async def create_new_document(
     document: DocumentCreate,
     skip_validation: bool = False,
-    collection: Database = Depends(get_documents_collection)
+    collection: AsyncIOMotorCollection = Depends(get_async_documents_collection)
 ):
     """
     Create a new document.
@@ -125,7 +217,8 @@ async def create_new_document(
     """
     logger.info("POST /documents/")
     try:
-        result = document_service.create_document(collection, document, skip_validation)
+        result = await document_service.create_document(collection, document, skip_validation)
+        await _invalidate_document_caches()
         return result
     except ValueError as e:
         logger.warning(f"Validation error in create_new_document: {str(e)}")
@@ -137,11 +230,44 @@ async def create_new_document(
         logger.error(f"Error in create_new_document: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/bulk", response_model=List[Document], status_code=201)
+async def create_bulk_documents(
+    documents: List[DocumentCreate],
+    collection: AsyncIOMotorCollection = Depends(get_async_documents_collection)
+):
+    """
+    Create several documents in one request with a single batched insert.
+    
+    Args:
+        documents: List of document creation data
+        collection: Documents collection
+        
+    Returns:
+        List of created Document objects
+    
+    Raises:
+        HTTPException: If there's an error processing the request or validation fails
+    """
+    logger.info(f"POST /documents/bulk - {len(documents)} documents")
+    try:
+        result = await document_service.create_documents(collection, documents)
+        await _invalidate_document_caches()
+        return result
+    except ValueError as e:
+        logger.warning(f"Validation error in create_bulk_documents: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except PyMongoError as e:
+        logger.error(f"Database error in create_bulk_documents: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail="Database error")
+    except Exception as e:
+        logger.error(f"Error in create_bulk_documents: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.put("/{document_id}", response_model=Document)
 async def update_existing_document(
     document_id: str,
     update: DocumentUpdate,
-    collection: Database = Depends(get_documents_collection)
+    collection: AsyncIOMotorCollection = Depends(get_async_documents_collection)
 ):
     """
     Update an existing document.
@@ -159,10 +285,11 @@ async def update_existing_document(
     """
     logger.info(f"PUT /documents/{document_id}")
     try:
-        result = document_service.update_document(collection, document_id, update)
+        result = await document_service.update_document(collection, document_id, update)
         if not result:
             logger.warning(f"Document not found: {document_id}")
             raise HTTPException(status_code=404, detail="Document not found")
+        await _invalidate_document_caches(_document_cache_key(document_id))
         return result
     except ValueError as e:
         logger.warning(f"Validation error in update_existing_document: {str(e)}")
@@ -170,6 +297,8 @@ async def update_existing_document(
     except PyMongoError as e:
         logger.error(f"Database error in update_existing_document: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Database error")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in update_existing_document: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -177,7 +306,7 @@ async def update_existing_document(
 @router.delete("/{document_id}", status_code=204)
 async def delete_existing_document(
     document_id: str,
-    collection: Database = Depends(get_documents_collection)
+    collection: AsyncIOMotorCollection = Depends(get_async_documents_collection)
 ):
     """
     Delete a document.
@@ -191,13 +320,16 @@ async def delete_existing_document(
     """
     logger.info(f"DELETE /documents/{document_id}")
     try:
-        result = document_service.delete_document(collection, document_id)
+        result = await document_service.delete_document(collection, document_id)
         if not result:
             logger.warning(f"Document not found: {document_id}")
             raise HTTPException(status_code=404, detail="Document not found")
+        await _invalidate_document_caches(_document_cache_key(document_id))
     except PyMongoError as e:
         logger.error(f"Database error in delete_existing_document: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Database error")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in delete_existing_document: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -205,7 +337,7 @@ async def delete_existing_document(
 @router.post("/import", response_model=Document, status_code=201)
 async def import_document(
     document: DocumentCreate,
-    collection: Database = Depends(get_documents_collection)
+    collection: AsyncIOMotorCollection = Depends(get_async_documents_collection)
 ):
     """
     Import a document without strict validation of asset/employee existence.
@@ -224,7 +356,8 @@ async def import_document(
     logger.info("POST /documents/import")
     try:
         # Skip validation of asset and employee references
-        result = document_service.create_document(collection, document, skip_validation=True)
+        result = await document_service.create_document(collection, document, skip_validation=True)
+        await _invalidate_document_caches()
         logger.info(f"Document imported successfully with ID: {result.id}")
         return result
     except ValueError as e:
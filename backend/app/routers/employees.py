@@ -1,8 +1,8 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
-from pymongo.database import Database
+from fastapi import APIRouter, HTTPException, Depends, Request
+from pydantic import BaseModel, TypeAdapter
+from motor.motor_asyncio import AsyncIOMotorCollection
 from typing import List, Optional
-from app.dependencies import get_employees_collection
+from app.dependencies import get_async_employees_collection
 from app.models.employee import Employee, EmployeeCreate, EmployeeUpdate, EmployeeResponse
 from app.models.asset_item import AssetItem
 from app.models.assignment_history import AssignmentResponse
@@ -13,9 +13,11 @@ from app.services.employee_service import (
     get_employees,
     get_employee_by_id,
     get_employee_details,
+    get_employee_statistics,
     update_employee,
     delete_employee
 )
+from app import cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,29 +31,70 @@ class EmployeeDetailsResponse(BaseModel):
 
 router = APIRouter(prefix="/employees", tags=["Employees"])
 
+# Validate each details list in one call instead of one model per row
+_assignment_history_adapter = TypeAdapter(List[AssignmentResponse])
+_current_assets_adapter = TypeAdapter(List[AssetItem])
+_maintenance_history_adapter = TypeAdapter(List[MaintenanceResponse])
+_documents_adapter = TypeAdapter(List[DocumentResponse])
+
+# Statistics and details are read far more often than employees change
+EMPLOYEE_CACHE_TTL_SECONDS = 300
+EMPLOYEE_STATISTICS_CACHE_KEY = "employees:statistics"
+# Tag set holding every cached details entry, for writes that don't know the employee
+EMPLOYEE_DETAILS_CACHE_TAG = "employees:details"
+# Tag set holding every cached listing, dropped on any employee write
+EMPLOYEE_LIST_CACHE_TAG = "employees:lists"
+# Tag set holding every cached single-employee record, for asset writes that don't know the employee
+EMPLOYEE_RECORD_CACHE_TAG = "employees:records"
+
+def employee_cache_key(employee_id: str) -> str:
+    return f"employees:{employee_id}"
+
+def employee_details_cache_key(employee_id: str) -> str:
+    return f"employees:{employee_id}:details"
+
+async def invalidate_employee_cache(employee_id: Optional[str] = None) -> None:
+    """
+    Drop the cached statistics and listings, and the cached record and details of one employee when given.
+    
+    Args:
+        employee_id (Optional[str]): Employee whose details changed
+    """
+    keys = [EMPLOYEE_STATISTICS_CACHE_KEY]
+    if employee_id:
+        keys.extend((employee_cache_key(employee_id), employee_details_cache_key(employee_id)))
+    await cache.invalidate(*keys, tag=EMPLOYEE_LIST_CACHE_TAG)
+
+async def invalidate_employee_asset_caches() -> None:
+    """Drop every cached employee record and details entry after an asset or maintenance write, since both include asset data"""
+    await cache.invalidate(tag=EMPLOYEE_DETAILS_CACHE_TAG)
+    await cache.invalidate(tag=EMPLOYEE_RECORD_CACHE_TAG)
+
 @router.get("/", response_model=List[EmployeeResponse])
 async def read_employees(
+    request: Request,
     department: Optional[str] = None,
     role: Optional[str] = None,
     is_active: Optional[bool] = None,
-    collection: Database = Depends(get_employees_collection)
+    collection: AsyncIOMotorCollection = Depends(get_async_employees_collection)
 ):
     """
     Retrieve all employees with optional filters for department or role.
     
     Args:
+        request (Request): Incoming request, for If-None-Match
         department (Optional[str]): Filter by department
         role (Optional[str]): Filter by role
         is_active (Optional[bool]): Filter by active status
-        collection (Database): MongoDB collection instance, injected via dependency
+        collection (AsyncIOMotorCollection): MongoDB collection instance, injected via dependency
         
     Returns:
-        List[EmployeeResponse]: List of employees matching the filters
+        List[EmployeeResponse]: List of employees matching the filters, or 304 if the client's ETag still matches
         
     Raises:
         HTTPException: 500 for server errors
     """
-    logger.info(f"Fetching employees - department: {department}, role: {role}, is_active: {is_active}")
+    logger.info("Fetching employees - department: %s, role: %s, is_active: %s", department, role, is_active)
     try:
         filters = {}
         if department:
@@ -61,21 +104,58 @@ async def read_employees(
         if is_active is not None:
             filters["is_active"] = is_active
             
-        employees = get_employees(collection, filters)
-        logger.debug(f"Fetched {len(employees)} employees")
-        return employees
+        # Unchanged repeat requests (dashboard polling) are answered from the in-process
+        # tier without touching Redis or MongoDB, or with a 304 via the ETag
+        cache_key = cache.make_key("employees:list", filters)
+        cached = await cache.get(cache_key)
+        if cached is None:
+            generation = cache.generation()
+            employees = await get_employees(collection, filters)
+            logger.debug("Fetched %s employees", len(employees))
+            cached = cache.encode(employees)
+            await cache.put(cache_key, cached, tag=EMPLOYEE_LIST_CACHE_TAG, local=True, ttl=EMPLOYEE_CACHE_TTL_SECONDS, generation=generation)
+        return cache.json_response(cached, request)
     except Exception as e:
         logger.error(f"Failed to fetch employees: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch employees: {str(e)}")
 
+@router.get("/statistics", response_model=dict)
+async def read_employee_statistics(request: Request, collection: AsyncIOMotorCollection = Depends(get_async_employees_collection)):
+    """
+    Retrieve employee statistics (totals, active, with assets, per department).
+    
+    Args:
+        request (Request): Incoming request, for If-None-Match
+        collection (AsyncIOMotorCollection): MongoDB collection instance, injected via dependency
+        
+    Returns:
+        dict: Employee statistics
+        
+    Raises:
+        HTTPException: 500 for server errors
+    """
+    logger.info("Fetching employee statistics")
+    try:
+        cached = await cache.get(EMPLOYEE_STATISTICS_CACHE_KEY)
+        if cached is None:
+            generation = cache.generation()
+            stats = await get_employee_statistics(collection)
+            cached = cache.encode(stats)
+            await cache.put(EMPLOYEE_STATISTICS_CACHE_KEY, cached, ttl=EMPLOYEE_CACHE_TTL_SECONDS, generation=generation)
+        return cache.json_response(cached, request)
+    except Exception as e:
+        logger.error(f"Failed to fetch employee statistics: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to fetch employee statistics: {str(e)}")
+
 @router.get("/{employee_id}", response_model=Employee)
-async def read_employee(employee_id: str, collection: Database = Depends(get_employees_collection)):
+async def read_employee(employee_id: str, request: Request, collection: AsyncIOMotorCollection = Depends(get_async_employees_collection)):
     """
     Retrieve a specific employee by ID.
     
     Args:
         employee_id (str): Employee ID
-        collection (Database): MongoDB collection instance, injected via dependency
+        request (Request): Incoming request, for If-None-Match
+        collection (AsyncIOMotorCollection): MongoDB collection instance, injected via dependency
         
     Returns:
         Employee: Employee details
@@ -83,15 +163,27 @@ async def read_employee(employee_id: str, collection: Database = Depends(get_emp
     Raises:
         HTTPException: 404 if employee not found, 400 for invalid ID, 500 for server errors
     """
-    logger.info(f"Fetching employee with ID: {employee_id}")
+    logger.info("Fetching employee with ID: %s", employee_id)
     try:
-        employee = get_employee_by_id(collection, employee_id)
-        if not employee:
-            logger.warning(f"Employee not found: {employee_id}")
-            raise HTTPException(status_code=404, detail="Employee not found")
-            
-        logger.debug(f"Found employee: {employee.employee_id}")
-        return employee
+        # Detail pages fetch the same employee several times in a row; keep it in-process briefly
+        cache_key = employee_cache_key(employee_id)
+        cached = await cache.get(cache_key)
+        if cached is None:
+            async with cache.lock(cache_key):
+                cached = await cache.get(cache_key)
+                if cached is None:
+                    generation = cache.generation()
+                    employee = await get_employee_by_id(collection, employee_id)
+                    if not employee:
+                        logger.warning(f"Employee not found: {employee_id}")
+                        raise HTTPException(status_code=404, detail="Employee not found")
+                    
+                    logger.debug("Found employee: %s", employee.employee_id)
+                    cached = cache.encode(Employee(**employee.model_dump()))
+                    await cache.put(cache_key, cached, tag=EMPLOYEE_RECORD_CACHE_TAG, local=True, generation=generation)
+        return cache.json_response(cached, request)
+    except HTTPException:
+        raise
     except ValueError as ve:
         logger.warning(f"Invalid employee ID: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
@@ -100,13 +192,14 @@ async def read_employee(employee_id: str, collection: Database = Depends(get_emp
         raise HTTPException(status_code=500, detail=f"Failed to fetch employee: {str(e)}")
 
 @router.get("/{employee_id}/details", response_model=EmployeeDetailsResponse)
-async def read_employee_details(employee_id: str, collection: Database = Depends(get_employees_collection)):
+async def read_employee_details(employee_id: str, request: Request, collection: AsyncIOMotorCollection = Depends(get_async_employees_collection)):
     """
     Retrieve detailed employee information including current assets, assignment history, maintenance history, and documents.
     
     Args:
         employee_id (str): Employee ID
-        collection (Database): MongoDB collection instance, injected via dependency
+        request (Request): Incoming request, for If-None-Match
+        collection (AsyncIOMotorCollection): MongoDB collection instance, injected via dependency
         
     Returns:
         EmployeeDetailsResponse: Detailed employee information
@@ -114,18 +207,24 @@ async def read_employee_details(employee_id: str, collection: Database = Depends
     Raises:
         HTTPException: 404 if employee not found, 400 for invalid ID, 500 for server errors
     """
-    logger.info(f"Fetching employee details for ID: {employee_id}")
+    logger.info("Fetching employee details for ID: %s", employee_id)
     try:
-        details = get_employee_details(collection, employee_id)
+        cache_key = employee_details_cache_key(employee_id)
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            return cache.json_response(cached, request)
+        
+        generation = cache.generation()
+        details = await get_employee_details(collection, employee_id)
         if not details:
             logger.warning(f"Employee not found: {employee_id}")
             raise HTTPException(status_code=404, detail="Employee not found")
         
         employee = Employee(**details["employee"])
-        current_assets = [AssetItem(**asset) for asset in details["current_assets"]]
-        assignment_history = [AssignmentResponse(**entry) for entry in details["assignment_history"]]
-        maintenance_history = [MaintenanceResponse(**entry) for entry in details["maintenance_history"]]
-        documents = [DocumentResponse(**doc) for doc in details["documents"]]
+        current_assets = _current_assets_adapter.validate_python(details["current_assets"])
+        assignment_history = _assignment_history_adapter.validate_python(details["assignment_history"])
+        maintenance_history = _maintenance_history_adapter.validate_python(details["maintenance_history"])
+        documents = _documents_adapter.validate_python(details["documents"])
         
         response = EmployeeDetailsResponse(
             employee=employee,
@@ -135,23 +234,27 @@ async def read_employee_details(employee_id: str, collection: Database = Depends
             documents=documents
         )
         
-        logger.debug(f"Fetched employee details for ID: {employee_id}")
-        return response
+        logger.debug("Fetched employee details for ID: %s", employee_id)
+        cached = cache.encode(response)
+        await cache.put(cache_key, cached, tag=EMPLOYEE_DETAILS_CACHE_TAG, ttl=EMPLOYEE_CACHE_TTL_SECONDS, generation=generation)
+        return cache.json_response(cached, request)
     except ValueError as ve:
         logger.warning(f"Invalid employee ID: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch employee details {employee_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch employee details: {str(e)}")
 
 @router.post("/", response_model=EmployeeResponse)
-async def create_new_employee(employee: EmployeeCreate, collection: Database = Depends(get_employees_collection)):
+async def create_new_employee(employee: EmployeeCreate, collection: AsyncIOMotorCollection = Depends(get_async_employees_collection)):
     """
     Create a new employee.
     
     Args:
         employee (EmployeeCreate): Employee details
-        collection (Database): MongoDB collection instance, injected via dependency
+        collection (AsyncIOMotorCollection): MongoDB collection instance, injected via dependency
         
     Returns:
         EmployeeResponse: Created employee details
@@ -159,10 +262,11 @@ async def create_new_employee(employee: EmployeeCreate, collection: Database = D
     Raises:
         HTTPException: 400 for validation errors, 500 for server errors
     """
-    logger.info(f"Creating employee: {employee.employee_id}")
+    logger.info("Creating employee: %s", employee.employee_id)
     try:
-        created_employee = create_employee(collection, employee)
-        logger.debug(f"Created employee with ID: {created_employee.id}")
+        created_employee = await create_employee(collection, employee)
+        await invalidate_employee_cache()
+        logger.debug("Created employee with ID: %s", created_employee.id)
         return created_employee
     except ValueError as ve:
         logger.warning(f"Failed to create employee: {str(ve)}")
@@ -172,13 +276,13 @@ async def create_new_employee(employee: EmployeeCreate, collection: Database = D
         raise HTTPException(status_code=500, detail=f"Failed to create employee: {str(e)}")
 
 @router.post("/bulk", response_model=List[EmployeeResponse])
-async def create_bulk_employees(employees: List[EmployeeCreate], collection: Database = Depends(get_employees_collection)):
+async def create_bulk_employees(employees: List[EmployeeCreate], collection: AsyncIOMotorCollection = Depends(get_async_employees_collection)):
     """
     Create multiple employees in a single request.
     
     Args:
         employees (List[EmployeeCreate]): List of employees to create
-        collection (Database): MongoDB collection instance, injected via dependency
+        collection (AsyncIOMotorCollection): MongoDB collection instance, injected via dependency
         
     Returns:
         List[EmployeeResponse]: List of created employees
@@ -186,17 +290,20 @@ async def create_bulk_employees(employees: List[EmployeeCreate], collection: Dat
     Raises:
         HTTPException: 400 for validation errors, 500 for server errors
     """
-    logger.info(f"Creating {len(employees)} employees in bulk")
+    logger.info("Creating %s employees in bulk", len(employees))
     
     created_employees = []
     errors = []
     
     for idx, employee in enumerate(employees):
         try:
-            logger.debug(f"Creating employee {idx+1}/{len(employees)}: {employee.employee_id}")
-            created_employee = create_employee(collection, employee)
+            logger.debug("Creating employee %s/%s: %s", idx + 1, len(employees), employee.employee_id)
+            created_employee = await create_employee(collection, employee)
             created_employees.append(created_employee)
-            logger.debug(f"Successfully created employee: {created_employee.id}")
+            logger.debug("Successfully created employee: %s", created_employee.id)
+        except ValueError as ve:
+            logger.warning(f"Failed to create employee {idx+1}: {str(ve)}")
+            errors.append(f"Employee {idx+1} ({employee.employee_id}): {str(ve)}")
         except Exception as e:
             logger.error(f"Failed to create employee {idx+1}: {str(e)}", exc_info=True)
             errors.append(f"Employee {idx+1} ({employee.employee_id}): {str(e)}")
@@ -205,22 +312,24 @@ async def create_bulk_employees(employees: List[EmployeeCreate], collection: Dat
         # If all employees failed, return 400 with error details
         raise HTTPException(status_code=400, detail={"message": "All employees failed to create", "errors": errors})
     
+    await invalidate_employee_cache()
+    
     if errors:
         # If some employees failed but others succeeded, log the errors
         logger.warning(f"Some employees failed to create: {errors}")
     
-    logger.info(f"Successfully created {len(created_employees)} out of {len(employees)} employees")
+    logger.info("Successfully created %s out of %s employees", len(created_employees), len(employees))
     return created_employees
 
 @router.put("/{employee_id}", response_model=EmployeeResponse)
-async def update_existing_employee(employee_id: str, employee: EmployeeUpdate, collection: Database = Depends(get_employees_collection)):
+async def update_existing_employee(employee_id: str, employee: EmployeeUpdate, collection: AsyncIOMotorCollection = Depends(get_async_employees_collection)):
     """
     Update an existing employee.
     
     Args:
         employee_id (str): Employee ID to update
         employee (EmployeeUpdate): Updated employee details
-        collection (Database): MongoDB collection instance, injected via dependency
+        collection (AsyncIOMotorCollection): MongoDB collection instance, injected via dependency
         
     Returns:
         EmployeeResponse: Updated employee details
@@ -228,30 +337,33 @@ async def update_existing_employee(employee_id: str, employee: EmployeeUpdate, c
     Raises:
         HTTPException: 404 if employee not found, 400 for validation errors, 500 for server errors
     """
-    logger.info(f"Updating employee with ID: {employee_id}")
+    logger.info("Updating employee with ID: %s", employee_id)
     try:
-        updated_employee = update_employee(collection, employee_id, employee)
+        updated_employee = await update_employee(collection, employee_id, employee)
         if not updated_employee:
             logger.warning(f"Employee not found: {employee_id}")
             raise HTTPException(status_code=404, detail="Employee not found")
+        await invalidate_employee_cache(employee_id)
             
-        logger.debug(f"Updated employee: {updated_employee.employee_id}")
+        logger.debug("Updated employee: %s", updated_employee.employee_id)
         return updated_employee
     except ValueError as ve:
         logger.warning(f"Failed to update employee: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to update employee {employee_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to update employee: {str(e)}")
 
 @router.delete("/{employee_id}", response_model=dict)
-async def delete_existing_employee(employee_id: str, collection: Database = Depends(get_employees_collection)):
+async def delete_existing_employee(employee_id: str, collection: AsyncIOMotorCollection = Depends(get_async_employees_collection)):
     """
     Delete an employee if no assets are assigned.
     
     Args:
         employee_id (str): Employee ID to delete
-        collection (Database): MongoDB collection instance, injected via dependency
+        collection (AsyncIOMotorCollection): MongoDB collection instance, injected via dependency
         
     Returns:
         dict: Success message
@@ -259,18 +371,21 @@ async def delete_existing_employee(employee_id: str, collection: Database = Depe
     Raises:
         HTTPException: 404 if employee not found, 400 if employee has assets, 500 for server errors
     """
-    logger.info(f"Deleting employee with ID: {employee_id}")
+    logger.info("Deleting employee with ID: %s", employee_id)
     try:
-        deleted = delete_employee(collection, employee_id)
+        deleted = await delete_employee(collection, employee_id)
         if not deleted:
             logger.warning(f"Employee not found: {employee_id}")
             raise HTTPException(status_code=404, detail="Employee not found")
+        await invalidate_employee_cache(employee_id)
             
-        logger.debug(f"Deleted employee ID: {employee_id}")
+        logger.debug("Deleted employee ID: %s", employee_id)
         return {"message": "Employee deleted successfully"}
     except ValueError as ve:
         logger.warning(f"Cannot delete employee: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to delete employee {employee_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to delete employee: {str(e)}")
\ No newline at end of file
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from fastapi.responses import StreamingResponse
+from motor.motor_asyncio import AsyncIOMotorCollection
 from pymongo.database import Database
-from typing import List
-from app.dependencies import get_db, get_maintenance_history_collection
+from typing import List, Optional
+from app.dependencies import get_db, get_maintenance_history_collection, get_async_maintenance_history_collection
 from app.models.asset_item import AssetItem
 from app.models.maintenance_history import (
     MaintenanceHistoryEntry, 
@@ -9,12 +11,18 @@ from app.models.maintenance_history import (
     MaintenanceUpdate, 
     MaintenanceResponse
 )
+from app import cache
+from app.routers.employees import invalidate_employee_asset_caches
+from app.streaming import json_array_stream, ndjson_stream
 from app.services.maintenance_history_service import (
     request_maintenance,
+    request_maintenance_bulk,
     update_maintenance_status,
     get_maintenance_history_by_asset,
-    get_all_maintenance_history
+    get_all_maintenance_history,
+    find_maintenance_history
 )
+import anyio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,7 +30,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/maintenance-history", tags=["Maintenance History"])
 
 @router.post("", response_model=MaintenanceHistoryEntry)
-async def create_maintenance_history(maintenance: MaintenanceHistoryEntry, db: Database = Depends(get_db)):
+def create_maintenance_history(maintenance: MaintenanceHistoryEntry, db: Database = Depends(get_db)):
     """
     Create a new maintenance history entry.
     
@@ -35,13 +43,10 @@ async def create_maintenance_history(maintenance: MaintenanceHistoryEntry, db: D
     """
     logger.info(f"Creating maintenance history entry for asset {maintenance.asset_id}")
     try:
-        # Insert the new maintenance history entry
-        result = db.maintenance_history.insert_one(maintenance.model_dump(exclude_unset=True))
-        
-        # Return the created entry
-        created_entry = db.maintenance_history.find_one({"_id": result.inserted_id})
-        if not created_entry:
-            raise HTTPException(status_code=404, detail="Failed to retrieve created maintenance entry")
+        # Insert the new maintenance history entry; the stored fields are exactly entry_dict,
+        # so the response is built from it instead of reading the entry back
+        entry_dict = maintenance.model_dump(exclude_unset=True)
+        db.maintenance_history.insert_one(dict(entry_dict))
         
         # Update the maintenance count in the corresponding asset item
         db.asset_items.update_one(
@@ -50,7 +55,9 @@ async def create_maintenance_history(maintenance: MaintenanceHistoryEntry, db: D
         )
         
         logger.debug(f"Maintenance history entry created for asset {maintenance.asset_id}")
-        return MaintenanceHistoryEntry(**created_entry)
+        # Handlers here run in the threadpool, so the async invalidation is run on the event loop
+        anyio.from_thread.run(invalidate_employee_asset_caches)
+        return MaintenanceHistoryEntry(**entry_dict)
     except ValueError as ve:
         logger.warning(f"Invalid request: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
@@ -59,7 +66,7 @@ async def create_maintenance_history(maintenance: MaintenanceHistoryEntry, db: D
         raise HTTPException(status_code=500, detail=f"Failed to create maintenance history: {str(e)}")
 
 @router.get("/asset/{asset_id}", response_model=List[MaintenanceResponse])
-async def read_maintenance_history(asset_id: str, collection: Database = Depends(get_maintenance_history_collection)):
+def read_maintenance_history(asset_id: str, collection: Database = Depends(get_maintenance_history_collection)):
     """
     Retrieve the maintenance history for a specific asset.
     
@@ -85,12 +92,14 @@ async def read_maintenance_history(asset_id: str, collection: Database = Depends
     except ValueError as ve:
         logger.warning(f"Invalid request: {str(ve)}")
         raise HTTPException(status_code=400, detail=str(ve))
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to fetch maintenance history for asset {asset_id}: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to fetch maintenance history: {str(e)}")
 
 @router.post("/request", response_model=AssetItem)
-async def request_asset_maintenance(maintenance: MaintenanceCreate, collection: Database = Depends(get_maintenance_history_collection)):
+def request_asset_maintenance(maintenance: MaintenanceCreate, collection: Database = Depends(get_maintenance_history_collection)):
     """
     Request maintenance for an asset, updating its status and history.
     
@@ -105,6 +114,7 @@ async def request_asset_maintenance(maintenance: MaintenanceCreate, collection:
     try:
         updated_asset = request_maintenance(collection, maintenance)
         logger.debug(f"Maintenance requested for asset {maintenance.asset_id}")
+        anyio.from_thread.run(invalidate_employee_asset_caches)
         return updated_asset
     except ValueError as ve:
         logger.warning(f"Failed to request maintenance: {str(ve)}")
@@ -114,7 +124,7 @@ async def request_asset_maintenance(maintenance: MaintenanceCreate, collection:
         raise HTTPException(status_code=500, detail=f"Failed to request maintenance: {str(e)}")
 
 @router.post("/request/bulk", response_model=List[AssetItem])
-async def request_bulk_maintenance(maintenances: List[MaintenanceCreate], collection: Database = Depends(get_maintenance_history_collection)):
+def request_bulk_maintenance(maintenances: List[MaintenanceCreate], collection: Database = Depends(get_maintenance_history_collection)):
     """
     Request maintenance for multiple assets in a single request.
     
@@ -130,18 +140,16 @@ async def request_bulk_maintenance(maintenances: List[MaintenanceCreate], collec
     """
     logger.info(f"Requesting maintenance for {len(maintenances)} assets in bulk")
     
-    updated_assets = []
-    errors = []
+    try:
+        updated_assets, failures = request_maintenance_bulk(collection, maintenances)
+    except Exception as e:
+        logger.error(f"Failed to request bulk maintenance: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to request maintenance: {str(e)}")
     
-    for idx, maintenance in enumerate(maintenances):
-        try:
-            logger.debug(f"Processing maintenance request {idx+1}/{len(maintenances)}: asset {maintenance.asset_id}")
-            updated_asset = request_maintenance(collection, maintenance)
-            updated_assets.append(updated_asset)
-            logger.debug(f"Successfully requested maintenance for asset: {maintenance.asset_id}")
-        except Exception as e:
-            logger.error(f"Failed to request maintenance {idx+1}: {str(e)}", exc_info=True)
-            errors.append(f"Maintenance {idx+1} (Asset {maintenance.asset_id}): {str(e)}")
+    errors = [
+        f"Maintenance {idx+1} (Asset {maintenances[idx].asset_id}): {message}"
+        for idx, message in failures
+    ]
     
     if errors and not updated_assets:
         # If all maintenance requests failed, return 400 with error details
@@ -152,10 +160,11 @@ async def request_bulk_maintenance(maintenances: List[MaintenanceCreate], collec
         logger.warning(f"Some maintenance requests failed: {errors}")
     
     logger.info(f"Successfully requested maintenance for {len(updated_assets)} out of {len(maintenances)} assets")
+    anyio.from_thread.run(invalidate_employee_asset_caches)
     return updated_assets
 
 @router.post("/update", response_model=AssetItem)
-async def update_maintenance(update: MaintenanceUpdate, collection: Database = Depends(get_maintenance_history_collection)):
+def update_maintenance(update: MaintenanceUpdate, collection: Database = Depends(get_maintenance_history_collection)):
     """
     Update maintenance status, updating asset status and history.
     
@@ -170,6 +179,7 @@ async def update_maintenance(update: MaintenanceUpdate, collection: Database = D
     try:
         updated_asset = update_maintenance_status(collection, update)
         logger.debug(f"Maintenance updated for asset")
+        anyio.from_thread.run(invalidate_employee_asset_caches)
         return updated_asset
     except ValueError as ve:
         logger.warning(f"Failed to update maintenance: {str(ve)}")
@@ -179,24 +189,73 @@ async def update_maintenance(update: MaintenanceUpdate, collection: Database = D
         raise HTTPException(status_code=500, detail=f"Failed to update maintenance: {str(e)}")
 
 @router.get("", response_model=List[MaintenanceResponse])
-async def read_all_maintenance_history(collection: Database = Depends(get_maintenance_history_collection)):
+def read_all_maintenance_history(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    after: Optional[str] = None,
+    collection: Database = Depends(get_maintenance_history_collection)
+):
     """
-    Retrieve all maintenance history entries.
+    Retrieve maintenance history entries, newest first.
+    
+    Without `limit` the whole history is returned. With it, entries come one page at a time
+    and the cursor for the next page is sent in the X-Next-Cursor header; pass it back as `after`.
     
     Args:
+        request (Request): Incoming request, for If-None-Match
+        limit (Optional[int]): Maximum number of entries to return; all of them when omitted
+        after (Optional[str]): Cursor from the previous page's X-Next-Cursor header
         collection (Database): MongoDB maintenance history collection, injected via dependency.
     
     Returns:
-        List[MaintenanceResponse]: List of all maintenance history entries.
+        List[MaintenanceResponse]: The maintenance history entries (one page when limited), or 304 if the client's ETag still matches.
     
     Raises:
-        HTTPException: 500 for server errors.
+        HTTPException: 400 for an invalid cursor, 500 for server errors.
     """
-    logger.info("Fetching all maintenance history entries")
+    logger.info(f"Fetching maintenance history entries - limit: {limit}, after: {after}")
     try:
-        history = get_all_maintenance_history(collection)
+        history, next_cursor = get_all_maintenance_history(collection, limit, after)
         logger.debug(f"Fetched {len(history)} maintenance history entries")
-        return history
+        response = cache.json_response(cache.encode(history), request)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+        return response
+    except ValueError as ve:
+        logger.warning(f"Invalid maintenance history cursor: {str(ve)}")
+        raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"Failed to fetch maintenance history: {str(e)}", exc_info=True)
-        raise HTTPException(status_code=500, detail=f"Failed to fetch maintenance history: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to fetch maintenance history: {str(e)}")
+
+
+@router.get("/stream")
+async def stream_all_maintenance_history(
+    format: str = Query("ndjson", regex="^(ndjson|json)$"),
+    collection: AsyncIOMotorCollection = Depends(get_async_maintenance_history_collection)
+):
+    """
+    Stream the whole maintenance history straight from the cursor, for exports.
+    
+    Entries are encoded as they arrive instead of being loaded into a list first,
+    so memory stays flat however long the history is.
+    
+    Args:
+        format (str): "ndjson" for one entry per line, "json" for a JSON array
+        collection (AsyncIOMotorCollection): MongoDB maintenance history collection, injected via dependency.
+    
+    Returns:
+        StreamingResponse: The stored maintenance history entries, newest first.
+    
+    Raises:
+        HTTPException: 500 for server errors.
+    """
+    logger.info(f"Streaming maintenance history entries - format: {format}")
+    try:
+        cursor = find_maintenance_history(collection)
+        if format == "json":
+            return StreamingResponse(json_array_stream(cursor), media_type="application/json")
+        return StreamingResponse(ndjson_stream(cursor), media_type="application/x-ndjson")
+    except Exception as e:
+        logger.error(f"Failed to stream maintenance history: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=f"Failed to stream maintenance history: {str(e)}")
@@ -1,5 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi import Request as HTTPRequest
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
+from motor.motor_asyncio import AsyncIOMotorCollection
 from pymongo.database import Database
 from pymongo.collection import Collection
 from pymongo.errors import PyMongoError
@@ -12,12 +15,15 @@ from app.models.request_approval import (
     RequestType,
     RequestStatus,
     RequestPriority,
-    RequestComment
+    RequestComment,
+    ApprovalDecision
 )
 from app.services import request_service
+from app.streaming import json_array_stream, ndjson_stream
+from app import cache
 import logging
 from datetime import datetime
-from app.dependencies import get_requests_collection
+from app.dependencies import get_requests_collection, get_async_requests_collection
 
 router = APIRouter(
     prefix="/requests",
@@ -26,19 +32,23 @@ router = APIRouter(
 
 logger = logging.getLogger(__name__)
 
-@router.get("/", response_model=List[RequestResponse])
-async def read_requests(
+def _request_cache_key(request_id: str) -> str:
+    return f"request:{request_id}"
+
+def request_filters(
     request_type: Optional[str] = None,
     status: Optional[str] = None,
     priority: Optional[str] = None,
     requester_id: Optional[str] = None,
     asset_id: Optional[str] = None,
     created_after: Optional[str] = None,
-    created_before: Optional[str] = None,
-    collection: Collection = Depends(get_requests_collection)
-):
+    created_before: Optional[str] = None
+) -> Dict[str, Any]:
     """
-    Get requests with optional filtering.
+    Collect the request listing filters.
+    
+    Query parameters are passed under their own names; the service maps them to
+    document fields and turns created_after/created_before into a created_at range.
     
     Args:
         request_type: Filter by request type
@@ -48,46 +58,104 @@ async def read_requests(
         asset_id: Filter by associated asset ID
         created_after: Filter by creation date (after this date)
         created_before: Filter by creation date (before this date)
+        
+    Returns:
+        Filters for request_service.get_requests/find_requests
+    """
+    return {
+        name: value
+        for name, value in (
+            ("request_type", request_type),
+            ("status", status),
+            ("priority", priority),
+            ("requester_id", requester_id),
+            ("asset_id", asset_id),
+            ("created_after", created_after),
+            ("created_before", created_before)
+        )
+        if value
+    }
+
+@router.get("/", response_model=List[RequestResponse])
+async def read_requests(
+    response: Response,
+    filters: Dict[str, Any] = Depends(request_filters),
+    limit: int = Query(50, ge=1, le=500),
+    after: Optional[str] = None,
+    collection: Collection = Depends(get_requests_collection)
+):
+    """
+    Get requests with optional filtering, most recent first, one page at a time.
+    
+    The cursor for the next page is sent in the X-Next-Cursor header; pass it back as `after`.
+    
+    Args:
+        response: Outgoing response, for the X-Next-Cursor header
+        filters: Filters built from the request_type, status, priority, requester_id,
+            asset_id, created_after and created_before query parameters
+        limit: Maximum number of requests to return
+        after: Cursor from the previous page's X-Next-Cursor header
         collection: Requests collection
         
     Returns:
-        List of RequestResponse objects
+        One page of RequestResponse objects
     
     Raises:
-        HTTPException: If there's an error processing the request
+        HTTPException: 400 for an invalid cursor or date, or if there's an error processing the request
     """
-    logger.info(f"GET /requests/ - type: {request_type}, status: {status}, priority: {priority}")
+    logger.info(f"GET /requests/ - filters: {filters}")
     try:
-        filters = {}
-        if request_type:
-            filters["request_type"] = request_type
-        if status:
-            filters["status"] = status
-        if priority:
-            filters["priority"] = priority
-        if requester_id:
-            filters["requester_id"] = requester_id
-        if asset_id:
-            filters["asset_id"] = asset_id
-            
-        # Date range filters
-        date_filter = {}
-        if created_after:
-            date_filter["$gte"] = created_after
-        if created_before:
-            date_filter["$lte"] = created_before
-        if date_filter:
-            filters["created_at"] = date_filter
-            
-        requests = request_service.get_requests(collection, filters)
+        requests, next_cursor = request_service.get_requests(collection, filters, limit, after)
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
         return requests
+    except ValueError as e:
+        logger.warning(f"Invalid filter in read_requests: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Error in read_requests: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/stream")
+async def stream_requests(
+    format: str = Query("ndjson", regex="^(ndjson|json)$"),
+    filters: Dict[str, Any] = Depends(request_filters),
+    collection: AsyncIOMotorCollection = Depends(get_async_requests_collection)
+):
+    """
+    Stream every request matching the listing filters straight from the cursor.
+    
+    Requests are encoded as they arrive instead of being loaded into a list first,
+    so memory stays flat for large exports.
+    
+    Args:
+        format: "ndjson" for one request per line, "json" for a JSON array
+        filters: Same filters as GET /requests/
+        collection: Requests collection
+        
+    Returns:
+        StreamingResponse with the matching requests, most recent first
+    
+    Raises:
+        HTTPException: 400 for an invalid date, or if there's an error processing the request
+    """
+    logger.info(f"GET /requests/stream - format: {format}, filters: {filters}")
+    try:
+        cursor = request_service.find_requests(collection, filters)
+        if format == "json":
+            return StreamingResponse(json_array_stream(cursor), media_type="application/json")
+        return StreamingResponse(ndjson_stream(cursor), media_type="application/x-ndjson")
+    except ValueError as e:
+        logger.warning(f"Invalid filter in stream_requests: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error in stream_requests: {str(e)}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/{request_id}", response_model=Request)
 async def read_request(
     request_id: str,
+    http_request: HTTPRequest,
     collection: Collection = Depends(get_requests_collection)
 ):
     """
@@ -95,21 +163,33 @@ async def read_request(
     
     Args:
         request_id: The request ID
+        http_request: Incoming request, for If-None-Match
         collection: Requests collection
         
     Returns:
-        Request object
+        Request object, or 304 if the client's ETag still matches
     
     Raises:
         HTTPException: If request not found or there's an error processing the request
     """
     logger.info(f"GET /requests/{request_id}")
     try:
-        request = request_service.get_request_by_id(collection, request_id)
-        if not request:
-            logger.warning(f"Request not found: {request_id}")
-            raise HTTPException(status_code=404, detail="Request not found")
-        return request
+        cache_key = _request_cache_key(request_id)
+        cached = await cache.get(cache_key)
+        if cached is None:
+            async with cache.lock(cache_key):
+                # Another request may have loaded it while we waited
+                cached = await cache.get(cache_key)
+                if cached is None:
+                    generation = cache.generation()
+                    request = request_service.get_request_by_id(collection, request_id)
+                    if not request:
+                        logger.warning(f"Request not found: {request_id}")
+                        raise HTTPException(status_code=404, detail="Request not found")
+                    # Cache the same shape response_model=Request would have returned
+                    cached = cache.encode(Request.model_validate(request.model_dump()))
+                    await cache.put(cache_key, cached, local=True, generation=generation)
+        return cache.json_response(cached, http_request)
     except HTTPException:
         raise
     except Exception as e:
@@ -175,6 +255,7 @@ async def update_existing_request(
         if not result:
             logger.warning(f"Request not found: {request_id}")
             raise HTTPException(status_code=404, detail="Request not found")
+        await cache.invalidate(_request_cache_key(request_id))
         return result
     except ValueError as e:
         logger.warning(f"Validation error in update_existing_request: {str(e)}")
@@ -182,21 +263,26 @@ async def update_existing_request(
     except PyMongoError as e:
         logger.error(f"Database error in update_existing_request: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Database error")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in update_existing_request: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.delete("/{request_id}", status_code=204)
+@router.delete("/{request_id}", status_code=204, response_class=Response)
 async def delete_existing_request(
     request_id: str,
     collection: Collection = Depends(get_requests_collection)
-):
+) -> Response:
     """
     Delete a request.
     
     Args:
         request_id: The request ID to delete
         collection: Requests collection
+        
+    Returns:
+        Empty 204 response
     
     Raises:
         HTTPException: If request not found or there's an error processing the request
@@ -207,9 +293,13 @@ async def delete_existing_request(
         if not result:
             logger.warning(f"Request not found: {request_id}")
             raise HTTPException(status_code=404, detail="Request not found")
+        await cache.invalidate(_request_cache_key(request_id))
+        return Response(status_code=204)
     except PyMongoError as e:
         logger.error(f"Database error in delete_existing_request: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Database error")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in delete_existing_request: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -240,6 +330,7 @@ async def add_comment_to_request(
         if not result:
             logger.warning(f"Request not found: {request_id}")
             raise HTTPException(status_code=404, detail="Request not found")
+        await cache.invalidate(_request_cache_key(request_id))
         return result
     except ValueError as e:
         logger.warning(f"Validation error in add_comment_to_request: {str(e)}")
@@ -247,6 +338,8 @@ async def add_comment_to_request(
     except PyMongoError as e:
         logger.error(f"Database error in add_comment_to_request: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Database error")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in add_comment_to_request: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
@@ -254,10 +347,7 @@ async def add_comment_to_request(
 @router.put("/{request_id}/approval", response_model=Request)
 async def update_request_approval(
     request_id: str,
-    approve: bool,
-    approver_id: str,
-    approver_name: Optional[str] = None,
-    comment: Optional[str] = None,
+    decision: ApprovalDecision,
     collection: Collection = Depends(get_requests_collection)
 ):
     """
@@ -265,10 +355,7 @@ async def update_request_approval(
     
     Args:
         request_id: The request ID
-        approve: Whether to approve the request
-        approver_id: ID of the approver
-        approver_name: Name of the approver
-        comment: Optional comment for the approval/rejection
+        decision: Approval decision (approve, approver_id, optional approver_name and comment)
         collection: Requests collection
         
     Returns:
@@ -277,19 +364,20 @@ async def update_request_approval(
     Raises:
         HTTPException: If request not found or there's an error processing the request
     """
-    logger.info(f"PUT /requests/{request_id}/approval - approve: {approve}, approver: {approver_id}")
+    logger.info(f"PUT /requests/{request_id}/approval - approve: {decision.approve}, approver: {decision.approver_id}")
     try:
         result = request_service.update_approval(
             collection, 
             request_id, 
-            approver_id, 
-            approve, 
-            approver_name, 
-            comment
+            decision.approver_id, 
+            decision.approve, 
+            decision.approver_name, 
+            decision.comment
         )
         if not result:
             logger.warning(f"Request not found: {request_id}")
             raise HTTPException(status_code=404, detail="Request not found")
+        await cache.invalidate(_request_cache_key(request_id))
         return result
     except ValueError as e:
         logger.warning(f"Validation error in update_request_approval: {str(e)}")
@@ -297,6 +385,8 @@ async def update_request_approval(
     except PyMongoError as e:
         logger.error(f"Database error in update_request_approval: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Database error")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in update_request_approval: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
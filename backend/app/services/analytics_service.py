@@ -1,12 +1,71 @@
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from cachetools import TTLCache
 from pymongo import ASCENDING, DESCENDING
+from pymongo.collection import Collection
 from pymongo.database import Database
 from pymongo.errors import OperationFailure
+import functools
 import logging
+import os
+import threading
 
 logger = logging.getLogger(__name__)
 
+# Analytics results are reused for ANALYTICS_CACHE_TTL_SECONDS per set of arguments, so
+# dashboards refetching the same view don't rerun the aggregations. Asset and category
+# writes clear the cache through bust_analytics_cache().
+ANALYTICS_CACHE_TTL_SECONDS = int(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "60"))
+_analytics_cache: TTLCache = TTLCache(maxsize=1024, ttl=ANALYTICS_CACHE_TTL_SECONDS)
+_analytics_cache_lock = threading.Lock()
+
+def _cached_analytics(func: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Cache an analytics function's result by function name and arguments (excluding db)"""
+    @functools.wraps(func)
+    def wrapper(db: Database, *args, **kwargs) -> Dict[str, Any]:
+        key = (func.__name__, args, tuple(sorted(kwargs.items())))
+        with _analytics_cache_lock:
+            cached = _analytics_cache.get(key)
+        if cached is not None:
+            return cached
+        result = func(db, *args, **kwargs)
+        with _analytics_cache_lock:
+            _analytics_cache[key] = result
+        return result
+    return wrapper
+
+def bust_analytics_cache() -> None:
+    """Drop all cached analytics results after a write that changes them"""
+    with _analytics_cache_lock:
+        _analytics_cache.clear()
+
+def _aggregate_page(
+    collection: Collection,
+    pipeline: List[Dict[str, Any]],
+    page: int,
+    limit: int
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Run an aggregation once and return one page of its results with the total result count.
+    
+    Args:
+        collection (Collection): Collection to aggregate
+        pipeline (List[Dict[str, Any]]): Pipeline producing the full, sorted results
+        page (int): 1-based page number
+        limit (int): Results per page
+        
+    Returns:
+        Tuple[List[Dict[str, Any]], int]: The page of results and the total number of results
+    """
+    facet = {"$facet": {
+        "rows": [{"$skip": (page - 1) * limit}, {"$limit": limit}],
+        "meta": [{"$count": "total"}]
+    }}
+    result = next(collection.aggregate(pipeline + [facet]), {"rows": [], "meta": []})
+    total = result["meta"][0]["total"] if result["meta"] else 0
+    return result["rows"], total
+
+@_cached_analytics
 def get_asset_analytics(
     db: Database,
     time_frame: str = "year",
@@ -51,22 +110,9 @@ def get_asset_analytics(
         
         categories = list(db.asset_categories.aggregate(pipeline_categories))
         
-        # Get asset status distribution - optimized for large datasets
-        pipeline_status = [
-            {"$group": {
-                "_id": "$status",
-                "count": {"$sum": 1},
-                "value": {"$sum": "$purchase_price"}
-            }},
-            {"$sort": {"count": -1}}
-        ]
-        
-        statuses = list(db.asset_items.aggregate(pipeline_status))
-        statuses = [{"status": s["_id"], "count": s["count"], "value": s["value"]} for s in statuses]
-        
-        # Get asset acquisition over time with pagination
-        # For large datasets, this uses date bucketing and sampling
-        pipeline_acquisition = [
+        # Status distribution, acquisitions over time, age distribution and totals all come
+        # from asset_items, so they are computed as facets of a single scan
+        acquisition_by_month = [
             {"$match": {"purchase_date": {"$gte": start_date}}},
             {"$project": {
                 "year_month": {"$dateToString": {"format": "%Y-%m", "date": "$purchase_date"}},
@@ -76,41 +122,63 @@ def get_asset_analytics(
                 "_id": "$year_month",
                 "count": {"$sum": 1},
                 "value": {"$sum": "$purchase_price"}
-            }},
-            {"$sort": {"_id": 1}}
+            }}
         ]
         
-        # Get full result count for pagination
-        total_months = len(list(db.asset_items.aggregate(pipeline_acquisition)))
+        pipeline_assets = [
+            {"$facet": {
+                # Asset status distribution
+                "statuses": [
+                    {"$group": {
+                        "_id": "$status",
+                        "count": {"$sum": 1},
+                        "value": {"$sum": "$purchase_price"}
+                    }},
+                    {"$sort": {"count": -1}}
+                ],
+                
+                # Asset acquisition over time, one page of months plus the month count
+                "acquisitions": acquisition_by_month + [
+                    {"$sort": {"_id": 1}},
+                    {"$skip": (page - 1) * limit},
+                    {"$limit": limit}
+                ],
+                "acquisition_months": acquisition_by_month + [{"$count": "total"}],
+                
+                # Asset age distribution
+                "asset_age": [
+                    {"$project": {
+                        "age_days": {"$divide": [
+                            {"$subtract": [datetime.now(), "$purchase_date"]}, 
+                            24 * 60 * 60 * 1000  # Convert milliseconds to days
+                        ]}
+                    }},
+                    {"$bucket": {
+                        "groupBy": "$age_days",
+                        "boundaries": [0, 365, 730, 1095, 1460, 3650],  # 0-1 yr, 1-2, 2-3, 3-4, 4+
+                        "default": "4+ years",
+                        "output": {
+                            "count": {"$sum": 1}
+                        }
+                    }}
+                ],
+                
+                # Total asset count and value
+                "totals": [
+                    {"$group": {"_id": None, "count": {"$sum": 1}, "total": {"$sum": "$purchase_price"}}}
+                ]
+            }}
+        ]
         
-        # Apply pagination 
-        pipeline_acquisition.extend([
-            {"$skip": (page - 1) * limit},
-            {"$limit": limit}
-        ])
+        asset_facets = next(db.asset_items.aggregate(pipeline_assets), {})
         
-        acquisitions = list(db.asset_items.aggregate(pipeline_acquisition))
-        acquisitions = [{"month": a["_id"], "count": a["count"], "value": a["value"]} for a in acquisitions]
+        statuses = [{"status": s["_id"], "count": s["count"], "value": s["value"]} for s in asset_facets.get("statuses", [])]
         
-        # Get asset age distribution
-        pipeline_age = [
-            {"$project": {
-                "age_days": {"$divide": [
-                    {"$subtract": [datetime.now(), "$purchase_date"]}, 
-                    24 * 60 * 60 * 1000  # Convert milliseconds to days
-                ]}
-            }},
-            {"$bucket": {
-                "groupBy": "$age_days",
-                "boundaries": [0, 365, 730, 1095, 1460, 3650],  # 0-1 yr, 1-2, 2-3, 3-4, 4+
-                "default": "4+ years",
-                "output": {
-                    "count": {"$sum": 1}
-                }
-            }}
-        ]
+        acquisitions = [{"month": a["_id"], "count": a["count"], "value": a["value"]} for a in asset_facets.get("acquisitions", [])]
+        acquisition_months = asset_facets.get("acquisition_months", [])
+        total_months = acquisition_months[0]["total"] if acquisition_months else 0
         
-        age_results = list(db.asset_items.aggregate(pipeline_age))
+        age_results = asset_facets.get("asset_age", [])
         
         # Calculate total assets for percentage
         total_assets = sum(age["count"] for age in age_results)
@@ -130,13 +198,9 @@ def get_asset_analytics(
                 "percentage": round(percentage, 1)
             })
         
-        # Get total asset count and value
-        total_count = db.asset_items.count_documents({})
-        total_value_pipeline = [
-            {"$group": {"_id": None, "total": {"$sum": "$purchase_price"}}}
-        ]
-        total_value_result = list(db.asset_items.aggregate(total_value_pipeline))
-        total_value = total_value_result[0]["total"] if total_value_result else 0
+        totals = asset_facets.get("totals", [])
+        total_count = totals[0]["count"] if totals else 0
+        total_value = totals[0]["total"] if totals else 0
         
         return {
             "data": {
@@ -158,6 +222,7 @@ def get_asset_analytics(
         raise
 
 
+@_cached_analytics
 def get_department_analytics(
     db: Database,
     time_frame: str = "year",
@@ -191,24 +256,34 @@ def get_department_analytics(
             # Get all current assignments (where return_date is null)
             {"$match": {"return_date": None}},
             
-            # Lookup employee information
-            {"$lookup": {
-                "from": "employees",
-                "localField": "employee_id",
-                "foreignField": "id",
-                "as": "employee"
-            }},
-            
-            # Lookup asset information
+            # Lookup asset information, filtering by purchase date inside the join so
+            # assets outside the time frame are never materialized
             {"$lookup": {
                 "from": "asset_items",
-                "localField": "asset_id",
-                "foreignField": "id",
+                "let": {"asset_id": "$asset_id"},
+                "pipeline": [
+                    {"$match": {
+                        "$expr": {"$eq": ["$id", "$$asset_id"]},
+                        "purchase_date": {"$gte": start_date}
+                    }},
+                    {"$project": {"_id": 0, "purchase_price": 1}}
+                ],
                 "as": "asset"
             }},
             
-            # Filter assets by purchase date if needed
-            {"$match": {"asset.purchase_date": {"$gte": start_date}}},
+            # Drop assignments whose asset falls outside the time frame
+            {"$match": {"asset": {"$ne": []}}},
+            
+            # Lookup employee information for the remaining assignments only
+            {"$lookup": {
+                "from": "employees",
+                "let": {"employee_id": "$employee_id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$id", "$$employee_id"]}}},
+                    {"$project": {"_id": 0, "department": 1}}
+                ],
+                "as": "employee"
+            }},
             
             # Group by department
             {"$group": {
@@ -221,17 +296,8 @@ def get_department_analytics(
             {"$sort": {"value": -1}},
         ]
         
-        # Get total count for pagination
-        total_departments = len(list(db.assignment_history.aggregate(pipeline)))
-        
-        # Apply pagination
-        pipeline.extend([
-            {"$skip": (page - 1) * limit},
-            {"$limit": limit}
-        ])
-        
-        # Execute the aggregation
-        departments_result = list(db.assignment_history.aggregate(pipeline))
+        # Execute the aggregation once for both the page and the total count
+        departments_result, total_departments = _aggregate_page(db.assignment_history, pipeline, page, limit)
         
         # Format the response
         departments = []
@@ -256,6 +322,7 @@ def get_department_analytics(
         raise
 
 
+@_cached_analytics
 def get_maintenance_analytics(
     db: Database,
     time_frame: str = "year",
@@ -302,17 +369,8 @@ def get_maintenance_analytics(
             {"$sort": {"_id": 1}}
         ]
         
-        # Get full result count for pagination
-        total_months = len(list(db.maintenance_history.aggregate(pipeline)))
-        
-        # Apply pagination
-        pipeline.extend([
-            {"$skip": (page - 1) * limit},
-            {"$limit": limit}
-        ])
-        
-        # Execute aggregation
-        maintenance_data = list(db.maintenance_history.aggregate(pipeline))
+        # Execute aggregation once for both the page and the total month count
+        maintenance_data, total_months = _aggregate_page(db.maintenance_history, pipeline, page, limit)
         
         # Format results
         formatted_data = []
@@ -351,6 +409,7 @@ def get_maintenance_analytics(
         raise
 
 
+@_cached_analytics
 def get_employee_asset_analytics(
     db: Database,
     page: int = 1,
@@ -11,10 +11,38 @@ from app.models.asset_category import (
     Documents
 )
 from app.models.utils import generate_uuid, get_current_datetime, serialize_model
+from app.services.analytics_service import bust_analytics_cache
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Asset statuses counted as under maintenance in category statistics
+MAINTENANCE_STATUSES = ["under_maintenance", "maintenance_requested"]
+
+def _category_asset_stats(db: Collection, category_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Compute asset statistics for several categories with one grouped aggregation.
+    
+    Args:
+        db (Collection): MongoDB asset categories collection
+        category_ids (List[str]): Category IDs to compute statistics for
+        
+    Returns:
+        Dict[str, Dict[str, Any]]: Statistics per category ID; categories without assets are absent
+    """
+    pipeline = [
+        {"$match": {"category_id": {"$in": category_ids}}},
+        {"$group": {
+            "_id": "$category_id",
+            "count": {"$sum": 1},
+            "total_cost": {"$sum": "$purchase_cost"},
+            "assigned": {"$sum": {"$cond": [{"$eq": ["$has_active_assignment", True]}, 1, 0]}},
+            "maintenance": {"$sum": {"$cond": [{"$in": ["$status", MAINTENANCE_STATUSES]}, 1, 0]}},
+            "operational": {"$sum": {"$cond": [{"$eq": ["$is_operational", True]}, 1, 0]}}
+        }}
+    ]
+    return {stats["_id"]: stats for stats in db.database["asset_items"].aggregate(pipeline)}
+
 def get_asset_categories(
     db: Collection, 
     filters: Dict[str, Any] = None
@@ -33,43 +61,29 @@ def get_asset_categories(
     try:
         query = filters or {}
         categories = list(db.find(query))
-        result = []
         for cat in categories:
             # Convert _id to id if needed
             if "_id" in cat and "id" not in cat:
                 cat["id"] = str(cat["_id"])
-            
-            # Get statistics from asset items collection
-            count = db.database["asset_items"].count_documents({"category_id": cat["id"]})
-            
-            # Sum the purchase cost of all items in this category
-            total_cost = sum(
-                item.get("purchase_cost", 0) for item in db.database["asset_items"].find({"category_id": cat["id"]})
-            )
-            
-            # Count assigned and maintenance assets
-            assigned_count = db.database["asset_items"].count_documents({
-                "category_id": cat["id"], 
-                "has_active_assignment": True
-            })
-            
-            maintenance_count = db.database["asset_items"].count_documents({
-                "category_id": cat["id"], 
-                "status": {"$in": ["under_maintenance", "maintenance_requested"]}
-            })
+        
+        # Statistics for every category from one aggregation over asset items,
+        # instead of five queries per category
+        asset_stats = _category_asset_stats(db, [cat["id"] for cat in categories])
+        
+        result = []
+        for cat in categories:
+            stats = asset_stats.get(cat["id"], {})
+            count = stats.get("count", 0)
             
             # Calculate utilization rate
-            utilization_rate = (
-                db.database["asset_items"].count_documents({"category_id": cat["id"], "is_operational": True}) /
-                count * 100
-            ) if count > 0 else 0.0
+            utilization_rate = (stats.get("operational", 0) / count * 100) if count > 0 else 0.0
             
             cat_dict = {
                 **cat,
                 "total_assets": count,
-                "total_cost": total_cost,
-                "assigned_assets": assigned_count,
-                "under_maintenance": maintenance_count,
+                "total_cost": stats.get("total_cost", 0),
+                "assigned_assets": stats.get("assigned", 0),
+                "under_maintenance": stats.get("maintenance", 0),
                 "utilizationRate": round(utilization_rate, 2)
             }
             
@@ -251,6 +265,7 @@ def create_asset_category(db: Collection, category: AssetCategoryCreate) -> Asse
         # Create full AssetCategory object from saved data
         created_category = AssetCategory(**category_dict)
         logger.info(f"Created category with ID: {created_category.id}")
+        bust_analytics_cache()
         return created_category
     except DuplicateKeyError:
         logger.warning(f"Category already exists: {category.category_name}")
@@ -395,6 +410,7 @@ def update_asset_category(db: Collection, category_id: str, category: AssetCateg
         
         result = AssetCategory(**updated_dict)
         logger.debug(f"Updated category: {result.category_name}")
+        bust_analytics_cache()
         return result
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -427,6 +443,7 @@ def delete_asset_category(db: Collection, category_id: str) -> bool:
             return False
         
         logger.debug(f"Deleted category ID: {category_id}")
+        bust_analytics_cache()
         return True
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -12,6 +12,7 @@ from app.models.asset_item import (
     MaintenanceSchedule
 )
 from app.models.utils import generate_uuid, get_current_datetime, serialize_model
+from app.services.analytics_service import bust_analytics_cache
 import uuid
 
 logger = logging.getLogger(__name__)
@@ -261,6 +262,7 @@ def create_asset_item(db: Collection, asset: AssetItemCreate) -> AssetItemRespon
         # Convert to AssetItemResponse
         asset_response = AssetItemResponse(**created_asset)
         logger.info(f"Created asset with ID: {asset_response.id}")
+        bust_analytics_cache()
         return asset_response
     except DuplicateKeyError as e:
         logger.warning(f"Duplicate key error: {str(e)}")
@@ -391,6 +393,7 @@ def update_asset_item(db: Collection, asset_id: str, asset: AssetItemUpdate) ->
         # Convert to AssetItemResponse
         asset_response = AssetItemResponse(**updated_asset)
         logger.debug(f"Updated asset: {asset_response.name}")
+        bust_analytics_cache()
         return asset_response
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -433,6 +436,7 @@ def delete_asset_item(db: Collection, asset_id: str) -> bool:
             return False
         
         logger.debug(f"Deleted asset ID: {asset_id}")
+        bust_analytics_cache()
         return True
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -13,7 +13,7 @@ from app.models.assignment_history import (
     AssignmentType
 )
 from app.models.utils import generate_uuid, get_current_datetime, serialize_model
-from dateutil.parser import parse
+import ciso8601
 import pdb
 
 logger = logging.getLogger(__name__)
@@ -140,12 +140,6 @@ def assign_asset_to_employee(
     Returns:
         AssetItem: The updated asset
     """
-    print("="*80)
-    print("ENTERING assign_asset_to_employee FUNCTION")
-    print(f"Assignment ID: {assignment.asset_id}")
-    print(f"Employee ID: {assignment.assigned_to}")
-    print("="*80)
-    
     logger.info("="*50)
     logger.info("STARTING ASSIGNMENT PROCESS")
     logger.info(f"Assignment details: {assignment.dict()}")
@@ -153,18 +147,16 @@ def assign_asset_to_employee(
     
     try:
         # Check if asset exists and is available
-        print("Fetching asset...")
         asset = db.database["asset_items"].find_one({"id": assignment.asset_id})
-        print(f"Asset found: {asset is not None}")
+        logger.debug(f"Asset found: {asset is not None}")
         
         if not asset:
             logger.warning(f"Asset not found: {assignment.asset_id}")
             raise ValueError(f"Asset with ID {assignment.asset_id} not found")
         
         # Check if employee exists
-        print("Fetching employee...")
         employee = db.database["employees"].find_one({"id": assignment.assigned_to})
-        print(f"Employee found: {employee is not None}")
+        logger.debug(f"Employee found: {employee is not None}")
         
         if not employee:
             logger.warning(f"Employee not found: {assignment.assigned_to}")
@@ -191,6 +183,7 @@ def assign_asset_to_employee(
         
         # Create assignment history entry
         current_time = get_current_datetime()
+        employee_name = employee.get("full_name") or f"{employee.get('first_name', '')} {employee.get('last_name', '')}"
         
         # Calculate end date
         end_date = None
@@ -210,7 +203,7 @@ def assign_asset_to_employee(
                 end_date = current_time + timedelta(days=365 * assignment.duration)
         elif hasattr(assignment, 'expected_return_date') and assignment.expected_return_date:
             try:
-                end_date = parse(assignment.expected_return_date)
+                end_date = ciso8601.parse_datetime(assignment.expected_return_date)
             except Exception as e:
                 logger.warning(f"Failed to parse expected_return_date: {e}")
                 end_date = current_time + timedelta(days=365)
@@ -226,7 +219,7 @@ def assign_asset_to_employee(
             "category_id": asset.get("category_id", ""),
             "category_name": asset.get("category_name", "Unknown"),
             "employee_id": assignment.assigned_to,
-            "employee_name": f"{employee.get('first_name', '')} {employee.get('last_name', '')}",
+            "employee_name": employee_name,
             "employee_email": employee.get("email", ""),
             "employee_department": employee.get("department", ""),
             "assignment_date": current_time,
@@ -246,7 +239,6 @@ def assign_asset_to_employee(
             "_id": None
         }
         
-        print("Creating assignment record...")
         # Set _id field to the same value as id
         assignment_dict["_id"] = assignment_dict["id"]
         # Insert the assignment
@@ -278,7 +270,7 @@ def assign_asset_to_employee(
                 "status": "assigned",
                 "has_active_assignment": True,
                 "current_assignee_id": assignment.assigned_to,
-                "current_assignee_name": f"{employee.get('first_name', '')} {employee.get('last_name', '')}",
+                "current_assignee_name": employee_name,
                 "current_assignment_id": assignment_dict["id"],
                 "current_assignment_date": current_time,
                 "expected_return_date": end_date,
@@ -291,7 +283,7 @@ def assign_asset_to_employee(
         )
         logger.info(f"Updated asset status to assigned: {assignment.asset_id}")
         
-        print("Starting employee updates...")
+        logger.debug("Starting employee updates")
         try:
             # First, remove any existing entries for this asset from current_assets
             remove_result = db.database["employees"].update_one(
@@ -302,9 +294,8 @@ def assign_asset_to_employee(
                     }
                 }
             )
-            print(f"Remove result - matched: {remove_result.matched_count}, modified: {remove_result.modified_count}")
+            logger.debug(f"Remove result - matched: {remove_result.matched_count}, modified: {remove_result.modified_count}")
             
-            print("Updating employee with new current_asset...")
             # Then update employee status and add new current_asset entry
             update_result = db.database["employees"].update_one(
                 {"id": assignment.assigned_to},
@@ -324,13 +315,13 @@ def assign_asset_to_employee(
                     }
                 }
             )
-            print(f"Update result - matched: {update_result.matched_count}, modified: {update_result.modified_count}")
+            logger.debug(f"Update result - matched: {update_result.matched_count}, modified: {update_result.modified_count}")
             
-            # Get employee data after update for verification
-            after_employee = db.database["employees"].find_one({"id": assignment.assigned_to})
-            print("Final employee state:")
-            print(f"Has assigned assets: {after_employee.get('has_assigned_assets')}")
-            print(f"Current assets: {after_employee.get('current_assets', [])}")
+            # Read the employee back for verification only when it will be logged
+            if logger.isEnabledFor(logging.DEBUG):
+                after_employee = db.database["employees"].find_one({"id": assignment.assigned_to})
+                logger.debug(f"Has assigned assets: {after_employee.get('has_assigned_assets')}")
+                logger.debug(f"Current assets: {after_employee.get('current_assets', [])}")
             
         except Exception as e:
             logger.error(f"Error updating employee current_assets: {str(e)}", exc_info=True)
@@ -338,22 +329,6 @@ def assign_asset_to_employee(
         
         logger.info(f"Updated employee current_assets and status: {assignment.assigned_to}")
         
-        # Add entry to asset's assignment history
-        db.database["asset_items"].update_one(
-            {"id": assignment.asset_id},
-            {"$push": {"assignment_history": {
-                "id": assignment_dict["id"],
-                "employee_id": assignment.assigned_to,
-                "employee_name": f"{employee.get('first_name', '')} {employee.get('last_name', '')}",
-                "assignment_date": current_time,
-                "expected_return_date": end_date,
-                "status": "active",
-                "is_active": True,
-                "department": employee.get("department", ""),
-                "location": assignment.location or employee.get("location", "")
-            }}}
-        )
-        
         # Retrieve the updated asset
         updated_asset = db.database["asset_items"].find_one({"id": assignment.asset_id})
         
@@ -420,6 +395,8 @@ def unassign_employee_from_asset(
         
         # Extract fields safely from the assignment
         return_date = getattr(assignment, 'returned_date', None) or getattr(assignment, 'unassigned_at', None) or current_time
+        if isinstance(return_date, str):
+            return_date = ciso8601.parse_datetime(return_date)
         return_notes = getattr(assignment, 'return_notes', None) or getattr(assignment, 'notes', None)
         condition = getattr(assignment, 'condition_after', None) or getattr(assignment, 'checkin_condition', None)
         
@@ -460,19 +437,6 @@ def unassign_employee_from_asset(
         )
         logger.info(f"Updated asset status to available: {asset_id}")
         
-        # Update assignment history in asset
-        db.database["asset_items"].update_one(
-            {"id": asset_id, "assignment_history.id": assignment.assignment_id},
-            {"$set": {
-                "assignment_history.$.return_date": return_date,
-                "assignment_history.$.status": "returned",
-                "assignment_history.$.is_active": False,
-                "assignment_history.$.has_active_assignment": False,
-                "assignment_history.$.return_notes": return_notes,
-                "assignment_history.$.return_condition": condition
-            }}
-        )
-        
         # Update employee status and remove asset from current_assets
         db.database["employees"].update_one(
             {"id": employee_id},
@@ -518,19 +482,6 @@ def unassign_employee_from_asset(
         
         logger.info(f"Updated employee assignment status: {employee_id}")
         
-        # Update assignment history in employee
-        db.database["employees"].update_one(
-            {"id": employee_id, "assignment_history.id": assignment.assignment_id},
-            {"$set": {
-                "assignment_history.$.return_date": return_date,
-                "assignment_history.$.status": "returned",
-                "assignment_history.$.is_active": False,
-                "assignment_history.$.has_active_assignment": False,
-                "assignment_history.$.return_notes": return_notes,
-                "assignment_history.$.return_condition": condition
-            }}
-        )
-        
         # Retrieve the updated asset
         updated_asset = db.database["asset_items"].find_one({"id": asset_id})
         
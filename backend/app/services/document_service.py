@@ -1,5 +1,6 @@
-from pymongo.database import Database
-from pymongo.errors import DuplicateKeyError, PyMongoError
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorCursor
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError, PyMongoError
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from app.models.document import (
@@ -11,8 +12,9 @@ from app.models.document import (
     DocumentStatus
 )
 from app.models.utils import get_current_datetime, serialize_model, generate_document_id
+import asyncio
 import logging
-from app.dependencies import get_db
+from app.dependencies import get_async_db
 import time
 
 logger = logging.getLogger(__name__)
@@ -20,36 +22,44 @@ logger = logging.getLogger(__name__)
 # Explicitly define collection name to avoid confusion
 DOCUMENTS_COLLECTION = "documents"
 
-def get_documents(db: Database, filters: Dict[str, Any]) -> List[DocumentResponse]:
+# Documents fetched per round-trip when iterating a listing cursor
+DOCUMENT_BATCH_SIZE = 500
+
+def find_documents(db: AsyncIOMotorCollection, filters: Dict[str, Any], hint: Optional[str] = None) -> AsyncIOMotorCursor:
+    """
+    Build the cursor for a filtered documents listing, newest first.
+    
+    Args:
+        db (AsyncIOMotorCollection): MongoDB documents collection
+        filters (Dict[str, Any]): Filters for documents such as asset_id, employee_id, document_type
+        hint (Optional[str]): Name of the index the query should use, if any
+        
+    Returns:
+        AsyncIOMotorCursor: Cursor over the matching documents, without _id
+    """
+    # Build query from filters
+    query = {key: value for key, value in filters.items() if value is not None} if filters else {}
+    
+    cursor = db.find(query, {"_id": 0}).sort("created_at", -1).batch_size(DOCUMENT_BATCH_SIZE)
+    if hint:
+        cursor = cursor.hint(hint)
+    return cursor
+
+async def get_documents(db: AsyncIOMotorCollection, filters: Dict[str, Any], hint: Optional[str] = None) -> List[DocumentResponse]:
     """
     Retrieve documents based on filters.
     
     Args:
-        db (Database): MongoDB database instance
+        db (AsyncIOMotorCollection): MongoDB documents collection
         filters (Dict[str, Any]): Filters for documents such as asset_id, employee_id, document_type
+        hint (Optional[str]): Name of the index the query should use, if any
         
     Returns:
         List[DocumentResponse]: List of documents matching the filter criteria
     """
     logger.info(f"Fetching documents with filters: {filters}")
     try:
-        # Build query from filters
-        query = {}
-        if filters:
-            for key, value in filters.items():
-                if value is not None:
-                    query[key] = value
-        
-        # Use the collection directly
-        # collection = db.get_collection(DOCUMENTS_COLLECTION)
-        collection = db
-        documents = list(collection.find(query).sort("created_at", -1))
-        result = []
-        for doc in documents:
-            # Ensure id is properly formatted
-            doc["id"] = str(doc["_id"])
-            del doc["_id"]
-            result.append(DocumentResponse(**doc))
+        result = [DocumentResponse(**doc) async for doc in find_documents(db, filters, hint)]
         
         logger.debug(f"Fetched {len(result)} documents")
         return result
@@ -57,12 +67,12 @@ def get_documents(db: Database, filters: Dict[str, Any]) -> List[DocumentRespons
         logger.error(f"Error fetching documents: {str(e)}", exc_info=True)
         raise
 
-def get_document_by_id(db: Database, document_id: str) -> Optional[Document]:
+async def get_document_by_id(db: AsyncIOMotorCollection, document_id: str) -> Optional[Document]:
     """
     Retrieve a specific document by ID.
     
     Args:
-        db (Database): MongoDB database instance
+        db (AsyncIOMotorCollection): MongoDB documents collection
         document_id (str): The document ID to retrieve
         
     Returns:
@@ -73,7 +83,7 @@ def get_document_by_id(db: Database, document_id: str) -> Optional[Document]:
         # Use the collection directly
         # collection = db.get_collection(DOCUMENTS_COLLECTION)
         collection = db
-        document = collection.find_one({"id": document_id})
+        document = await collection.find_one({"id": document_id})
         if not document:
             logger.warning(f"Document not found: {document_id}")
             return None
@@ -86,12 +96,123 @@ def get_document_by_id(db: Database, document_id: str) -> Optional[Document]:
         logger.error(f"Error fetching document {document_id}: {str(e)}", exc_info=True)
         raise
 
-def create_document(db: Database, document: DocumentCreate, skip_validation: bool = False) -> Document:
+def _build_document_record(document: DocumentCreate) -> Dict[str, Any]:
+    """
+    Validate a document payload and build the record to insert.
+    
+    Args:
+        document (DocumentCreate): Document to create
+        
+    Returns:
+        Dict[str, Any]: The document record, with id and _id set
+        
+    Raises:
+        ValueError: If neither asset_id nor employee_id is provided
+    """
+    # Basic validation
+    if not document.asset_id and not document.employee_id:
+        logger.warning("At least one of asset_id or employee_id required")
+        raise ValueError("At least one of asset_id or employee_id must be provided")
+    
+    # Ensure file_type is set if not provided
+    if not document.file_type and document.file_name and '.' in document.file_name:
+        document.file_type = document.file_name.split('.')[-1].lower()
+        logger.debug(f"Extracted file_type from filename: {document.file_type}")
+    
+    # If still no file_type, set a default
+    if not document.file_type:
+        document.file_type = "unknown"
+        logger.debug("Set default file_type to 'unknown'")
+    
+    # Skip validation checks for simplicity
+    # Generate a document ID explicitly
+    doc_id = generate_document_id()
+    
+    # Add timestamp to file URL to avoid collisions
+    timestamp = int(time.time() * 1000)
+    if "." in document.file_url:
+        base, ext = document.file_url.rsplit(".", 1)
+        document.file_url = f"{base}_{timestamp}.{ext}"
+    else:
+        document.file_url = f"{document.file_url}_{timestamp}"
+    
+    logger.info(f"Made URL unique by adding timestamp: {document.file_url}")
+    
+    # Create document dictionary directly
+    current_time = get_current_datetime()
+    doc_dict = {
+        "_id": doc_id,
+        "id": doc_id,
+        "name": document.name,
+        "description": document.description,
+        "document_type": document.document_type.value if document.document_type else None,
+        "status": document.status.value if document.status else "active",
+        "file_name": document.file_name,
+        "file_type": document.file_type,
+        "file_size": document.file_size,
+        "file_url": document.file_url,
+        "thumbnail_url": document.thumbnail_url,
+        "asset_id": document.asset_id,
+        "asset_name": document.asset_name,
+        "asset_tag": document.asset_tag,
+        "category_id": document.category_id,
+        "category_name": document.category_name,
+        "employee_id": document.employee_id,
+        "employee_name": document.employee_name,
+        "upload_date": document.upload_date,
+        "issue_date": document.issue_date,
+        "expiry_date": document.expiry_date,
+        "tags": document.tags or [],
+        "metadata": document.metadata or {},
+        "notes": document.notes,
+        "approval_status": document.approval_status.value if document.approval_status else "not_required",
+        "uploaded_by": document.uploaded_by,
+        "uploaded_by_name": document.uploaded_by_name,
+        "document_number": document.document_number,
+        "is_confidential": document.is_confidential or False,
+        "created_at": current_time,
+        "updated_at": current_time
+    }
+    
+    # Add any missing fields that might be in DocumentCreate but not explicitly listed above
+    for key, value in document.model_dump(exclude_unset=True).items():
+        if key not in doc_dict and value is not None:
+            doc_dict[key] = value
+    
+    return doc_dict
+
+async def _add_document_references(doc_dicts: List[Dict[str, Any]]) -> None:
+    """
+    Push references to new documents onto their assets and employees, one bulk write per collection.
+    
+    Failures are logged but not raised; the documents themselves are already stored.
+    """
+    asset_updates = []
+    employee_updates = []
+    for doc_dict in doc_dicts:
+        reference = {"id": doc_dict["id"], "name": doc_dict["name"], "document_type": doc_dict["document_type"] or "other"}
+        if doc_dict.get("asset_id"):
+            asset_updates.append(UpdateOne({"id": doc_dict["asset_id"]}, {"$push": {"documents": reference}}))
+        if doc_dict.get("employee_id"):
+            employee_updates.append(UpdateOne({"id": doc_dict["employee_id"]}, {"$push": {"documents": reference}}))
+    
+    try:
+        # Get the database from dependencies
+        related_db = get_async_db()
+        if asset_updates:
+            await related_db.asset_items.bulk_write(asset_updates, ordered=False)
+        if employee_updates:
+            await related_db.employees.bulk_write(employee_updates, ordered=False)
+    except Exception as e:
+        # Log but don't fail if related collection updates fail
+        logger.warning(f"Failed to update related collections: {str(e)}")
+
+async def create_document(db: AsyncIOMotorCollection, document: DocumentCreate, skip_validation: bool = False) -> Document:
     """
     Create a new document with validation.
     
     Args:
-        db (Database): MongoDB database instance
+        db (AsyncIOMotorCollection): MongoDB documents collection
         document (DocumentCreate): Document to create
         skip_validation (bool): If True, skip validation of asset and employee existence
         
@@ -103,108 +224,20 @@ def create_document(db: Database, document: DocumentCreate, skip_validation: boo
     """
     logger.info(f"Creating document - asset_id: {document.asset_id}, employee_id: {document.employee_id}, type: {document.document_type}")
     try:
-        # Basic validation
-        if not document.asset_id and not document.employee_id:
-            logger.warning("At least one of asset_id or employee_id required")
-            raise ValueError("At least one of asset_id or employee_id must be provided")
-        
-        # Ensure file_type is set if not provided
-        if not document.file_type and document.file_name and '.' in document.file_name:
-            document.file_type = document.file_name.split('.')[-1].lower()
-            logger.debug(f"Extracted file_type from filename: {document.file_type}")
-        
-        # If still no file_type, set a default
-        if not document.file_type:
-            document.file_type = "unknown"
-            logger.debug("Set default file_type to 'unknown'")
-        
-        # Skip validation checks for simplicity
-        # ===== SIMPLIFIED APPROACH START =====
-        # Generate a document ID explicitly
-        doc_id = generate_document_id()
-        
-        # Add timestamp to file URL to avoid collisions
-        timestamp = int(time.time() * 1000)
-        if "." in document.file_url:
-            base, ext = document.file_url.rsplit(".", 1)
-            document.file_url = f"{base}_{timestamp}.{ext}"
-        else:
-            document.file_url = f"{document.file_url}_{timestamp}"
-        
-        logger.info(f"Made URL unique by adding timestamp: {document.file_url}")
-        
-        # Create document dictionary directly
-        doc_dict = {
-            "_id": doc_id,
-            "id": doc_id,
-            "name": document.name,
-            "description": document.description,
-            "document_type": document.document_type.value if document.document_type else None,
-            "status": document.status.value if document.status else "active",
-            "file_name": document.file_name,
-            "file_type": document.file_type,
-            "file_size": document.file_size,
-            "file_url": document.file_url,
-            "thumbnail_url": document.thumbnail_url,
-            "asset_id": document.asset_id,
-            "asset_name": document.asset_name,
-            "asset_tag": document.asset_tag,
-            "category_id": document.category_id,
-            "category_name": document.category_name,
-            "employee_id": document.employee_id,
-            "employee_name": document.employee_name,
-            "upload_date": document.upload_date,
-            "issue_date": document.issue_date,
-            "expiry_date": document.expiry_date,
-            "tags": document.tags or [],
-            "metadata": document.metadata or {},
-            "notes": document.notes,
-            "approval_status": document.approval_status.value if document.approval_status else "not_required",
-            "uploaded_by": document.uploaded_by,
-            "uploaded_by_name": document.uploaded_by_name,
-            "document_number": document.document_number,
-            "is_confidential": document.is_confidential or False,
-            "created_at": get_current_datetime(),
-            "updated_at": get_current_datetime()
-        }
-        
-        # Add any missing fields that might be in DocumentCreate but not explicitly listed above
-        for key, value in document.model_dump(exclude_unset=True).items():
-            if key not in doc_dict and value is not None:
-                doc_dict[key] = value
+        doc_dict = _build_document_record(document)
         
         # Insert document directly
         collection = db
-        result = collection.insert_one(doc_dict)
-        logger.debug(f"Inserted document with ID: {doc_id}")
+        result = await collection.insert_one(doc_dict)
+        logger.debug(f"Inserted document with ID: {doc_dict['id']}")
         
         # Create a proper document response
         doc = Document(**doc_dict)
         
-        # ===== SIMPLIFIED APPROACH END =====
-        
         # Update related collections if needed
-        try:
-            if document.asset_id:
-                # Get the database from dependencies
-                asset_db = get_db()
-                asset_db.asset_items.update_one(
-                    {"id": document.asset_id},
-                    {"$push": {"documents": {"id": doc_id, "name": document.name, "document_type": document.document_type.value if document.document_type else "other"}}}
-                )
-            
-            if document.employee_id:
-                # Get the database from dependencies
-                employee_db = get_db()
-                employee_db.employees.update_one(
-                    {"id": document.employee_id},
-                    {"$push": {"documents": {"id": doc_id, "name": document.name, "document_type": document.document_type.value if document.document_type else "other"}}}
-                )
-        except Exception as e:
-            # Log but don't fail if related collection updates fail
-            logger.warning(f"Failed to update related collections: {str(e)}")
+        await _add_document_references([doc_dict])
             
-        logger.info(f"Created document with ID: {doc_id}")
+        logger.info(f"Created document with ID: {doc_dict['id']}")
         return doc
     except PyMongoError as e:
         logger.error(f"Database error creating document: {str(e)}", exc_info=True)
@@ -213,12 +246,55 @@ def create_document(db: Database, document: DocumentCreate, skip_validation: boo
         logger.error(f"Error creating document: {str(e)}", exc_info=True)
         raise ValueError(f"Error creating document: {str(e)}")
 
-def update_document(db: Database, document_id: str, update: DocumentUpdate) -> Optional[Document]:
+async def create_documents(db: AsyncIOMotorCollection, documents: List[DocumentCreate]) -> List[Document]:
+    """
+    Create several documents with a single unordered insert_many.
+    
+    Args:
+        db (AsyncIOMotorCollection): MongoDB documents collection
+        documents (List[DocumentCreate]): Documents to create
+        
+    Returns:
+        List[Document]: The documents that were stored; records rejected by the server are logged and skipped
+        
+    Raises:
+        ValueError: If any document payload is invalid
+    """
+    logger.info(f"Creating {len(documents)} documents in bulk")
+    doc_dicts = []
+    for idx, document in enumerate(documents):
+        try:
+            doc_dicts.append(_build_document_record(document))
+        except ValueError as e:
+            raise ValueError(f"Document {idx+1}: {str(e)}")
+    
+    if not doc_dicts:
+        return []
+    
+    try:
+        failed_positions = set()
+        try:
+            await db.insert_many(doc_dicts, ordered=False)
+        except BulkWriteError as bwe:
+            for write_error in bwe.details.get("writeErrors", []):
+                failed_positions.add(write_error["index"])
+                logger.error(f"Error inserting document {write_error['index']+1}: {write_error.get('errmsg')}")
+        
+        inserted = [doc_dict for position, doc_dict in enumerate(doc_dicts) if position not in failed_positions]
+        await _add_document_references(inserted)
+        
+        logger.info(f"Created {len(inserted)} out of {len(doc_dicts)} documents")
+        return [Document(**doc_dict) for doc_dict in inserted]
+    except PyMongoError as e:
+        logger.error(f"Database error creating documents: {str(e)}", exc_info=True)
+        raise ValueError(f"Database error: {str(e)}")
+
+async def update_document(db: AsyncIOMotorCollection, document_id: str, update: DocumentUpdate) -> Optional[Document]:
     """
     Update an existing document.
     
     Args:
-        db (Database): MongoDB database instance
+        db (AsyncIOMotorCollection): MongoDB documents collection
         document_id (str): ID of the document to update
         update (DocumentUpdate): Update data
         
@@ -236,7 +312,7 @@ def update_document(db: Database, document_id: str, update: DocumentUpdate) -> O
         collection = db  # db is already the documents collection
         
         # Check if document exists - use explicit collection
-        document = collection.find_one({"id": document_id})
+        document = await collection.find_one({"id": document_id})
         if not document:
             logger.warning(f"Document not found: {document_id}")
             return None
@@ -251,13 +327,13 @@ def update_document(db: Database, document_id: str, update: DocumentUpdate) -> O
         update_dict["updated_at"] = get_current_datetime()
         
         # Update document - use explicit collection
-        collection.update_one(
+        await collection.update_one(
             {"id": document_id},
             {"$set": update_dict}
         )
         
         # Get updated document - use explicit collection
-        updated_document = collection.find_one({"id": document_id})
+        updated_document = await collection.find_one({"id": document_id})
         updated_document["id"] = str(updated_document["_id"])
         del updated_document["_id"]
         
@@ -270,12 +346,12 @@ def update_document(db: Database, document_id: str, update: DocumentUpdate) -> O
         logger.error(f"Error updating document {document_id}: {str(e)}", exc_info=True)
         raise ValueError(str(e))
 
-def delete_document(db: Database, document_id: str) -> bool:
+async def delete_document(db: AsyncIOMotorCollection, document_id: str) -> bool:
     """
     Delete a document and update related collections.
     
     Args:
-        db (Database): MongoDB database instance
+        db (AsyncIOMotorCollection): MongoDB documents collection
         document_id (str): ID of the document to delete
         
     Returns:
@@ -288,35 +364,27 @@ def delete_document(db: Database, document_id: str) -> bool:
         # collection = db.get_collection(DOCUMENTS_COLLECTION)
         collection = db  # db is already the documents collection
         
-        # Get document to find its associations - use explicit collection
-        document = collection.find_one({"id": document_id})
+        # Delete the document and get its associations in one round trip; _id stays in the
+        # projection so a document without either association doesn't come back empty (falsy)
+        document = await collection.find_one_and_delete(
+            {"id": document_id},
+            projection={"_id": 1, "asset_id": 1, "employee_id": 1}
+        )
         if not document:
             logger.warning(f"Document not found: {document_id}")
             return False
         
-        # Remove document references from associated collections
+        # Remove document references from associated collections; the pulls hit
+        # different collections, so send them concurrently
+        related_db = get_async_db()
+        pull = {"$pull": {"documents": {"id": document_id}}}
+        updates = []
         if document.get("asset_id"):
-            # Get the database from dependencies since 'db' is now a collection
-            asset_db = get_db()
-            asset_db.asset_items.update_one(
-                {"id": document["asset_id"]},
-                {"$pull": {"documents": {"id": document_id}}}
-            )
-        
+            updates.append(related_db.asset_items.update_one({"id": document["asset_id"]}, pull))
         if document.get("employee_id"):
-            # Get the database from dependencies since 'db' is now a collection
-            employee_db = get_db()
-            employee_db.employees.update_one(
-                {"id": document["employee_id"]},
-                {"$pull": {"documents": {"id": document_id}}}
-            )
-        
-        # Delete the document - use explicit collection
-        result = collection.delete_one({"id": document_id})
-        
-        if result.deleted_count == 0:
-            logger.warning(f"Failed to delete document {document_id}")
-            return False
+            updates.append(related_db.employees.update_one({"id": document["employee_id"]}, pull))
+        if updates:
+            await asyncio.gather(*updates)
         
         logger.info(f"Deleted document {document_id}")
         return True
@@ -1,31 +1,52 @@
-from pymongo.collection import Collection
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError, OperationFailure
+from pydantic import TypeAdapter
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from app.models.employee import (
     Employee, 
     EmployeeCreate, 
     EmployeeUpdate,
-    EmployeeResponse
+    EmployeeResponse,
+    AssignedAsset
 )
 from app.models.asset_item import AssetItem
 from app.models.assignment_history import AssignmentHistoryEntry
 from app.models.maintenance_history import MaintenanceHistoryEntry
-from app.models.document import Document
+from app.models.document import Document, DocumentResponse
 from app.models.utils import generate_uuid, get_current_datetime, serialize_model
 import logging
 
 logger = logging.getLogger(__name__)
 
-def get_employees(
-    db: Collection, 
+# Employees fetched per round-trip when reading a listing
+EMPLOYEE_BATCH_SIZE = 500
+
+# Fields an employee listing returns (_id is included by default, as a fallback id)
+EMPLOYEE_RESPONSE_PROJECTION = {field: 1 for field in EmployeeResponse.model_fields}
+
+# Validates a whole employee listing in one call instead of one model per row
+_employee_list_adapter = TypeAdapter(List[EmployeeResponse])
+
+# Only the fields EmployeeResponse.assigned_assets keeps from each asset document
+ASSIGNED_ASSET_PROJECTION = {"_id": 0, **{field: 1 for field in AssignedAsset.model_fields}}
+
+# Most recent assignment history entries and documents returned with employee details
+EMPLOYEE_DETAILS_LIST_LIMIT = 50
+
+# Only the fields the employee details page returns for each document
+DETAILS_DOCUMENT_PROJECTION = {"_id": 0, **{field: 1 for field in DocumentResponse.model_fields}}
+
+async def get_employees(
+    db: AsyncIOMotorCollection, 
     filters: Dict[str, Any] = None
 ) -> List[EmployeeResponse]:
     """
     Retrieve employees with optional filtering.
     
     Args:
-        db (Collection): MongoDB collection
+        db (AsyncIOMotorCollection): MongoDB employees collection
         filters (Dict[str, Any], optional): Filtering criteria
         
     Returns:
@@ -40,6 +61,10 @@ def get_employees(
             if "department" in filters and filters["department"]:
                 query["department"] = filters["department"]
                 
+            if "role" in filters and filters["role"]:
+                # Role is stored under metadata (EmployeeCreate has no top-level role)
+                query["metadata.role"] = filters["role"]
+                
             if "location" in filters and filters["location"]:
                 query["location"] = filters["location"]
                 
@@ -69,8 +94,7 @@ def get_employees(
                     {"position": search_regex}
                 ]
         
-        employees = list(db.find(query))
-        result = []
+        employees = await db.find(query, EMPLOYEE_RESPONSE_PROJECTION).batch_size(EMPLOYEE_BATCH_SIZE).to_list(length=None)
         
         for employee in employees:
             # Convert _id to id if needed
@@ -80,25 +104,31 @@ def get_employees(
             # Remove _id field as we have id
             if "_id" in employee:
                 del employee["_id"]
-                
-            # Get assigned assets count
-            assigned_assets_count = db.database["asset_items"].count_documents({
-                "current_assignee_id": employee["id"],
-                "has_active_assignment": True
-            })
-            
+        
+        # Count active assignments for every listed employee in one grouped query
+        assigned_counts = {
+            group["_id"]: group["count"]
+            async for group in db.database["asset_items"].aggregate([
+                {"$match": {
+                    "has_active_assignment": True,
+                    "current_assignee_id": {"$in": [employee["id"] for employee in employees]}
+                }},
+                {"$group": {"_id": "$current_assignee_id", "count": {"$sum": 1}}}
+            ])
+        }
+        
+        for employee in employees:
             # Set total_assigned_assets
-            employee["total_assigned_assets"] = assigned_assets_count
+            employee["total_assigned_assets"] = assigned_counts.get(employee["id"], 0)
             
             # Ensure assigned_assets is a list of AssignedAsset objects
             if "assigned_assets" not in employee or not isinstance(employee["assigned_assets"], list):
                 employee["assigned_assets"] = []
+        
+        # Convert to EmployeeResponse
+        result = _employee_list_adapter.validate_python(employees)
             
-            # Convert to EmployeeResponse
-            employee_response = EmployeeResponse(**employee)
-            result.append(employee_response)
-            
-        logger.debug(f"Fetched {len(result)} employees")
+        logger.debug("Fetched %s employees", len(result))
         return result
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -107,47 +137,38 @@ def get_employees(
         logger.error(f"Error fetching employees: {str(e)}", exc_info=True)
         raise
 
-def get_employee_by_id(db: Collection, employee_id: str) -> Optional[EmployeeResponse]:
+async def get_employee_by_id(db: AsyncIOMotorCollection, employee_id: str) -> Optional[EmployeeResponse]:
     """
     Retrieve a specific employee by ID.
     
     Args:
-        db (Collection): MongoDB collection
+        db (AsyncIOMotorCollection): MongoDB employees collection
         employee_id (str): Employee ID to retrieve
         
     Returns:
         Optional[EmployeeResponse]: The employee if found, None otherwise
     """
-    logger.info(f"Fetching employee ID: {employee_id}")
+    logger.info("Fetching employee ID: %s", employee_id)
     try:
-        employee = db.find_one({"id": employee_id})
+        # The stored assigned_assets array is replaced below, so don't fetch it
+        employee = await db.find_one({"id": employee_id}, {"_id": 0, "assigned_assets": 0})
         if not employee:
             logger.warning(f"Employee not found: {employee_id}")
             return None
-        
-        # Remove _id field as we have id
-        if "_id" in employee:
-            del employee["_id"]
             
         # Get assigned assets
-        assigned_assets = list(db.database["asset_items"].find({
+        assigned_assets = await db.database["asset_items"].find({
             "current_assignee_id": employee_id,
             "has_active_assignment": True
-        }))
+        }, ASSIGNED_ASSET_PROJECTION).to_list(length=None)
         
-        # Add assigned assets count
+        # Add assigned assets count and details
         employee["assigned_assets_count"] = len(assigned_assets)
-        
-        # Add assigned assets details
-        employee["assigned_assets"] = []
-        for asset in assigned_assets:
-            if "_id" in asset:
-                del asset["_id"]
-            employee["assigned_assets"].append(asset)
+        employee["assigned_assets"] = assigned_assets
         
         # Convert to EmployeeResponse
         employee_response = EmployeeResponse(**employee)
-        logger.debug(f"Fetched employee: {employee_response.first_name} {employee_response.last_name}")
+        logger.debug("Fetched employee: %s %s", employee_response.first_name, employee_response.last_name)
         return employee_response
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -156,54 +177,83 @@ def get_employee_by_id(db: Collection, employee_id: str) -> Optional[EmployeeRes
         logger.error(f"Error fetching employee {employee_id}: {str(e)}", exc_info=True)
         raise
 
-def get_employee_details(db: Collection, id: str) -> Optional[Dict]:
+def _assignment_history_entry(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill the AssignmentResponse field names from an assignment_history record"""
+    assignment_date = record.get("assignment_date")
+    return_date = record.get("return_date")
+    record.setdefault("assigned_date", assignment_date.isoformat() if isinstance(assignment_date, datetime) else assignment_date or "")
+    record.setdefault("assigned_to", record.get("employee_id", ""))
+    record.setdefault("assigned_to_name", record.get("employee_name", ""))
+    record.setdefault("assignment_type", "PERMANENT")
+    record.setdefault("asset_name", "")
+    record.setdefault("asset_tag", "")
+    if return_date and not record.get("returned_date"):
+        record["returned_date"] = return_date.isoformat() if isinstance(return_date, datetime) else return_date
+    if "is_active" not in record:
+        record["is_active"] = record.get("status") == "active"
+    return record
+
+async def get_employee_details(db: AsyncIOMotorCollection, id: str) -> Optional[Dict]:
     """
     Retrieve detailed information about an employee, including assigned assets, assignment history, maintenance history, and documents.
     
     Args:
-        db (Collection): MongoDB collection
+        db (AsyncIOMotorCollection): MongoDB employees collection
         id (str): Employee ID to retrieve details for
         
     Returns:
         Optional[Dict]: Employee details including related data, or None if not found
     """
-    logger.info(f"Fetching employee details for ID: {id}")
+    logger.info("Fetching employee details for ID: %s", id)
     try:
-        employee = db.find_one({"id": id})
-        if not employee:
+        # Join current assets, assignment history and documents server-side in one round trip
+        pipeline = [
+            {"$match": {"id": id}},
+            {"$limit": 1},
+            {"$lookup": {
+                "from": "asset_items",
+                "localField": "assigned_assets.asset_id",
+                "foreignField": "id",
+                "as": "joined_assets"
+            }},
+            {"$lookup": {
+                "from": "assignment_history",
+                "let": {"employee_id": "$id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$employee_id", "$$employee_id"]}}},
+                    {"$sort": {"assignment_date": -1}},
+                    {"$limit": EMPLOYEE_DETAILS_LIST_LIMIT},
+                    {"$project": {"_id": 0}}
+                ],
+                "as": "joined_history"
+            }},
+            {"$lookup": {
+                "from": "documents",
+                "let": {"employee_id": "$id"},
+                "pipeline": [
+                    {"$match": {"$expr": {"$eq": ["$employee_id", "$$employee_id"]}}},
+                    {"$sort": {"created_at": -1}},
+                    {"$limit": EMPLOYEE_DETAILS_LIST_LIMIT},
+                    {"$project": DETAILS_DOCUMENT_PROJECTION}
+                ],
+                "as": "joined_documents"
+            }},
+            {"$project": {"_id": 0, "joined_assets._id": 0}}
+        ]
+        results = await db.aggregate(pipeline).to_list(length=1)
+        if not results:
             logger.warning(f"Employee not found: {id}")
             return None
 
-        # Fetch current assets, assignment history, and maintenance history
-        current_assets = []
-        assignment_history = []
-        maintenance_history = []
-        for asset_ref in employee.get("assigned_assets", []):
-            asset = db.database["asset_items"].find_one({"id": asset_ref["asset_id"]})
-            if asset:
-                # Remove _id field as we have id
-                if "_id" in asset:
-                    del asset["_id"]
-                current_assets.append(asset)
-                # Fetch assignment history for this asset
-                asset_assignment_history = [
-                    entry for entry in asset.get("assignment_history", [])
-                    if id in entry.get("assigned_to", [])
-                ]
-                assignment_history.extend(asset_assignment_history)
-                # Fetch maintenance history for this asset
-                maintenance_history.extend(asset.get("maintenance_history", []))
-
-        # Fetch documents
-        documents = list(db.database["documents"].find({"employee_id": id}))
-        for doc in documents:
-            # Remove _id field as we have id
-            if "_id" in doc:
-                del doc["_id"]
+        employee = results[0]
+        current_assets = employee.pop("joined_assets")
+        assignment_history = [_assignment_history_entry(record) for record in employee.pop("joined_history")]
+        documents = employee.pop("joined_documents")
 
-        # Remove _id field as we have id
-        if "_id" in employee:
-            del employee["_id"]
+        # Maintenance history comes embedded in the current assets
+        maintenance_history = []
+        for asset in current_assets:
+            maintenance_history.extend(asset.get("maintenance_history", []))
 
         employee_dict = {
             "employee": employee,
@@ -212,38 +262,38 @@ def get_employee_details(db: Collection, id: str) -> Optional[Dict]:
             "maintenance_history": maintenance_history,
             "documents": documents
         }
-        logger.debug(f"Fetched employee details for: {employee_dict['employee']['first_name']} {employee_dict['employee']['last_name']}")
+        logger.debug("Fetched employee details for: %s %s", employee_dict['employee']['first_name'], employee_dict['employee']['last_name'])
         return employee_dict
     except Exception as e:
         logger.error(f"Error fetching employee details {id}: {str(e)}", exc_info=True)
         raise
 
-def create_employee(db: Collection, employee: EmployeeCreate) -> EmployeeResponse:
+async def create_employee(db: AsyncIOMotorCollection, employee: EmployeeCreate) -> EmployeeResponse:
     """
     Create a new employee.
     
     Args:
-        db (Collection): MongoDB collection
+        db (AsyncIOMotorCollection): MongoDB employees collection
         employee (EmployeeCreate): Employee data to create
         
     Returns:
         EmployeeResponse: The created employee
     """
-    logger.info(f"Creating employee: {employee.first_name} {employee.last_name}")
+    logger.info("Creating employee: %s %s", employee.first_name, employee.last_name)
     try:
         # Convert to dict, excluding None values
         employee_dict = employee.model_dump(exclude_none=True)
         
         # Check if employee with email already exists
         if employee.contact and employee.contact.email:
-            existing = db.find_one({"email": employee.contact.email})
+            existing = await db.find_one({"email": employee.contact.email})
             if existing:
                 logger.warning(f"Employee with email already exists: {employee.contact.email}")
                 raise ValueError(f"Employee with email '{employee.contact.email}' already exists")
         
         # Check if employee with employee_id already exists
         if employee.employee_id:
-            existing = db.find_one({"employee_id": employee.employee_id})
+            existing = await db.find_one({"employee_id": employee.employee_id})
             if existing:
                 logger.warning(f"Employee with employee_id already exists: {employee.employee_id}")
                 raise ValueError(f"Employee with ID '{employee.employee_id}' already exists")
@@ -252,51 +302,37 @@ def create_employee(db: Collection, employee: EmployeeCreate) -> EmployeeRespons
         employee_dict["is_active"] = employee_dict.get("is_active", True)
         employee_dict["has_assigned_assets"] = False
         
-        # Initialize metadata fields
+        # Initialize metadata fields, with the creation entry already in the edit history
+        current_time = get_current_datetime()
         employee_dict["assignment_history"] = []
         employee_dict["documents"] = []
-        employee_dict["edit_history"] = []
-        employee_dict["created_at"] = get_current_datetime()
-        
-        # Generate UUID for the id field
-        employee_dict["id"] = generate_uuid()
-        
-        # Add _id field for MongoDB to use the same value as id
-        employee_dict["_id"] = employee_dict["id"]
-        
-        # Insert the employee
-        result = db.insert_one(employee_dict)
-        logger.debug(f"Inserted employee with ID: {employee_dict['id']}")
-        
-        # Add a history entry for this creation
-        edit_entry = {
+        employee_dict["edit_history"] = [{
             "id": generate_uuid(),
             "type": "creation",
-            "edit_date": get_current_datetime().strftime("%Y-%m-%d"),
+            "edit_date": current_time.strftime("%Y-%m-%d"),
             "change_type": "Employee Creation",
             "details": "Initial employee creation",
             "notes": ""
-        }
+        }]
+        employee_dict["created_at"] = current_time
         
-        # Add history entry to the document
-        db.update_one(
-            {"id": employee_dict["id"]},
-            {"$push": {"edit_history": edit_entry}}
-        )
+        # Generate UUID for the id field
+        employee_dict["id"] = generate_uuid()
         
-        # Retrieve the created employee
-        created_employee = db.find_one({"id": employee_dict["id"]})
+        # Add _id field for MongoDB to use the same value as id
+        employee_dict["_id"] = employee_dict["id"]
         
-        # Remove _id field
-        if "_id" in created_employee:
-            del created_employee["_id"]
+        # Insert the employee; the stored document is exactly employee_dict, so no re-read
+        await db.insert_one(employee_dict)
+        logger.debug("Inserted employee with ID: %s", employee_dict['id'])
+        created_employee = {key: value for key, value in employee_dict.items() if key != "_id"}
         
         # Add assigned assets count (will be 0 for new employee)
         created_employee["assigned_assets_count"] = 0
         
         # Convert to EmployeeResponse
         employee_response = EmployeeResponse(**created_employee)
-        logger.info(f"Created employee with ID: {employee_response.id}")
+        logger.info("Created employee with ID: %s", employee_response.id)
         return employee_response
     except DuplicateKeyError as e:
         logger.warning(f"Duplicate key error: {str(e)}")
@@ -311,22 +347,22 @@ def create_employee(db: Collection, employee: EmployeeCreate) -> EmployeeRespons
         logger.error(f"Error creating employee: {str(e)}", exc_info=True)
         raise
 
-def update_employee(db: Collection, employee_id: str, employee: EmployeeUpdate) -> Optional[EmployeeResponse]:
+async def update_employee(db: AsyncIOMotorCollection, employee_id: str, employee: EmployeeUpdate) -> Optional[EmployeeResponse]:
     """
     Update an existing employee.
     
     Args:
-        db (Collection): MongoDB collection
+        db (AsyncIOMotorCollection): MongoDB employees collection
         employee_id (str): Employee ID to update
         employee (EmployeeUpdate): Employee data to update
         
     Returns:
         Optional[EmployeeResponse]: The updated employee if found, None otherwise
     """
-    logger.info(f"Updating employee ID: {employee_id}")
+    logger.info("Updating employee ID: %s", employee_id)
     try:
         # Check if employee exists
-        existing_employee = db.find_one({"id": employee_id})
+        existing_employee = await db.find_one({"id": employee_id})
         if not existing_employee:
             logger.warning(f"Employee not found: {employee_id}")
             return None
@@ -336,7 +372,7 @@ def update_employee(db: Collection, employee_id: str, employee: EmployeeUpdate)
         
         # Check for duplicate email
         if "contact" in employee_dict and employee_dict["contact"] and employee_dict["contact"].get("email"):
-            existing = db.find_one({
+            existing = await db.find_one({
                 "email": employee_dict["contact"]["email"], 
                 "id": {"$ne": employee_id}
             })
@@ -346,7 +382,7 @@ def update_employee(db: Collection, employee_id: str, employee: EmployeeUpdate)
         
         # Check for duplicate employee_id
         if "employee_id" in employee_dict and employee_dict["employee_id"]:
-            existing = db.find_one({
+            existing = await db.find_one({
                 "employee_id": employee_dict["employee_id"], 
                 "id": {"$ne": employee_id}
             })
@@ -354,6 +390,12 @@ def update_employee(db: Collection, employee_id: str, employee: EmployeeUpdate)
                 logger.warning(f"Employee with employee_id already exists: {employee_dict['employee_id']}")
                 raise ValueError(f"Employee with ID '{employee_dict['employee_id']}' already exists")
         
+        # Keep the stored full_name in sync with name changes
+        if "first_name" in employee_dict or "last_name" in employee_dict:
+            first_name = employee_dict.get("first_name", existing_employee.get("first_name", ""))
+            last_name = employee_dict.get("last_name", existing_employee.get("last_name", ""))
+            employee_dict["full_name"] = f"{first_name} {last_name}"
+        
         # Track edit history
         current_time = get_current_datetime()
         employee_dict["updated_at"] = current_time
@@ -368,48 +410,31 @@ def update_employee(db: Collection, employee_id: str, employee: EmployeeUpdate)
             "notes": ""
         }
         
-        # Add history entry to the document
-        db.update_one(
+        # Apply all updates and the history entry in one write, getting the updated employee back
+        updated_employee = await db.find_one_and_update(
             {"id": employee_id},
-            {"$push": {"edit_history": edit_entry}}
+            {"$set": employee_dict, "$push": {"edit_history": edit_entry}},
+            projection={"_id": 0, "assigned_assets": 0},
+            return_document=ReturnDocument.AFTER
         )
         
-        # Apply all updates
-        result = db.update_one(
-            {"id": employee_id},
-            {"$set": employee_dict}
-        )
-        
-        if result.matched_count == 0:
+        if not updated_employee:
             logger.warning(f"Employee not found: {employee_id}")
             return None
         
-        # Fetch the updated employee
-        updated_employee = db.find_one({"id": employee_id})
-        
-        # Remove _id field
-        if "_id" in updated_employee:
-            del updated_employee["_id"]
-        
         # Get assigned assets
-        assigned_assets = list(db.database["asset_items"].find({
+        assigned_assets = await db.database["asset_items"].find({
             "current_assignee_id": employee_id,
             "has_active_assignment": True
-        }))
+        }, ASSIGNED_ASSET_PROJECTION).to_list(length=None)
         
-        # Add assigned assets count
+        # Add assigned assets count and details
         updated_employee["assigned_assets_count"] = len(assigned_assets)
-        
-        # Add assigned assets details
-        updated_employee["assigned_assets"] = []
-        for asset in assigned_assets:
-            if "_id" in asset:
-                del asset["_id"]
-            updated_employee["assigned_assets"].append(asset)
+        updated_employee["assigned_assets"] = assigned_assets
         
         # Convert to EmployeeResponse
         employee_response = EmployeeResponse(**updated_employee)
-        logger.debug(f"Updated employee: {employee_response.first_name} {employee_response.last_name}")
+        logger.debug("Updated employee: %s %s", employee_response.first_name, employee_response.last_name)
         return employee_response
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -421,27 +446,27 @@ def update_employee(db: Collection, employee_id: str, employee: EmployeeUpdate)
         logger.error(f"Error updating employee {employee_id}: {str(e)}", exc_info=True)
         raise
 
-def delete_employee(db: Collection, employee_id: str) -> bool:
+async def delete_employee(db: AsyncIOMotorCollection, employee_id: str) -> bool:
     """
     Delete an employee if they have no assigned assets.
     
     Args:
-        db (Collection): MongoDB collection
+        db (AsyncIOMotorCollection): MongoDB employees collection
         employee_id (str): Employee ID to delete
         
     Returns:
         bool: True if employee was deleted, False if not found or has assigned assets
     """
-    logger.info(f"Deleting employee ID: {employee_id}")
+    logger.info("Deleting employee ID: %s", employee_id)
     try:
         # Check if employee exists
-        existing_employee = db.find_one({"id": employee_id})
+        existing_employee = await db.find_one({"id": employee_id})
         if not existing_employee:
             logger.warning(f"Employee not found: {employee_id}")
             return False
         
         # Check if employee has assigned assets
-        assigned_assets = db.database["asset_items"].count_documents({
+        assigned_assets = await db.database["asset_items"].count_documents({
             "current_assignee_id": employee_id,
             "has_active_assignment": True
         })
@@ -451,12 +476,12 @@ def delete_employee(db: Collection, employee_id: str) -> bool:
             raise ValueError(f"Cannot delete employee with {assigned_assets} assigned assets")
         
         # Delete the employee
-        result = db.delete_one({"id": employee_id})
+        result = await db.delete_one({"id": employee_id})
         if result.deleted_count == 0:
             logger.warning(f"Employee not found for deletion: {employee_id}")
             return False
         
-        logger.debug(f"Deleted employee ID: {employee_id}")
+        logger.debug("Deleted employee ID: %s", employee_id)
         return True
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -465,19 +490,19 @@ def delete_employee(db: Collection, employee_id: str) -> bool:
         logger.error(f"Error deleting employee {employee_id}: {str(e)}", exc_info=True)
         raise
 
-def get_employee_departments(db: Collection) -> List[str]:
+async def get_employee_departments(db: AsyncIOMotorCollection) -> List[str]:
     """
     Get a list of all departments from employees.
     
     Args:
-        db (Collection): MongoDB collection
+        db (AsyncIOMotorCollection): MongoDB employees collection
         
     Returns:
         List[str]: List of unique departments
     """
     logger.info("Fetching employee departments")
     try:
-        departments = db.distinct("department")
+        departments = await db.distinct("department")
         return [dept for dept in departments if dept]
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -486,19 +511,19 @@ def get_employee_departments(db: Collection) -> List[str]:
         logger.error(f"Error fetching employee departments: {str(e)}", exc_info=True)
         raise
 
-def get_employee_positions(db: Collection) -> List[str]:
+async def get_employee_positions(db: AsyncIOMotorCollection) -> List[str]:
     """
     Get a list of all positions from employees.
     
     Args:
-        db (Collection): MongoDB collection
+        db (AsyncIOMotorCollection): MongoDB employees collection
         
     Returns:
         List[str]: List of unique positions
     """
     logger.info("Fetching employee positions")
     try:
-        positions = db.distinct("position")
+        positions = await db.distinct("position")
         return [pos for pos in positions if pos]
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -507,19 +532,19 @@ def get_employee_positions(db: Collection) -> List[str]:
         logger.error(f"Error fetching employee positions: {str(e)}", exc_info=True)
         raise
 
-def get_employee_locations(db: Collection) -> List[str]:
+async def get_employee_locations(db: AsyncIOMotorCollection) -> List[str]:
     """
     Get a list of all locations from employees.
     
     Args:
-        db (Collection): MongoDB collection
+        db (AsyncIOMotorCollection): MongoDB employees collection
         
     Returns:
         List[str]: List of unique locations
     """
     logger.info("Fetching employee locations")
     try:
-        locations = db.distinct("location")
+        locations = await db.distinct("location")
         return [loc for loc in locations if loc]
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
@@ -528,22 +553,22 @@ def get_employee_locations(db: Collection) -> List[str]:
         logger.error(f"Error fetching employee locations: {str(e)}", exc_info=True)
         raise
 
-def get_employee_statistics(db: Collection) -> Dict:
+async def get_employee_statistics(db: AsyncIOMotorCollection) -> Dict:
     """
     Calculate employee-related statistics for dashboard.
     """
     logger.info("Calculating employee statistics")
     try:
-        total_employees = db.count_documents({})
-        active_employees = db.count_documents({"is_active": True})
-        employees_with_assets = db.count_documents({"assigned_assets": {"$ne": []}})
-        departments = db.distinct("department")
+        total_employees = await db.count_documents({})
+        active_employees = await db.count_documents({"is_active": True})
+        employees_with_assets = await db.count_documents({"assigned_assets": {"$ne": []}})
+        departments = await db.distinct("department")
         department_stats = [
             {
                 "department": dept,
-                "total_employees": db.count_documents({"department": dept}),
-                "active_employees": db.count_documents({"department": dept, "is_active": True}),
-                "employees_with_assets": db.count_documents({"department": dept, "assigned_assets": {"$ne": []}})
+                "total_employees": await db.count_documents({"department": dept}),
+                "active_employees": await db.count_documents({"department": dept, "is_active": True}),
+                "employees_with_assets": await db.count_documents({"department": dept, "assigned_assets": {"$ne": []}})
             }
             for dept in departments if dept
         ]
@@ -554,7 +579,7 @@ def get_employee_statistics(db: Collection) -> Dict:
             "employees_with_assets": employees_with_assets,
             "department_stats": department_stats
         }
-        logger.debug(f"Employee statistics calculated: {stats}")
+        logger.debug("Employee statistics calculated: %s", stats)
         return stats
     except Exception as e:
         logger.error(f"Error calculating employee statistics: {str(e)}", exc_info=True)
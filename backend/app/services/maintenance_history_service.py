@@ -1,7 +1,12 @@
+from pymongo import UpdateOne
 from pymongo.collection import Collection
-from pymongo.errors import DuplicateKeyError, OperationFailure
-from typing import List, Optional, Dict, Any
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorCursor
+from pymongo.errors import BulkWriteError, DuplicateKeyError, OperationFailure
+from pydantic import ValidationError
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timedelta
+import base64
+import ciso8601
 from app.models.asset_item import AssetItemResponse
 from app.models.maintenance_history import (
     MaintenanceHistoryEntry, 
@@ -15,6 +20,17 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Fields read from stored maintenance entries: everything MaintenanceResponse returns, plus
+# the fallbacks used to fill request_date/description (_id is included by default)
+MAINTENANCE_RESPONSE_PROJECTION = {
+    **{field: 1 for field in MaintenanceResponse.model_fields},
+    "created_at": 1,
+    "maintenance_reason": 1
+}
+
+# Documents fetched per round trip when streaming the full history
+MAINTENANCE_BATCH_SIZE = 500
+
 def convert_datetime_fields(entry: Dict[str, Any]) -> Dict[str, Any]:
     """Convert datetime fields to ISO format strings."""
     datetime_fields = [
@@ -54,7 +70,7 @@ def get_maintenance_history_by_asset(
     logger.info(f"Fetching maintenance history for asset ID: {asset_id}")
     try:
         # Check if asset exists
-        asset = db.database["asset_items"].find_one({"id": asset_id})
+        asset = db.database["asset_items"].find_one({"id": asset_id}, {"_id": 1})
         if not asset:
             logger.warning(f"Asset not found: {asset_id}")
             raise ValueError(f"Asset with ID {asset_id} not found")
@@ -65,7 +81,7 @@ def get_maintenance_history_by_asset(
             query["status"] = status
         
         # Find maintenance history in the collection
-        history_entries = list(db.find(query).sort("request_date", -1))
+        history_entries = list(db.find(query, MAINTENANCE_RESPONSE_PROJECTION).sort("request_date", -1))
         
         result = []
         for entry in history_entries:
@@ -141,6 +157,59 @@ def get_maintenance_by_id(db: Collection, maintenance_id: str) -> Optional[Maint
         logger.error(f"Error fetching maintenance {maintenance_id}: {str(e)}", exc_info=True)
         raise
 
+def _build_maintenance_request(
+    asset: Dict[str, Any],
+    maintenance: MaintenanceCreate,
+    current_time: datetime
+) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Build the stored maintenance record and the matching asset update for a maintenance request.
+    
+    Args:
+        asset (Dict[str, Any]): The asset the maintenance is requested for
+        maintenance (MaintenanceCreate): Maintenance request data
+        current_time (datetime): Request timestamp
+        
+    Returns:
+        Tuple[Dict[str, Any], Dict[str, Any]]: The maintenance record and the asset update document
+    """
+    # Convert to dict, excluding None values
+    maintenance_dict = maintenance.model_dump(exclude_none=True)
+    
+    # Set default values
+    maintenance_dict["request_date"] = current_time
+    maintenance_dict["status"] = maintenance_dict.get("status", "requested")
+    maintenance_dict["is_complete"] = False
+    
+    # Generate UUID for the id field
+    maintenance_dict["id"] = generate_uuid()
+    
+    # Add _id field for MongoDB to use the same value as id
+    maintenance_dict["_id"] = maintenance_dict["id"]
+    
+    # Add asset name for reference
+    maintenance_dict["asset_name"] = asset.get("asset_name", "Unknown")
+    
+    # Push the entry to asset's maintenance history, updating asset status if requested
+    asset_update = {"$push": {"maintenance_history": {
+        "id": maintenance_dict["id"],
+        "type": maintenance_dict.get("maintenance_type", "corrective"),
+        "issue": maintenance_dict.get("issue", ""),
+        "date": current_time,
+        "status": maintenance_dict["status"],
+        "notes": maintenance_dict.get("notes", "")
+    }}}
+    if maintenance_dict["status"] == "requested":
+        asset_update["$set"] = {"status": "maintenance_requested", "is_operational": False}
+    elif maintenance_dict["status"] == "in_progress":
+        asset_update["$set"] = {"status": "under_maintenance", "is_operational": False}
+    
+    return maintenance_dict, asset_update
+
+def _maintenance_response(maintenance_dict: Dict[str, Any]) -> MaintenanceResponse:
+    """Convert a stored maintenance record to a MaintenanceResponse"""
+    return MaintenanceResponse(**{key: value for key, value in maintenance_dict.items() if key != "_id"})
+
 def request_maintenance(db: Collection, maintenance: MaintenanceCreate) -> MaintenanceResponse:
     """
     Create a new maintenance request and update asset status.
@@ -154,90 +223,25 @@ def request_maintenance(db: Collection, maintenance: MaintenanceCreate) -> Maint
     """
     logger.info(f"Creating maintenance request for asset ID: {maintenance.asset_id}")
     try:
-        # Check if asset exists
-        asset = db.database["asset_items"].find_one({"id": maintenance.asset_id})
+        # Check if asset exists; _id stays in the projection so an asset without
+        # asset_name doesn't come back as an empty (falsy) document
+        asset = db.database["asset_items"].find_one({"id": maintenance.asset_id}, {"_id": 1, "asset_name": 1})
         if not asset:
             logger.warning(f"Asset not found: {maintenance.asset_id}")
             raise ValueError(f"Asset with ID {maintenance.asset_id} not found")
         
-        # Convert to dict, excluding None values
-        maintenance_dict = maintenance.model_dump(exclude_none=True)
-        
-        # Set default values
-        current_time = get_current_datetime()
-        maintenance_dict["request_date"] = current_time
-        maintenance_dict["status"] = maintenance_dict.get("status", "requested")
-        maintenance_dict["is_complete"] = False
-        
-        # Generate UUID for the id field
-        maintenance_dict["id"] = generate_uuid()
-        
-        # Add _id field for MongoDB to use the same value as id
-        maintenance_dict["_id"] = maintenance_dict["id"]
-        
-        # Add asset name for reference
-        maintenance_dict["asset_name"] = asset.get("asset_name", "Unknown")
+        maintenance_dict, asset_update = _build_maintenance_request(asset, maintenance, get_current_datetime())
         
         # Insert the maintenance request
-        result = db.insert_one(maintenance_dict)
+        db.insert_one(maintenance_dict)
         logger.debug(f"Inserted maintenance request with ID: {maintenance_dict['id']}")
         
-        # Update asset status if requested
-        if maintenance_dict["status"] == "requested":
-            db.database["asset_items"].update_one(
-                {"id": maintenance.asset_id},
-                {"$set": {
-                    "status": "maintenance_requested",
-                    "is_operational": False,
-                    "maintenance_history": {
-                        "id": maintenance_dict["id"],
-                        "type": maintenance_dict.get("maintenance_type", "corrective"),
-                        "issue": maintenance_dict.get("issue", ""),
-                        "date": current_time,
-                        "status": "requested"
-                    }
-                }}
-            )
-            logger.info(f"Updated asset status to maintenance_requested: {maintenance.asset_id}")
-        elif maintenance_dict["status"] == "in_progress":
-            db.database["asset_items"].update_one(
-                {"id": maintenance.asset_id},
-                {"$set": {
-                    "status": "under_maintenance",
-                    "is_operational": False,
-                    "maintenance_history": {
-                        "id": maintenance_dict["id"],
-                        "type": maintenance_dict.get("maintenance_type", "corrective"),
-                        "issue": maintenance_dict.get("issue", ""),
-                        "date": current_time,
-                        "status": "in_progress"
-                    }
-                }}
-            )
-            logger.info(f"Updated asset status to under_maintenance: {maintenance.asset_id}")
-        
-        # Push the entry to asset's maintenance history
-        db.database["asset_items"].update_one(
-            {"id": maintenance.asset_id},
-            {"$push": {"maintenance_history": {
-                "id": maintenance_dict["id"],
-                "type": maintenance_dict.get("maintenance_type", "corrective"),
-                "issue": maintenance_dict.get("issue", ""),
-                "date": current_time,
-                "status": maintenance_dict["status"],
-                "notes": maintenance_dict.get("notes", "")
-            }}}
-        )
+        # Update the asset's status and maintenance history in one write
+        db.database["asset_items"].update_one({"id": maintenance.asset_id}, asset_update)
+        logger.info(f"Updated asset for maintenance request: {maintenance.asset_id}")
         
-        # Retrieve the created maintenance request
-        created_maintenance = db.find_one({"id": maintenance_dict["id"]})
-        
-        # Remove _id field
-        if "_id" in created_maintenance:
-            del created_maintenance["_id"]
-        
-        # Convert to MaintenanceResponse
-        maintenance_response = MaintenanceResponse(**created_maintenance)
+        # Convert to MaintenanceResponse; the stored record is exactly maintenance_dict
+        maintenance_response = _maintenance_response(maintenance_dict)
         logger.info(f"Created maintenance request with ID: {maintenance_response.id}")
         return maintenance_response
     except OperationFailure as e:
@@ -250,6 +254,69 @@ def request_maintenance(db: Collection, maintenance: MaintenanceCreate) -> Maint
         logger.error(f"Error creating maintenance request: {str(e)}", exc_info=True)
         raise
 
+def request_maintenance_bulk(
+    db: Collection,
+    maintenances: List[MaintenanceCreate]
+) -> Tuple[List[MaintenanceResponse], List[Tuple[int, str]]]:
+    """
+    Create several maintenance requests with one read and two bulk writes.
+    
+    Args:
+        db (Collection): MongoDB collection
+        maintenances (List[MaintenanceCreate]): Maintenance requests
+        
+    Returns:
+        Tuple[List[MaintenanceResponse], List[Tuple[int, str]]]: The created requests, and the
+            (position, error message) of every request that failed
+    """
+    logger.info(f"Creating {len(maintenances)} maintenance requests in bulk")
+    current_time = get_current_datetime()
+    errors = []
+    
+    # Look up every referenced asset at once
+    asset_ids = list({maintenance.asset_id for maintenance in maintenances})
+    assets = {
+        asset["id"]: asset
+        for asset in db.database["asset_items"].find({"id": {"$in": asset_ids}}, {"_id": 0, "id": 1, "asset_name": 1})
+    }
+    
+    pending = []
+    for idx, maintenance in enumerate(maintenances):
+        asset = assets.get(maintenance.asset_id)
+        if not asset:
+            logger.warning(f"Asset not found: {maintenance.asset_id}")
+            errors.append((idx, f"Asset with ID {maintenance.asset_id} not found"))
+            continue
+        maintenance_dict, asset_update = _build_maintenance_request(asset, maintenance, current_time)
+        pending.append((idx, maintenance_dict, UpdateOne({"id": maintenance.asset_id}, asset_update)))
+    
+    # Insert all records at once; unordered so one bad record doesn't stop the rest
+    failed_positions = set()
+    if pending:
+        try:
+            db.insert_many([record for _, record, _ in pending], ordered=False)
+        except BulkWriteError as bwe:
+            for write_error in bwe.details.get("writeErrors", []):
+                failed_positions.add(write_error["index"])
+                errors.append((pending[write_error["index"]][0], write_error.get("errmsg")))
+    inserted = [entry for position, entry in enumerate(pending) if position not in failed_positions]
+    
+    # Update the assets of every stored request in one batch
+    if inserted:
+        try:
+            db.database["asset_items"].bulk_write([update for _, _, update in inserted], ordered=False)
+        except BulkWriteError as bwe:
+            for write_error in bwe.details.get("writeErrors", []):
+                idx = inserted[write_error["index"]][0]
+                logger.error(f"Failed to update asset for maintenance request {idx+1}: {write_error.get('errmsg')}")
+                errors.append((idx, write_error.get("errmsg")))
+    
+    failed = {idx for idx, _ in errors}
+    created = [_maintenance_response(record) for idx, record, _ in inserted if idx not in failed]
+    errors.sort()
+    logger.info(f"Created {len(created)} out of {len(maintenances)} maintenance requests")
+    return created, errors
+
 def update_maintenance_status(
     db: Collection, 
     maintenance_id: str, 
@@ -459,20 +526,77 @@ def get_maintenance_statistics(db: Collection) -> Dict[str, Any]:
         logger.error(f"Error calculating maintenance statistics: {str(e)}", exc_info=True)
         raise
 
-def get_all_maintenance_history(db: Collection) -> List[MaintenanceResponse]:
+def _encode_history_cursor(entry: Dict[str, Any]) -> str:
+    """Encode the (request_date, _id) position of a maintenance entry as an opaque cursor"""
+    return base64.urlsafe_b64encode(f"{entry['request_date'].isoformat()}|{entry['_id']}".encode()).decode()
+
+def _decode_history_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a cursor from _encode_history_cursor; raises ValueError if it is malformed"""
+    try:
+        request_date, entry_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return ciso8601.parse_datetime(request_date), entry_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def find_maintenance_history(db: AsyncIOMotorCollection) -> AsyncIOMotorCursor:
+    """
+    Build the cursor for exporting the whole maintenance history, newest request first.
+    
+    Args:
+        db (AsyncIOMotorCollection): MongoDB maintenance history collection
+        
+    Returns:
+        AsyncIOMotorCursor: Cursor over the stored entries, without _id
+    """
+    return (
+        db.find({}, {**MAINTENANCE_RESPONSE_PROJECTION, "_id": 0})
+        .sort([("request_date", -1), ("_id", -1)])
+        .batch_size(MAINTENANCE_BATCH_SIZE)
+    )
+
+def get_all_maintenance_history(
+    db: Collection,
+    limit: Optional[int] = None,
+    after: Optional[str] = None
+) -> Tuple[List[MaintenanceResponse], Optional[str]]:
     """
-    Retrieve all maintenance history entries.
+    Retrieve maintenance history entries, newest request first, optionally one page at a time.
+    
+    Pages are keyed on (request_date, _id), so each page is an index range scan
+    regardless of how deep into the history it is. Without a limit every entry
+    after the cursor is returned.
     
     Args:
         db (Collection): MongoDB collection
+        limit (Optional[int]): Maximum number of entries to return, or None for all of them
+        after (Optional[str]): Cursor returned with the previous page
         
     Returns:
-        List[MaintenanceResponse]: List of maintenance history entries
+        Tuple[List[MaintenanceResponse], Optional[str]]: The entries, and the cursor for the
+            next page (None on the last page or when no limit is given)
+        
+    Raises:
+        ValueError: If the cursor is malformed
     """
-    logger.info("Fetching all maintenance history entries")
+    logger.info(f"Fetching maintenance history entries - limit: {limit}, after: {after}")
     try:
-        # Find all maintenance history entries in the collection
-        history_entries = list(db.find().sort("request_date", -1))
+        query = {}
+        if after:
+            request_date, entry_id = _decode_history_cursor(after)
+            query = {"$or": [
+                {"request_date": {"$lt": request_date}},
+                {"request_date": request_date, "_id": {"$lt": entry_id}}
+            ]}
+        
+        cursor = db.find(query, MAINTENANCE_RESPONSE_PROJECTION).sort([("request_date", -1), ("_id", -1)])
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        history_entries = list(cursor)
+        
+        # Only a full page can have a successor; entries without a stored date can't be resumed from
+        next_cursor = None
+        if limit is not None and len(history_entries) == limit and isinstance(history_entries[-1].get("request_date"), datetime):
+            next_cursor = _encode_history_cursor(history_entries[-1])
         
         result = []
         for entry in history_entries:
@@ -504,7 +628,7 @@ def get_all_maintenance_history(db: Collection) -> List[MaintenanceResponse]:
                 continue
         
         logger.debug(f"Fetched {len(result)} maintenance entries")
-        return result
+        return result, next_cursor
     except OperationFailure as e:
         logger.error(f"Database operation failed: {str(e)}", exc_info=True)
         raise
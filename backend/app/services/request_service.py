@@ -1,8 +1,12 @@
+from pymongo import ReturnDocument
 from pymongo.database import Database
 from pymongo.collection import Collection
-from datetime import datetime
-from typing import List, Dict, Any, Optional, Union
+from datetime import datetime, timezone
+import ciso8601
+from typing import List, Dict, Any, Optional, Tuple, Union
+import base64
 from pymongo.errors import OperationFailure
+from motor.motor_asyncio import AsyncIOMotorCollection, AsyncIOMotorCursor
 import logging
 from app.models.request_approval import (
     Request, 
@@ -23,23 +27,53 @@ logger = logging.getLogger(__name__)
 # Explicitly define collection name to avoid confusion
 REQUESTS_COLLECTION = "requests"
 
-def get_requests(db: Union[Database, Collection], filters: Optional[Dict[str, Any]] = None) -> List[RequestResponse]:
+# Requests fetched per round trip when streaming an export
+REQUEST_BATCH_SIZE = 500
+
+# Fields read for request listings: only what RequestResponse returns
+REQUEST_RESPONSE_PROJECTION = {
+    **{field: 1 for field in RequestResponse.model_fields},
+    "_id": 0
+}
+
+def _encode_requests_cursor(doc: Dict[str, Any]) -> str:
+    """Encode the (created_at, id) position of a request as an opaque cursor"""
+    return base64.urlsafe_b64encode(f"{doc['created_at']}|{doc['id']}".encode()).decode()
+
+def _decode_requests_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor from _encode_requests_cursor; raises ValueError if it is malformed"""
+    try:
+        created_at, request_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return created_at, request_id
+    except Exception:
+        raise ValueError("Invalid cursor")
+
+def _created_at_bound(name: str, value: str) -> str:
     """
-    Retrieve requests with optional filtering.
+    Parse a created_after/created_before filter into the form created_at is stored in.
     
-    Args:
-        db (Union[Database, Collection]): MongoDB database instance or collection
-        filters (Optional[Dict[str, Any]]): Filter criteria
-        
-    Returns:
-        List[RequestResponse]: List of requests matching filters
+    created_at is stored as a naive UTC ISO string (serialize_model of get_current_datetime),
+    so the bound is normalized to UTC and formatted the same way for an ordered index comparison.
+    
+    Raises:
+        ValueError: If the value is not an ISO 8601 date
+    """
+    try:
+        bound = ciso8601.parse_datetime(value)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid {name} date: {value}")
+    if bound.tzinfo is not None:
+        bound = bound.astimezone(timezone.utc).replace(tzinfo=None)
+    return bound.isoformat()
+
+def _build_requests_query(filters: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Translate request listing filters into a MongoDB query.
+    
+    Raises:
+        ValueError: If a date filter is malformed
     """
     query = {}
-    # Check if db is a Database or Collection
-    if isinstance(db, Database):
-        collection = db.get_collection(REQUESTS_COLLECTION)
-    else:
-        collection = db  # db is already the collection
     
     # Handle special filters
     if filters:
@@ -57,41 +91,102 @@ def get_requests(db: Union[Database, Collection], filters: Optional[Dict[str, An
             query["requestor.id"] = filters["requester_id"]
             
         if "asset_id" in filters:
-            # For requests related to specific assets
-            sample_doc = collection.find_one()
-            if sample_doc and "asset_details" in sample_doc and "asset_id" in sample_doc.get("asset_details", {}):
-                query["asset_details.asset_id"] = filters["asset_id"]
-            else:
-                # Try checking in linked_assets array
-                query["linked_assets"] = filters["asset_id"]
+            # Requests reference assets either in asset_details or in linked_assets; both
+            # branches are indexed, so this stays an index scan instead of sampling a document
+            query["$or"] = [
+                {"asset_details.asset_id": filters["asset_id"]},
+                {"linked_assets": filters["asset_id"]}
+            ]
                 
-        # Date range filters
+        # Date range filters, parsed once here and compared against the indexed created_at
+        date_range = {}
         if "created_after" in filters:
-            try:
-                after_date = datetime.fromisoformat(filters["created_after"].replace("Z", "+00:00"))
-                query["created_at"] = {"$gte": after_date}
-            except (ValueError, TypeError):
-                logger.warning(f"Invalid created_after date format: {filters['created_after']}")
-                
+            date_range["$gte"] = _created_at_bound("created_after", filters["created_after"])
         if "created_before" in filters:
-            try:
-                before_date = datetime.fromisoformat(filters["created_before"].replace("Z", "+00:00"))
-                if "created_at" in query:
-                    query["created_at"]["$lte"] = before_date
-                else:
-                    query["created_at"] = {"$lte": before_date}
-            except (ValueError, TypeError):
-                logger.warning(f"Invalid created_before date format: {filters['created_before']}")
+            date_range["$lte"] = _created_at_bound("created_before", filters["created_before"])
+        if date_range:
+            query["created_at"] = date_range
+    
+    return query
+
+def find_requests(db: AsyncIOMotorCollection, filters: Optional[Dict[str, Any]] = None) -> AsyncIOMotorCursor:
+    """
+    Build the cursor for exporting every request matching the filters, most recent first.
+    
+    Args:
+        db (AsyncIOMotorCollection): MongoDB requests collection
+        filters (Optional[Dict[str, Any]]): Filter criteria, as for get_requests
+        
+    Returns:
+        AsyncIOMotorCursor: Cursor over the matching requests, projected to RequestResponse fields
+        
+    Raises:
+        ValueError: If a date filter is malformed
+    """
+    return (
+        db.find(_build_requests_query(filters), REQUEST_RESPONSE_PROJECTION)
+        .sort([("created_at", -1), ("id", -1)])
+        .batch_size(REQUEST_BATCH_SIZE)
+    )
+
+def get_requests(
+    db: Union[Database, Collection],
+    filters: Optional[Dict[str, Any]] = None,
+    limit: int = 50,
+    after: Optional[str] = None
+) -> Tuple[List[RequestResponse], Optional[str]]:
+    """
+    Retrieve one page of requests with optional filtering, most recent first.
+    
+    Pages are keyed on (created_at, id), so Mongo returns the top of an index range
+    instead of sorting every matching request.
+    
+    Args:
+        db (Union[Database, Collection]): MongoDB database instance or collection
+        filters (Optional[Dict[str, Any]]): Filter criteria
+        limit (int): Maximum number of requests to return
+        after (Optional[str]): Cursor returned with the previous page
+        
+    Returns:
+        Tuple[List[RequestResponse], Optional[str]]: The requests matching filters, and the
+            cursor for the next page (None on the last page)
+        
+    Raises:
+        ValueError: If the cursor or a date filter is malformed
+    """
+    # Check if db is a Database or Collection
+    if isinstance(db, Database):
+        collection = db.get_collection(REQUESTS_COLLECTION)
+    else:
+        collection = db  # db is already the collection
+    
+    query = _build_requests_query(filters)
+    
+    if after:
+        created_at, request_id = _decode_requests_cursor(after)
+        query = {"$and": [query, {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": request_id}}
+        ]}]}
     
     logger.debug(f"Fetching requests with query: {query}")
-    cursor = collection.find(query).sort("created_at", -1)  # Most recent first
+    docs = list(
+        collection.find(query, {**REQUEST_RESPONSE_PROJECTION, "created_at": 1})
+        .sort([("created_at", -1), ("id", -1)])  # Most recent first
+        .limit(limit)
+    )
+    
+    # Only a full page can have a successor; requests without a stored date can't be resumed from
+    next_cursor = None
+    if len(docs) == limit and isinstance(docs[-1].get("created_at"), str):
+        next_cursor = _encode_requests_cursor(docs[-1])
     
     requests = []
-    for doc in cursor:
+    for doc in docs:
         # No need to convert id as we're now using UUID-based string IDs
         requests.append(RequestResponse(**doc))
     
-    return requests
+    return requests, next_cursor
 
 def get_request_by_id(db: Union[Database, Collection], request_id: str) -> Optional[RequestResponse]:
     """
@@ -291,11 +386,6 @@ def add_comment(db: Union[Database, Collection], request_id: str, comment_data:
     else:
         collection = db  # db is already the collection
     
-    # Check if request exists
-    if not collection.find_one({"id": request_id}):
-        logger.warning(f"Request not found for comment: {request_id}")
-        return None
-    
     # Prepare comment
     comment = {
         "id": generate_uuid(),
@@ -305,8 +395,8 @@ def add_comment(db: Union[Database, Collection], request_id: str, comment_data:
         "timestamp": get_current_datetime()
     }
     
-    # Update the request
-    update_result = collection.update_one(
+    # Append the comment and return the updated request in one atomic round trip
+    updated_request = collection.find_one_and_update(
         {"id": request_id},
         {
             "$push": {"comments": comment},
@@ -314,15 +404,15 @@ def add_comment(db: Union[Database, Collection], request_id: str, comment_data:
                 "last_updated": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
                 "updated_at": get_current_datetime()
             }
-        }
+        },
+        projection=REQUEST_RESPONSE_PROJECTION,
+        return_document=ReturnDocument.AFTER
     )
     
-    if update_result.modified_count == 0:
-        logger.warning(f"Failed to add comment to request {request_id}")
+    if not updated_request:
+        logger.warning(f"Request not found for comment: {request_id}")
         return None
     
-    # Get updated request
-    updated_request = collection.find_one({"id": request_id})
     return RequestResponse(**updated_request)
 
 def update_approval(db: Union[Database, Collection], request_id: str, approver_id: str, approve: bool, approver_name: Optional[str] = None, notes: Optional[str] = None) -> Optional[RequestResponse]:
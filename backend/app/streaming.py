@@ -0,0 +1,55 @@
+import orjson
+from typing import Any, AsyncIterator, Dict
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _default(value: Any) -> Any:
+    """Fallback serializer for BSON/Enum values orjson does not handle natively"""
+    if hasattr(value, "value"):
+        return value.value
+    return str(value)
+
+def dumps(document: Dict[str, Any]) -> bytes:
+    """
+    Serialize a MongoDB document with orjson.
+
+    Datetimes are encoded natively; ObjectIds and other BSON types fall back to str.
+    """
+    return orjson.dumps(document, default=_default)
+
+async def ndjson_stream(cursor) -> AsyncIterator[bytes]:
+    """
+    Stream a Motor cursor as newline-delimited JSON, one document per line.
+    
+    Args:
+        cursor: Motor cursor (or any async iterable) yielding documents
+    
+    Yields:
+        bytes: One encoded document followed by a newline
+    """
+    async for document in cursor:
+        yield dumps(document) + b"\n"
+
+async def json_array_stream(cursor) -> AsyncIterator[bytes]:
+    """
+    Stream a Motor cursor as a JSON array, one document at a time.
+
+    The response body is identical to returning the list, but documents are encoded as
+    they arrive instead of being buffered first.
+
+    Args:
+        cursor: Motor cursor (or any async iterable) yielding documents
+
+    Yields:
+        bytes: Chunks of the JSON array
+    """
+    yield b"["
+    first = True
+    async for document in cursor:
+        if first:
+            first = False
+            yield dumps(document)
+        else:
+            yield b"," + dumps(document)
+    yield b"]"